@@ -0,0 +1,38 @@
+import argparse
+import time
+from src.contest_parser import PARSER_BACKENDS
+from .synthetic import generate_contest_details_page, load_sample_contest_details
+
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the contest detail page parser backends")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--entrants', type=int, nargs='*', default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    pages = [('sample-contest-details.html', load_sample_contest_details())]
+    for entrant_count in args.entrants:
+        pages.append((f'synthetic, {entrant_count} entrants', generate_contest_details_page(entrant_count)))
+
+    for page_name, page in pages:
+        results = {backend: parse_html(page) for backend, parse_html in PARSER_BACKENDS.items()}
+        if results['lxml'] != results['soup']:
+            raise SystemExit(f"Parser backends disagree on {page_name}")
+        repeat = max(1, args.repeat // max(1, len(page) // 100000))
+        print(page_name)
+        for backend, parse_html in PARSER_BACKENDS.items():
+            elapsed = best_time(lambda: parse_html(page), repeat)
+            print(f"{backend:>8}: {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Callable, Optional
+from urllib.parse import parse_qs, urlparse
+from .synthetic import generate_contest_details_page, generate_lobby_contests, load_sample_contest_details
+
+logger = logging.getLogger(__name__)
+
+# Run a local stand-in for draftkings.com and point the fetcher at it:
+#   python -m benchmarks.dk_stand_in --port 8765 --contests 20000 --latency lognormal:0.08:0.5 --throttle-rate 0.02
+#   DK_BASE_URL=http://127.0.0.1:8765 python -m src.scheduler
+CONTEST_ID_START = 160000000
+# Ids of different sports never overlap
+SPORT_ID_STRIDE = 10000000
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    # "fixed:0.1", "uniform:0.05:0.3" or "lognormal:<median>:<sigma>", in seconds
+    kind, *values = spec.split(":")
+    values = [float(value) for value in values]
+    if kind == "fixed" and len(values) == 1:
+        return lambda generator: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda generator: generator.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda generator: generator.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+@lru_cache(maxsize=4096)
+def _details_page(template: str, contest_id: int, entrant_count: int, max_entrants: int) -> str:
+    # Seeded by the contest id, so the entrants already listed stay the same
+    # as the contest fills
+    return generate_contest_details_page(entrant_count, max_entrants, seed=contest_id, template=template)
+
+
+# Serves /lobby/getcontests?sport= and /contest/detailspop?contestId= like
+# draftkings.com does, from synthetic contests or a recorded lobby. The
+# contests fill up every fill_interval, so entry counts, ETags and detail
+# pages change between cycles the way a live slate does. Latency,
+# 5xx errors and 429s are drawn per request from a seeded generator.
+class DraftKingsStandIn:
+    def __init__(self, sports: List[str] = None, contests_per_sport: int = 10000, host: str = "127.0.0.1", port: int = 0,
+                 latency: Callable[[random.Random], float] = None, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: int = 1, fill_interval: float = 30.0, fill_fraction: float = 0.05,
+                 lobby: Dict[str, Any] = None, details_template: str = None, seed: int = 42):
+        for name, rate in (("error_rate", error_rate), ("throttle_rate", throttle_rate), ("fill_fraction", fill_fraction)):
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if fill_interval <= 0:
+            raise ValueError("fill_interval must be positive")
+        self.sports = sports or ["NFL"]
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fill_interval = fill_interval
+        self.fill_fraction = fill_fraction
+        self.details_template = details_template or load_sample_contest_details()
+        self.generator = random.Random(seed)
+        self.generator_lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.contests_by_sport = {}
+        self.contests_by_id = {}
+        for sport_index, sport in enumerate(self.sports):
+            if lobby is not None:
+                # A recorded getcontests payload is served for every sport
+                contests = [dict(contest) for contest in lobby.get("Contests", [])]
+            else:
+                contests = generate_lobby_contests(contests_per_sport, sport, seed=seed + sport_index)
+                for index, contest in enumerate(contests):
+                    contest["id"] = CONTEST_ID_START + sport_index * SPORT_ID_STRIDE + index
+            self.contests_by_sport[sport] = contests
+            for contest in contests:
+                self.contests_by_id[int(contest["id"])] = contest
+        self.stats = {"lobby_requests": 0, "detail_requests": 0, "not_modified": 0, "errors": 0, "throttled": 0, "not_found": 0}
+        self.stats_lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def current_tick(self) -> int:
+        return int((time.monotonic() - self.started_at) // self.fill_interval)
+
+    def entry_count(self, contest: Dict[str, Any], tick: int) -> int:
+        # Each contest fills at its own steady rate, between none and twice
+        # fill_fraction entrants per tick, derived from a hash of its id so
+        # every request and every restart agree
+        digest = hashlib.blake2b(str(contest["id"]).encode(), digest_size=4).digest()
+        fill_rate = 2 * self.fill_fraction * int.from_bytes(digest, "big") / 0xFFFFFFFF
+        return min(int(contest["m"]), int(contest.get("nt", 0)) + int(tick * fill_rate))
+
+    def lobby_payload(self, sport: str, tick: int) -> bytes:
+        contests = []
+        for contest in self.contests_by_sport[sport]:
+            contests.append(dict(contest, nt=self.entry_count(contest, tick)))
+        return json.dumps({"Contests": contests}).encode("utf-8")
+
+    def details_page(self, contest_id: int, tick: int) -> Optional[str]:
+        contest = self.contests_by_id.get(contest_id)
+        if contest is None:
+            return None
+        return _details_page(self.details_template, contest_id, self.entry_count(contest, tick), int(contest["m"]))
+
+    def draw_fault(self) -> Optional[str]:
+        with self.generator_lock:
+            delay = self.latency(self.generator) if self.latency is not None else 0.0
+            roll = self.generator.random()
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.throttle_rate:
+            return "throttled"
+        if roll < self.throttle_rate + self.error_rate:
+            return "errors"
+        return None
+
+    def count(self, name: str) -> None:
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def start(self) -> int:
+        handler = type("StandInRequestHandler", (_StandInRequestHandler,), {"stand_in": self})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        # With port 0 the OS picks a free port
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="dk-stand-in", daemon=True)
+        self.thread.start()
+        logger.info(f"DraftKings stand-in serving {len(self.contests_by_id)} contests on {self.base_url}")
+        return self.port
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class _StandInRequestHandler(BaseHTTPRequestHandler):
+    stand_in = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        stand_in = self.stand_in
+        if url.path == "/lobby/getcontests":
+            stand_in.count("lobby_requests")
+            self._handle_lobby(query.get("sport", [""])[0])
+        elif url.path == "/contest/detailspop":
+            stand_in.count("detail_requests")
+            self._handle_details(query.get("contestId", [""])[0])
+        else:
+            stand_in.count("not_found")
+            self._respond(404, "text/plain; charset=utf-8", b"Not found\n")
+
+    def _handle_lobby(self, sport: str) -> None:
+        stand_in = self.stand_in
+        if sport not in stand_in.contests_by_sport:
+            stand_in.count("not_found")
+            self._respond(404, "text/plain; charset=utf-8", b"Unknown sport\n")
+            return
+        if self._fault():
+            return
+        tick = stand_in.current_tick()
+        etag = f'"{sport}-{tick}"'
+        if self.headers.get("If-None-Match") == etag:
+            stand_in.count("not_modified")
+            self._respond(304, None, b"", {"ETag": etag})
+            return
+        self._respond(200, "application/json", stand_in.lobby_payload(sport, tick), {"ETag": etag})
+
+    def _handle_details(self, contest_id: str) -> None:
+        stand_in = self.stand_in
+        page = stand_in.details_page(int(contest_id), stand_in.current_tick()) if contest_id.isdigit() else None
+        if page is None:
+            stand_in.count("not_found")
+            self._respond(404, "text/plain; charset=utf-8", b"Unknown contest\n")
+            return
+        if self._fault():
+            return
+        self._respond(200, "text/html; charset=utf-8", page.encode("utf-8"))
+
+    def _fault(self) -> bool:
+        fault = self.stand_in.draw_fault()
+        if fault is None:
+            return False
+        self.stand_in.count(fault)
+        if fault == "throttled":
+            self._respond(429, "text/plain; charset=utf-8", b"Too many requests\n", {"Retry-After": str(self.stand_in.retry_after)})
+        else:
+            self._respond(503, "text/plain; charset=utf-8", b"Service unavailable\n")
+        return True
+
+    def _respond(self, status: int, content_type: Optional[str], body: bytes, headers: Dict[str, str] = None) -> None:
+        if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Stand-in request: {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the DraftKings lobby and detail pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sports", nargs="*", default=["NFL"])
+    parser.add_argument("--contests", type=int, default=10000, help="Synthetic contests per sport")
+    parser.add_argument("--lobby-file", help="Recorded getcontests JSON to serve instead of synthetic contests")
+    parser.add_argument("--details-file", help="Recorded detailspop HTML used as the template for every contest")
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--fill-interval", type=float, default=30.0)
+    parser.add_argument("--fill-fraction", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    lobby = None
+    if args.lobby_file:
+        with open(args.lobby_file) as lobby_file:
+            lobby = json.load(lobby_file)
+    details_template = None
+    if args.details_file:
+        with open(args.details_file, encoding="utf-8") as details_file:
+            details_template = details_file.read()
+
+    stand_in = DraftKingsStandIn(sports=args.sports, contests_per_sport=args.contests, host=args.host, port=args.port,
+                                 latency=parse_latency(args.latency), error_rate=args.error_rate,
+                                 throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                                 fill_interval=args.fill_interval, fill_fraction=args.fill_fraction,
+                                 lobby=lobby, details_template=details_template, seed=args.seed)
+    stand_in.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Stand-in requests: {stand_in.get_stats()}")
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
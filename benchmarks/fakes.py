@@ -0,0 +1,143 @@
+import threading
+from typing import List, Dict, Any
+from src.contest_parser import PARSER_BACKENDS
+from .synthetic import generate_contest_details_page, load_sample_contest_details
+
+# Primary keys used when a row is upserted without an explicit on_conflict
+TABLE_KEYS = {'contests': ('id',), 'entrants': ('contest_id', 'username')}
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class FakeQuery:
+    # Implements the part of the supabase-py query builder DatabaseManager
+    # uses: select/insert/update/upsert with eq/in_ filters, order and range
+    def __init__(self, database: 'FakeSupabase', table_name: str):
+        self.database = database
+        self.table_name = table_name
+        self.operation = 'select'
+        self.columns = None
+        self.payload = None
+        self.conflict_columns = TABLE_KEYS.get(table_name, ('id',))
+        self.filters = []
+        self.order_columns = []
+        self.row_range = None
+
+    def select(self, *columns: str) -> 'FakeQuery':
+        self.operation = 'select'
+        self.columns = None if columns in ((), ('*',)) else columns
+        return self
+
+    def insert(self, rows) -> 'FakeQuery':
+        self.operation = 'upsert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = None) -> 'FakeQuery':
+        self.operation = 'upsert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        if on_conflict:
+            self.conflict_columns = tuple(column.strip() for column in on_conflict.split(','))
+        return self
+
+    def update(self, values: Dict[str, Any]) -> 'FakeQuery':
+        self.operation = 'update'
+        self.payload = values
+        return self
+
+    def eq(self, column: str, value: Any) -> 'FakeQuery':
+        self.filters.append((column, {value}))
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> 'FakeQuery':
+        self.filters.append((column, set(values)))
+        return self
+
+    def order(self, column: str) -> 'FakeQuery':
+        self.order_columns.append(column)
+        return self
+
+    def range(self, start: int, end: int) -> 'FakeQuery':
+        self.row_range = (start, end)
+        return self
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return all(row.get(column) in values for column, values in self.filters)
+
+    def execute(self) -> FakeResponse:
+        with self.database.lock:
+            self.database.requests += 1
+            table = self.database.tables.setdefault(self.table_name, {})
+            if self.operation == 'select':
+                rows = [row for row in table.values() if self._matches(row)]
+                if self.order_columns:
+                    rows.sort(key=lambda row: tuple(str(row.get(column)) for column in self.order_columns))
+                if self.row_range is not None:
+                    rows = rows[self.row_range[0]:self.row_range[1] + 1]
+                if self.columns is not None:
+                    rows = [{column: row.get(column) for column in self.columns} for row in rows]
+                return FakeResponse([dict(row) for row in rows])
+            if self.operation == 'update':
+                updated = []
+                for row in table.values():
+                    if self._matches(row):
+                        row.update(self.payload)
+                        updated.append(dict(row))
+                return FakeResponse(updated)
+            stored = []
+            for row in self.payload:
+                key = tuple(row.get(column) for column in self.conflict_columns)
+                table.setdefault(key, {}).update(row)
+                stored.append(dict(table[key]))
+            return FakeResponse(stored)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def table(self, table_name: str) -> FakeQuery:
+        return FakeQuery(self, table_name)
+
+
+class FakeSlackClient:
+    def __init__(self):
+        self.messages = []
+
+    def chat_postMessage(self, channel: str, text: str) -> Dict[str, Any]:
+        self.messages.append((channel, text))
+        return {'ok': True}
+
+
+class FakeDataFetcher:
+    # Serves synthetic detail pages parsed with a real backend, so a cycle
+    # pays the parsing cost but none of the network cost
+    def __init__(self, parser_backend: str = 'lxml', max_workers: int = 5):
+        self.parse_html = PARSER_BACKENDS[parser_backend]
+        self.max_workers = max_workers
+        self.template = load_sample_contest_details()
+        self.pages = {}
+        self.entries_by_id = {}
+        self.lock = threading.Lock()
+
+    def page_for(self, entrant_count: int, max_entrants: int) -> str:
+        key = (entrant_count, max_entrants)
+        with self.lock:
+            if key not in self.pages:
+                self.pages[key] = generate_contest_details_page(entrant_count, max_entrants, seed=entrant_count, template=self.template)
+            return self.pages[key]
+
+    def prepare(self, contests: List[Dict[str, Any]]) -> None:
+        # Pages are built up front so only the parse is timed
+        self.entries_by_id = {contest['id']: (min(contest['nt'], contest['m']), contest['m']) for contest in contests}
+        for entrant_count, max_entrants in set(self.entries_by_id.values()):
+            self.page_for(entrant_count, max_entrants)
+
+    def fetch_contest_details(self, contest_id: Any, entry_count: int = None) -> Dict[str, Any]:
+        entrant_count, max_entrants = self.entries_by_id[contest_id]
+        return self.parse_html(self.page_for(entrant_count, max_entrants))
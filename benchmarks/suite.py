@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import List, Dict, Any, Callable, Tuple
+from src.contest_parser import PARSER_BACKENDS
+from src.data_processor import ContestFilter, DataProcessor, EntrantAnalyzer
+from src.notification_ledger import NotificationLedger
+from src.slack_notifier import SlackNotifier
+from .fakes import FakeDataFetcher, FakeSlackClient, FakeSupabase
+from .synthetic import generate_contest_details_page, generate_lobby_contests, load_sample_contest_details
+
+# Run from the repository root:
+#   python -m benchmarks.suite --save-baseline      record benchmarks/baseline.json
+#   python -m benchmarks.suite                      compare against it
+# Exits with status 1 when a benchmark's median is more than --threshold
+# slower than its baseline, and with status 2 when there is no baseline to
+# compare against. Baselines are machine specific, so none is committed;
+# record one on the machine that runs the comparison.
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_LOBBY_SIZES = [10000, 200000]
+DEFAULT_ENTRANT_COUNTS = [5, 100, 1000]
+DEFAULT_CYCLE_SIZE = 10000
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {'median': statistics.median(samples), 'best': min(samples), 'repeat': repeat}
+
+
+def filter_benchmarks(lobby_sizes: List[int]) -> List[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    benchmarks = []
+    for size in lobby_sizes:
+        for backend in ['python', 'columnar']:
+            def setup(size=size, backend=backend):
+                contests = {'NFL': generate_lobby_contests(size)}
+                return lambda: ContestFilter.apply_filters(contests, backend=backend)
+            benchmarks.append((f'apply_filters[{backend},{size}]', setup))
+    return benchmarks
+
+
+def parser_benchmarks(entrant_counts: List[int]) -> List[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    benchmarks = []
+    pages = [('sample', None)] + [(str(count), count) for count in entrant_counts]
+    for page_name, entrant_count in pages:
+        def setup(entrant_count=entrant_count):
+            return load_sample_contest_details() if entrant_count is None else generate_contest_details_page(entrant_count)
+
+        def soup_setup(setup=setup):
+            # The same entry point DataFetcher uses, so building the soup with
+            # lxml is timed along with reading it
+            page = setup()
+            return lambda: PARSER_BACKENDS['soup'](page)
+        benchmarks.append((f'parse_contest_details[soup,{page_name}]', soup_setup))
+
+        def lxml_setup(setup=setup):
+            page = setup()
+            return lambda: PARSER_BACKENDS['lxml'](page)
+        benchmarks.append((f'parse_contest_details[lxml,{page_name}]', lxml_setup))
+    return benchmarks
+
+
+def analyzer_benchmarks(entrant_counts: List[int]) -> List[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    benchmarks = []
+    for entrant_count in entrant_counts:
+        def setup(entrant_count=entrant_count):
+            entrants = [{'username': f'user{index}', 'experience_level': index % 6} for index in range(entrant_count)]
+            # Scored 1000 times per sample so small contests are measurable
+            return lambda: [EntrantAnalyzer.analyze_experience_levels(entrants, entrant_count + 1) for _ in range(1000)]
+        benchmarks.append((f'analyze_experience_levels[{entrant_count}]x1000', setup))
+    return benchmarks
+
+
+def cycle_benchmarks(cycle_size: int) -> List[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    def setup():
+        lobby = {'NFL': generate_lobby_contests(cycle_size)}
+        data_fetcher = FakeDataFetcher()
+        data_fetcher.prepare(ContestFilter.apply_filters(lobby)['NFL'])
+
+        def run_cycle():
+            # A fresh database and ledger every sample, so each one inserts
+            # and notifies instead of only updating
+            supabase = FakeSupabase()
+            notifier = SlackNotifier(client=FakeSlackClient(), channel='benchmarks')
+            data_processor = DataProcessor(data_fetcher, track_lobby_changes=False, notifier=notifier,
+                                           notification_ledger=NotificationLedger(), supabase=supabase)
+            # The processor and notifier print progress; keep it off the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                data_processor.process_contests({sport: [dict(contest) for contest in contests] for sport, contests in lobby.items()})
+                data_processor.process_unprocessed_contests()
+        return run_cycle
+    return [(f'process_contests[{cycle_size}]', setup)]
+
+
+def run_suite(benchmarks: List[Tuple[str, Callable[[], Callable[[], Any]]]], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name, setup in benchmarks:
+        func = setup()
+        # One untimed run to warm caches and lazy imports
+        func()
+        results[name] = measure(func, repeat)
+        print(f"{name:>48}: median {results[name]['median'] * 1000:9.2f} ms, best {results[name]['best'] * 1000:9.2f} ms")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        baseline_median = baseline[name]['median']
+        change = (result['median'] - baseline_median) / baseline_median if baseline_median else 0.0
+        if change > threshold:
+            regressions.append(f"{name}: {baseline_median * 1000:.2f} ms -> {result['median'] * 1000:.2f} ms (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the contest finder's hot paths and compare them with a baseline")
+    parser.add_argument('--lobby-sizes', type=int, nargs='*', default=DEFAULT_LOBBY_SIZES)
+    parser.add_argument('--entrants', type=int, nargs='*', default=DEFAULT_ENTRANT_COUNTS)
+    parser.add_argument('--cycle-size', type=int, default=DEFAULT_CYCLE_SIZE)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown of the median, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    # No spinners and no per-contest log lines inside the timed code
+    os.environ['DK_PROGRESS'] = 'headless'
+    logging.disable(logging.INFO)
+
+    benchmarks = (filter_benchmarks(args.lobby_sizes) + parser_benchmarks(args.entrants)
+                  + analyzer_benchmarks(args.entrants) + cycle_benchmarks(args.cycle_size))
+    if args.only:
+        benchmarks = [(name, setup) for name, setup in benchmarks if args.only in name]
+    results = run_suite(benchmarks, args.repeat)
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    if args.save_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+        # Benchmarks left out with --only keep their previous baseline
+        baseline.update(python=report['python'], machine=report['machine'])
+        baseline['results'] = dict(baseline.get('results', {}), **results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, so no regression check ran; record one with --save-baseline on this machine",
+              file=sys.stderr)
+        sys.exit(2)
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
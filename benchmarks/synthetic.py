@@ -0,0 +1,82 @@
+import os
+import random
+import re
+from typing import List, Dict, Any
+
+SAMPLE_DETAILS_PATH = os.path.join(os.path.dirname(__file__), '..', 'project-documents', 'sample-contest-details.html')
+ENTRANTS_TBODY_PATTERN = re.compile(r'(<table id="entrants-table"[^>]*>\s*<tbody>)(.*?)(</tbody>)', re.DOTALL)
+
+CONTEST_NAME_TEMPLATES = [
+    "{sport} ${fee} Double Up",
+    "{sport} ${fee} 3-Player",
+    "{sport} ${fee} 5-Player",
+    "{sport} ${fee} Head-to-Head",
+    "{sport} ${fee} Casual Double Up",
+    "{sport} ${fee} Beginner 3-Player",
+    "{sport} ${fee} Turbo Double Up",
+    "{sport} ${fee} Primetime Showdown",
+    "{sport} ${fee} Satellite",
+    "{sport} ${fee} Mon-Thu Double Up",
+    "{sport} ${fee} Millionaire Maker",
+]
+GAME_TYPES = ['Classic', 'Classic', 'Showdown Captain Mode', 'Tiers', 'Snake']
+START_TIMES = ['Sun 1:00PM EDT', 'Sun 4:05PM EDT', 'Sun 4:25PM EDT', 'Sun 8:20PM EDT', 'Mon 8:15PM EDT', 'Thu 8:15PM EDT']
+MAX_ENTRANTS = [2, 3, 4, 5, 10, 20, 100, 1000, 150000]
+ENTRY_FEES = [0.25, 1, 3, 5, 10, 25, 50, 100, 110, 250, 1000]
+
+
+def generate_lobby_contests(count: int, sport: str = "NFL", seed: int = 42) -> List[Dict[str, Any]]:
+    generator = random.Random(seed)
+    contests = []
+    for index in range(count):
+        entry_fee = generator.choice(ENTRY_FEES)
+        max_entrants = generator.choice(MAX_ENTRANTS)
+        contests.append({
+            'id': 160000000 + index,
+            'n': generator.choice(CONTEST_NAME_TEMPLATES).format(sport=sport, fee=entry_fee),
+            'm': max_entrants,
+            'nt': generator.randint(0, max_entrants),
+            'a': entry_fee,
+            'gameType': generator.choice(GAME_TYPES),
+            'sdstring': generator.choice(START_TIMES),
+            's': 1,
+            'po': entry_fee * max_entrants * 0.9,
+        })
+    return contests
+
+
+def generate_lobby_payload(count: int, sport: str = "NFL", seed: int = 42) -> Dict[str, Any]:
+    return {'Contests': generate_lobby_contests(count, sport, seed)}
+
+
+def load_sample_contest_details() -> str:
+    with open(SAMPLE_DETAILS_PATH, encoding='utf-8') as sample_file:
+        return sample_file.read()
+
+
+def generate_contest_details_page(entrant_count: int, max_entrants: int = None, seed: int = 42, template: str = None) -> str:
+    # Rewrites the header counts and the entrants table of the recorded
+    # sample page, so everything else on the page stays realistic
+    generator = random.Random(seed)
+    page = template or load_sample_contest_details()
+    max_entrants = max_entrants or entrant_count + 1
+
+    rows = []
+    for row_start in range(0, max_entrants, 3):
+        cells = []
+        for index in range(row_start, min(row_start + 3, max_entrants)):
+            if index < entrant_count:
+                username = f"entrant{seed}_{index}"
+                level = generator.choice([1, 2, 3, 4, 5])
+                cells.append(
+                    f'<td data-un="{username}"><span title="{username}" class="entrant-username">{username}</span> '
+                    f'<span title="Experience Badge" class="icon-experienced-user-{level}"></span></td>'
+                )
+            else:
+                cells.append('<td data-un="" class="empty-user">&nbsp;</td>')
+        rows.append('<tr>\n' + '\n'.join(cells) + '\n</tr>')
+
+    page = ENTRANTS_TBODY_PATTERN.sub(lambda match: match.group(1) + '\n'.join(rows) + match.group(3), page, count=1)
+    page = page.replace('<span class="contest-entries">7</span>', f'<span class="contest-entries">{entrant_count}</span>', 1)
+    page = page.replace('<span data-test-id="contest-seats">11</span>', f'<span data-test-id="contest-seats">{max_entrants}</span>', 1)
+    return page
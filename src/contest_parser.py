@@ -0,0 +1,266 @@
+import logging
+from typing import List, Dict, Any, Callable, Iterable, Optional, Union
+from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Parsing lives in module-level functions so the raw detail HTML can be sent
+# to worker processes; everything here must stay picklable
+
+
+def parse_contest_details_html(html: str) -> Dict[str, Any]:
+    soup = BeautifulSoup(html, 'lxml')
+    contest_data = parse_contest_details(soup)
+    if not contest_data:
+        return {}
+    return contest_data
+
+
+def parse_contest_details_pages(pages: List[str], backend: str = 'soup') -> List[Dict[str, Any]]:
+    parse_html = PARSER_BACKENDS[backend]
+    return [parse_html(html) for html in pages]
+
+
+def parse_contest_details(soup: BeautifulSoup) -> Dict[str, Any]:
+    try:
+        contest_info = extract_contest_info(soup)
+        participants = extract_participants(soup)
+
+        # A contest nobody has entered yet has an empty entrants table; {}
+        # is kept for pages that could not be read
+        if not contest_info:
+            return {}
+
+        parsed_data = {
+            'title': contest_info.get('name', ''),
+            'entry_fee': parse_currency(contest_info.get('entry_fee', '0')),
+            'total_prizes': parse_currency(contest_info.get('total_prizes', '0')),
+            'entries': {
+                'current': parse_int_value(contest_info.get('entries', '0')),
+                'maximum': parse_int_value(contest_info.get('max_entries', '0'))
+            },
+            'participants': participants
+        }
+        return parsed_data
+    except Exception as e:
+        logger.error(f"Error in parse_contest_details: {e}", exc_info=True)
+        return {}
+
+
+def parse_int_value(value: str) -> int:
+    try:
+        return int(value.replace(',', ''))
+    except ValueError:
+        if 'K' in value:
+            return int(float(value.replace('K', '')) * 1000)
+        elif 'M' in value:
+            return int(float(value.replace('M', '')) * 1000000)
+        else:
+            logger.warning(f"Unable to parse int value: {value}")
+            return 0
+
+
+def extract_contest_info(soup: BeautifulSoup) -> Dict[str, str]:
+    return {
+        'name': soup.select_one('h2[data-test-id="contest-name"]').text.strip(),
+        'entries': soup.select_one('span.contest-entries').text.strip(),
+        'max_entries': soup.select_one('span[data-test-id="contest-seats"]').text.strip(),
+        'entry_fee': soup.select_one('p[data-test-id="contest-entry-fee"]').text.strip(),
+        'total_prizes': soup.select_one('p[data-test-id="contest-total-prizes"]').text.strip(),
+    }
+
+
+def extract_participants(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    participants = []
+    entrants_table = soup.select_one('table#entrants-table')
+
+    if entrants_table:
+        for cell in entrants_table.select('td:not(.empty-user)'):
+            username = cell.select_one('span.entrant-username').text.strip()
+            experience_icon = cell.select_one('span[class^="icon-experienced-user-"]')
+            experience_level = map_experience_level(experience_icon['class'][0].split('-')[-1] if experience_icon else '0')
+
+            participants.append({
+                'username': username,
+                'experience_level': experience_level
+            })
+
+    return participants
+
+
+def parse_currency(value: str) -> float:
+    return float(value.replace('$', '').replace(',', ''))
+
+
+def map_experience_level(level: str) -> int:
+    level_map = {
+        '0': 0,
+        '1': 1,
+        '2': 2,
+        '3': 3,
+        '4': 3,
+        '5': 3
+    }
+    return level_map.get(level, 0)
+
+
+def _has_class_xpath(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# The lxml backend reads only the header fields and the entrants table with
+# precompiled XPath instead of building a BeautifulSoup tree and running CSS
+# selectors per cell. It returns exactly what parse_contest_details_html does
+CONTEST_INFO_XPATHS = {
+    'name': etree.XPath('(//h2[@data-test-id="contest-name"])[1]'),
+    'entries': etree.XPath(f'(//span[{_has_class_xpath("contest-entries")}])[1]'),
+    'max_entries': etree.XPath('(//span[@data-test-id="contest-seats"])[1]'),
+    'entry_fee': etree.XPath('(//p[@data-test-id="contest-entry-fee"])[1]'),
+    'total_prizes': etree.XPath('(//p[@data-test-id="contest-total-prizes"])[1]'),
+}
+ENTRANTS_TABLE_XPATH = etree.XPath('(//table[@id="entrants-table"])[1]')
+ENTRANT_CELLS_XPATH = etree.XPath(f'.//td[not({_has_class_xpath("empty-user")})]')
+ENTRANT_USERNAME_XPATH = etree.XPath(f'(.//span[{_has_class_xpath("entrant-username")}])[1]')
+EXPERIENCE_ICON_XPATH = etree.XPath('(.//span[starts-with(@class, "icon-experienced-user-")])[1]/@class')
+
+
+def parse_contest_details_html_lxml(html: str) -> Dict[str, Any]:
+    try:
+        document = lxml.html.document_fromstring(html)
+        contest_info = {}
+        for field, xpath in CONTEST_INFO_XPATHS.items():
+            elements = xpath(document)
+            if not elements:
+                raise ValueError(f"Missing contest field {field}")
+            contest_info[field] = elements[0].text_content().strip()
+
+        participants = []
+        entrants_tables = ENTRANTS_TABLE_XPATH(document)
+        if entrants_tables:
+            for cell in ENTRANT_CELLS_XPATH(entrants_tables[0]):
+                username_elements = ENTRANT_USERNAME_XPATH(cell)
+                if not username_elements:
+                    raise ValueError("Entrant cell without a username")
+                icon_classes = EXPERIENCE_ICON_XPATH(cell)
+                level = icon_classes[0].split()[0].split('-')[-1] if icon_classes else '0'
+                participants.append({
+                    'username': username_elements[0].text_content().strip(),
+                    'experience_level': map_experience_level(level)
+                })
+
+        return dict(_contest_header(contest_info), participants=participants)
+    except Exception as e:
+        logger.error(f"Error in parse_contest_details_html_lxml: {e}")
+        return {}
+
+
+def _contest_header(contest_info: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        'title': contest_info['name'],
+        'entry_fee': parse_currency(contest_info['entry_fee']),
+        'total_prizes': parse_currency(contest_info['total_prizes']),
+        'entries': {
+            'current': parse_int_value(contest_info['entries']),
+            'maximum': parse_int_value(contest_info['max_entries'])
+        },
+    }
+
+
+def _contest_info_field(element) -> Optional[str]:
+    if element.tag == 'h2' and element.get('data-test-id') == 'contest-name':
+        return 'name'
+    if element.tag == 'span' and 'contest-entries' in element.get('class', '').split():
+        return 'entries'
+    if element.tag == 'span' and element.get('data-test-id') == 'contest-seats':
+        return 'max_entries'
+    if element.tag == 'p' and element.get('data-test-id') == 'contest-entry-fee':
+        return 'entry_fee'
+    if element.tag == 'p' and element.get('data-test-id') == 'contest-total-prizes':
+        return 'total_prizes'
+    return None
+
+
+def _is_in_entrants_table(cell) -> bool:
+    return any(table.get('id') == 'entrants-table' for table in cell.iterancestors('table'))
+
+
+def stream_contest_details(chunks: Iterable[Union[bytes, str]], make_evaluator: Callable[[Dict[str, Any]], Any] = None) -> Dict[str, Any]:
+    # Incremental parse of a detail page: header fields are picked up as their
+    # elements close, and every entrant cell is handed to the evaluator built
+    # from the header. The parse (and the download behind chunks) stops as
+    # soon as evaluator.add() reports that the outcome is settled. The result
+    # has the same shape as parse_contest_details_html plus 'complete', which
+    # is False when the entrants list was cut short
+    try:
+        parser = etree.HTMLPullParser(events=('end',))
+        # Same element classes as lxml.html so text_content() works here too
+        parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+        contest_info = {}
+        contest_data = None
+        evaluator = None
+        entrants_table_done = False
+
+        def handle_events():
+            nonlocal contest_data, evaluator, entrants_table_done
+            for _, element in parser.read_events():
+                if entrants_table_done:
+                    continue
+                if element.tag == 'table' and element.get('id') == 'entrants-table':
+                    entrants_table_done = True
+                    continue
+                if element.tag != 'td':
+                    field = _contest_info_field(element)
+                    if field and field not in contest_info:
+                        contest_info[field] = element.text_content().strip()
+                    continue
+                if 'empty-user' in element.get('class', '').split() or not _is_in_entrants_table(element):
+                    continue
+
+                if contest_data is None:
+                    contest_data = dict(_contest_header(contest_info), participants=[])
+                    evaluator = make_evaluator(contest_data) if make_evaluator else None
+
+                username_elements = ENTRANT_USERNAME_XPATH(element)
+                if not username_elements:
+                    raise ValueError("Entrant cell without a username")
+                icon_classes = EXPERIENCE_ICON_XPATH(element)
+                level = icon_classes[0].split()[0].split('-')[-1] if icon_classes else '0'
+                participant = {
+                    'username': username_elements[0].text_content().strip(),
+                    'experience_level': map_experience_level(level)
+                }
+                contest_data['participants'].append(participant)
+                element.clear()
+                if evaluator is not None and evaluator.add(participant):
+                    return True
+            return False
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            if handle_events():
+                contest_data['complete'] = False
+                return contest_data
+            if entrants_table_done:
+                break
+        if not entrants_table_done:
+            parser.close()
+            if handle_events():
+                contest_data['complete'] = False
+                return contest_data
+
+        if contest_data is None:
+            # No entrants yet; a page without the header fields raises here
+            contest_data = dict(_contest_header(contest_info), participants=[])
+        contest_data['complete'] = True
+        return contest_data
+    except Exception as e:
+        logger.error(f"Error in stream_contest_details: {e}")
+        return {}
+
+
+PARSER_BACKENDS = {
+    'soup': parse_contest_details_html,
+    'lxml': parse_contest_details_html_lxml,
+}
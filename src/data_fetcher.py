@@ -1,234 +1,719 @@
+import json
 import time
 import random
-from typing import List, Dict, Any
+import asyncio
+import threading
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 import requests
+import httpx
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from .contest_parser import (
+    PARSER_BACKENDS,
+    parse_contest_details_pages,
+    parse_contest_details,
+    parse_int_value,
+    extract_contest_info,
+    extract_participants,
+    parse_currency,
+    map_experience_level,
+    stream_contest_details,
+)
+from .detail_cache import DetailCache
+from .filter_engine import CompiledContestFilter
+from .hedging import HedgePolicy
+from .lobby_stream import CountingReader, stream_lobby_contests
+from .metrics import metrics
+from .rate_limiter import AdaptiveRateController, CircuitBreaker, TokenBucket, jittered_backoff, parse_retry_after
 from .utils import with_spinner
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class CircuitOpenError(requests.RequestException):
+    pass
+
 class DataFetcher:
     BASE_URL = "https://www.draftkings.com"
     LOBBY_URL = f"{BASE_URL}/lobby/getcontests"
     CONTEST_DETAILS_URL = f"{BASE_URL}/contest/detailspop?contestId={{}}"
+    STREAM_CHUNK_SIZE = 16384
+    LOBBY_ACCEPT_ENCODING = "gzip, deflate"
     SUPPORTED_SPORTS = ["NFL"]
+    FETCH_MODES = ["threads", "async"]
+    LOBBY_DECODE_MODES = ["full", "stream"]
+    # 429 and 503 mean DraftKings wants us to slow down; the other 5xx are
+    # only retried
+    THROTTLE_STATUS_CODES = {429, 503}
+    TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
     
-    def __init__(self, min_delay: float = 1.0, max_delay: float = 3.0, max_workers: int = 5):
+    def __init__(self, min_delay: float = 1.0, max_delay: float = 3.0, max_workers: int = 5,
+                 fetch_mode: str = "threads", requests_per_second: float = 0.5, burst: int = 1,
+                 max_in_flight: int = 5, parse_workers: int = 0, parse_chunksize: int = 4,
+                 parser_backend: str = "soup", detail_cache: DetailCache = None,
+                 lobby_decode: str = "full", lobby_filter_rules: Dict[str, Any] = None,
+                 sports: List[str] = None, lobby_workers: int = 1, adaptive_rate: bool = False,
+                 min_rate: float = 0.1, max_rate: float = 5.0, max_retries: int = 2,
+                 breaker_threshold: int = 5, breaker_cool_down: float = 60.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 15.0,
+                 hedge_percentile: float = None, hedge_max_fraction: float = 0.05, base_url: str = None):
+        if fetch_mode not in self.FETCH_MODES:
+            raise ValueError(f"fetch_mode must be one of {self.FETCH_MODES}")
+        if lobby_decode not in self.LOBBY_DECODE_MODES:
+            raise ValueError(f"lobby_decode must be one of {self.LOBBY_DECODE_MODES}")
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"parser_backend must be one of {list(PARSER_BACKENDS)}")
+        if base_url:
+            # e.g. a local stand-in for load tests; overrides the class URLs
+            # for this fetcher only
+            self.BASE_URL = base_url.rstrip("/")
+            self.LOBBY_URL = f"{self.BASE_URL}/lobby/getcontests"
+            self.CONTEST_DETAILS_URL = f"{self.BASE_URL}/contest/detailspop?contestId={{}}"
         self.min_delay = min_delay
         self.max_delay = max_delay
         self.last_request_time = 0
+        self.request_lock = threading.Lock()
         self.max_workers = max_workers
         self.session = requests.Session()
+        self.fetch_mode = fetch_mode
+        self.max_in_flight = max_in_flight
+        # With adaptive_rate every request is paced by a token bucket whose
+        # rate follows DraftKings' responses instead of the random delay
+        self.adaptive_rate = adaptive_rate
+        if adaptive_rate:
+            self.rate_limiter = AdaptiveRateController(requests_per_second, burst, min_rate=min_rate, max_rate=max_rate)
+        else:
+            self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.retries = 0
+        self.circuit_breaker = CircuitBreaker(breaker_threshold, breaker_cool_down)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # With a hedge_percentile, a detail request still pending after that
+        # latency percentile gets a duplicate and the first response wins
+        self.hedge_policy = HedgePolicy(hedge_percentile, hedge_max_fraction) if hedge_percentile else None
+        self.hedge_pool = None
+        self.parse_workers = parse_workers
+        # Pages per process-pool task in fetch_multiple_contest_details
+        self.parse_chunksize = parse_chunksize
+        self.parser_backend = parser_backend
+        self.parse_pool = None
+        self.parse_pool_lock = threading.Lock()
+        self.detail_cache = detail_cache
+        # ETag/Last-Modified per sport from the last lobby that was processed
+        self.lobby_validators = {}
+        self.lobby_metrics = {}
+        self.lobby_lock = threading.Lock()
+        # In stream mode the lobby is decoded contest by contest and the cheap
+        # filter rules drop most contests before they are ever collected
+        self.lobby_decode = lobby_decode
+        self.lobby_prefilter = CompiledContestFilter(lobby_filter_rules)
+        self.sports = list(sports) if sports else list(self.SUPPORTED_SPORTS)
+        # With more than one lobby worker the lobbies are fetched concurrently
+        # and paced by the token bucket shared with the detail requests
+        # instead of the one-at-a-time delay
+        self.lobby_workers = lobby_workers
 
     def _construct_url(self, sport: str) -> str:
         return f"{self.LOBBY_URL}?sport={sport}"
 
     def _wait_between_requests(self):
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        delay = random.uniform(self.min_delay, self.max_delay)
-        
-        if time_since_last_request < delay:
-            wait_time = delay - time_since_last_request
-            time.sleep(wait_time)
-        else:
-            time.sleep(0.01)  # Ensure a small delay even if enough time has passed
-        
-        self.last_request_time = time.time()
+        if self.adaptive_rate:
+            self.rate_limiter.acquire()
+            return
+        # Worker threads share last_request_time, so the check and the update
+        # have to happen under one lock or the pacing is not enforced
+        with self.request_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self.last_request_time
+            delay = random.uniform(self.min_delay, self.max_delay)
+            
+            if time_since_last_request < delay:
+                wait_time = delay - time_since_last_request
+                time.sleep(wait_time)
+            else:
+                time.sleep(0.01)  # Ensure a small delay even if enough time has passed
+            
+            self.last_request_time = time.time()
+
+    def _try_wait_between_requests(self) -> bool:
+        # Non-blocking _wait_between_requests: True, with the request counted
+        # against the same pacing, only if one may go out right now
+        if self.adaptive_rate:
+            return self.rate_limiter.try_acquire()
+        with self.request_lock:
+            current_time = time.time()
+            if current_time - self.last_request_time < random.uniform(self.min_delay, self.max_delay):
+                return False
+            self.last_request_time = current_time
+            return True
 
     @with_spinner("\nFetching contests for sport", spinner_type="dots")
-    def fetch_contests(self, sport: str) -> List[Dict[str, Any]]:
-        if sport not in self.SUPPORTED_SPORTS:
+    def fetch_contests(self, sport: str) -> Optional[List[Dict[str, Any]]]:
+        return self._fetch_contests(sport)
+
+    def _fetch_contests(self, sport: str) -> Optional[List[Dict[str, Any]]]:
+        # Returns None when there is no new lobby: DraftKings answered 304,
+        # i.e. the lobby has not changed since the last one that was fetched,
+        # or the request failed. An empty list would read as every contest
+        # having left the lobby
+        if sport not in self.sports:
             return []
         
         url = self._construct_url(sport)
-        self._wait_between_requests()
 
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
-            contests = data.get("Contests", [])
+            stream = self.lobby_decode == "stream"
+            with metrics.timed("lobby_fetch"):
+                response = self._get(url, self._pace_lobby_request, headers=self._lobby_request_headers(sport), stream=stream)
+                try:
+                    if response.status_code == 304:
+                        self._record_lobby_metrics(sport, not_modified=True)
+                        return None
+                    response.raise_for_status()
+                    if stream:
+                        contests = self._decode_lobby_stream(sport, response)
+                    else:
+                        contests = self._decode_lobby(sport, response)
+                finally:
+                    response.close()
+            self._store_lobby_validators(sport, response.headers)
             return contests
         except requests.RequestException as e:
             logger.error(f"Error fetching contests: {e}")
-            return []
+            return None
         except Exception as e:
             logger.error(f"Unexpected error in fetch_contests: {e}", exc_info=True)
-            return []
+            return None
+
+    def _decode_lobby(self, sport: str, response) -> List[Dict[str, Any]]:
+        decode_start = time.perf_counter()
+        data = json.loads(response.content)
+        decode_seconds = time.perf_counter() - decode_start
+        self._record_lobby_metrics(sport, not_modified=False, body_bytes=len(response.content),
+                                   wire_bytes=int(response.headers.get("Content-Length") or len(response.content)),
+                                   decode_seconds=decode_seconds)
+        return data.get("Contests", [])
+
+    def _decode_lobby_stream(self, sport: str, response) -> List[Dict[str, Any]]:
+        # The body is read straight off the socket, so decode_seconds here
+        # includes the time spent waiting for the download
+        response.raw.decode_content = True
+        reader = CountingReader(response.raw)
+        decode_start = time.perf_counter()
+        contests, rejection_counts = stream_lobby_contests(reader, self.lobby_prefilter)
+        decode_seconds = time.perf_counter() - decode_start
+        self._record_lobby_metrics(sport, not_modified=False, body_bytes=reader.bytes_read,
+                                   wire_bytes=int(response.headers.get("Content-Length") or reader.bytes_read),
+                                   decode_seconds=decode_seconds, prefiltered=sum(rejection_counts.values()))
+        logger.info(f"{sport} lobby prefilter rejections: {rejection_counts}")
+        return contests
+
+    def _lobby_request_headers(self, sport: str) -> Dict[str, str]:
+        headers = {"Accept-Encoding": self.LOBBY_ACCEPT_ENCODING}
+        with self.lobby_lock:
+            validators = self.lobby_validators.get(sport, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def _store_lobby_validators(self, sport: str, response_headers) -> None:
+        validators = {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+        }
+        with self.lobby_lock:
+            self.lobby_validators[sport] = validators
+
+    def forget_lobby_validators(self, sport: str = None) -> None:
+        # The next lobby request is unconditional, e.g. so contests whose
+        # detail fetch failed are picked up again even if the lobby is unchanged
+        with self.lobby_lock:
+            if sport is None:
+                self.lobby_validators = {}
+            else:
+                self.lobby_validators.pop(sport, None)
+
+    def _record_lobby_metrics(self, sport: str, not_modified: bool, body_bytes: int = 0, wire_bytes: int = 0,
+                              decode_seconds: float = 0.0, prefiltered: int = 0) -> None:
+        with self.lobby_lock:
+            metrics = self.lobby_metrics.setdefault(sport, {
+                "requests": 0, "not_modified": 0, "body_bytes": 0, "wire_bytes": 0, "decode_seconds": 0.0,
+                "prefiltered": 0, "last_body_bytes": 0, "last_wire_bytes": 0, "last_decode_seconds": 0.0,
+            })
+            metrics["requests"] += 1
+            metrics["prefiltered"] += prefiltered
+            if not_modified:
+                metrics["not_modified"] += 1
+            metrics["body_bytes"] += body_bytes
+            metrics["wire_bytes"] += wire_bytes
+            metrics["decode_seconds"] += decode_seconds
+            metrics["last_body_bytes"] = body_bytes
+            metrics["last_wire_bytes"] = wire_bytes
+            metrics["last_decode_seconds"] = decode_seconds
+
+    def get_lobby_metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self.lobby_lock:
+            return {sport: dict(metrics) for sport, metrics in self.lobby_metrics.items()}
+
+    def _get(self, url: str, pace: Callable[[], None], detail: bool = False, skip_first_pace: bool = False, **kwargs) -> requests.Response:
+        # Every GET goes through here: pacing, retries of transient failures
+        # with jittered backoff, feedback to the adaptive rate and, for
+        # detail pages, the circuit breaker. The last failed response is
+        # returned so callers' raise_for_status() still reports it
+        attempt = 0
+        while True:
+            if detail and not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuit breaker open, skipping {url}")
+            try:
+                if attempt > 0 or not skip_first_pace:
+                    pace()
+                response = self.session.get(url, timeout=(self.connect_timeout, self.read_timeout), **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self._after_transport_error(url, e, detail, attempt)
+                if delay is None:
+                    raise
+            except BaseException:
+                # Any other error still ends the attempt; the breaker has to
+                # hear about it or a half-open trial would never finish
+                self._record_request_failure(detail)
+                raise
+            else:
+                delay = self._after_response(url, response.status_code, response.headers, detail, attempt)
+                if delay is None:
+                    return response
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    async def _get_async(self, client: httpx.AsyncClient, url: str, skip_first_pace: bool = False) -> httpx.Response:
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuit breaker open, skipping {url}")
+            try:
+                if attempt > 0 or not skip_first_pace:
+                    await self.rate_limiter.acquire_async()
+                response = await client.get(url)
+            except httpx.TransportError as e:
+                delay = self._after_transport_error(url, e, True, attempt)
+                if delay is None:
+                    raise
+            except asyncio.CancelledError:
+                self.circuit_breaker.record_cancelled()
+                raise
+            except BaseException:
+                self._record_request_failure(True)
+                raise
+            else:
+                delay = self._after_response(url, response.status_code, response.headers, True, attempt)
+                if delay is None:
+                    return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _get_detail_page(self, url: str) -> requests.Response:
+        if self.hedge_policy is None:
+            return self._get(url, self._wait_between_requests, detail=True)
+        self._wait_between_requests()
+        return self._hedged_get(url)
+
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        with self.parse_pool_lock:
+            if self.hedge_pool is None:
+                self.hedge_pool = ThreadPoolExecutor(max_workers=self.max_workers * 2)
+            return self.hedge_pool
+
+    def _hedged_get(self, url: str) -> requests.Response:
+        # The primary is already paced; a hedge only goes out if the same
+        # pacing allows another request right now. requests cannot abort a
+        # read in progress, so the losing request is left to finish and its
+        # response closed as soon as it arrives
+        policy = self.hedge_policy
+        policy.record_request()
+        pool = self._get_hedge_pool()
+        started = time.monotonic()
+        primary = pool.submit(self._get, url, self._wait_between_requests, True, True)
+        pending = {primary}
+        delay = policy.hedge_delay()
+        if delay is not None:
+            done, _ = wait(pending, timeout=delay)
+            if not done and policy.try_start_hedge(self._try_wait_between_requests):
+                logger.debug(f"Hedging {url} after {delay:.2f}s")
+                pending.add(pool.submit(self._get, url, self._wait_between_requests, True, True))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    if not loser.cancel():
+                        loser.add_done_callback(self._close_losing_response)
+                policy.record_result(time.monotonic() - started, hedge_won=future is not primary)
+                return future.result()
+        raise error
+
+    @staticmethod
+    def _close_losing_response(future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+    async def _hedged_get_async(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        # Async requests are always paced by the token bucket, so that is
+        # the budget a hedge has to fit in
+        policy = self.hedge_policy
+        policy.record_request()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._get_async(client, url))
+        pending = {primary}
+        delay = policy.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and policy.try_start_hedge(self.rate_limiter.try_acquire):
+                logger.debug(f"Hedging {url} after {delay:.2f}s")
+                pending.add(asyncio.ensure_future(self._get_async(client, url, skip_first_pace=True)))
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                # httpx requests can be cancelled mid-flight; a cancelled
+                # half-open trial reopens the breaker in _get_async
+                for loser in pending:
+                    loser.cancel()
+                policy.record_result(time.monotonic() - started, hedge_won=task is not primary)
+                return task.result()
+        raise error
+
+    def _after_response(self, url: str, status_code: int, headers, detail: bool, attempt: int) -> Optional[float]:
+        # Records the outcome of a response and returns how long to wait
+        # before retrying, or None when the response is final
+        if status_code not in self.TRANSIENT_STATUS_CODES:
+            self._record_request_success(detail)
+            return None
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if status_code in self.THROTTLE_STATUS_CODES and self.adaptive_rate:
+            self.rate_limiter.on_throttle(retry_after)
+        self._record_request_failure(detail)
+        if attempt >= self.max_retries:
+            return None
+        delay = jittered_backoff(attempt, retry_after=retry_after)
+        logger.warning(f"Retrying {url} in {delay:.1f}s after HTTP {status_code}")
+        self._count_retry()
+        return delay
+
+    def _after_transport_error(self, url: str, error: Exception, detail: bool, attempt: int) -> Optional[float]:
+        self._record_request_failure(detail)
+        if attempt >= self.max_retries:
+            return None
+        delay = jittered_backoff(attempt)
+        logger.warning(f"Retrying {url} in {delay:.1f}s after {error}")
+        self._count_retry()
+        return delay
+
+    def _count_retry(self) -> None:
+        with self.request_lock:
+            self.retries += 1
+
+    def _record_request_success(self, detail: bool) -> None:
+        if self.adaptive_rate:
+            self.rate_limiter.on_success()
+        if detail:
+            self.circuit_breaker.record_success()
+
+    def _record_request_failure(self, detail: bool) -> None:
+        if detail:
+            self.circuit_breaker.record_failure()
+
+    def get_rate_metrics(self) -> Dict[str, Any]:
+        metrics = {"rate": self.rate_limiter.rate, "retries": self.retries}
+        if self.adaptive_rate:
+            metrics.update(self.rate_limiter.get_metrics())
+        metrics["circuit_breaker"] = self.circuit_breaker.get_metrics()
+        if self.hedge_policy is not None:
+            metrics["hedging"] = self.hedge_policy.get_metrics()
+        return metrics
+
+    def _pace_lobby_request(self) -> None:
+        if self.lobby_workers > 1:
+            self.rate_limiter.acquire()
+        else:
+            self._wait_between_requests()
 
     @with_spinner("\nFetching all contests", spinner_type="dots")
     def fetch_all_contests(self) -> Dict[str, List[Dict[str, Any]]]:
-        all_contests = {}
-        for sport in self.SUPPORTED_SPORTS:
-            try:
-                all_contests[sport] = self.fetch_contests(sport)
-            except Exception as e:
-                logger.error(f"Error fetching contests for sport {sport}: {e}", exc_info=True)
-        return all_contests
+        return dict(self.iter_all_contests())
+
+    def iter_all_contests(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        # Yields (sport, contests) as each lobby arrives. Sports whose lobby
+        # is unchanged or could not be fetched are left out, so nothing
+        # downstream filters, diffs or prunes them
+        if self.lobby_workers <= 1:
+            for sport in self.sports:
+                try:
+                    contests = self.fetch_contests(sport)
+                except Exception as e:
+                    logger.error(f"Error fetching contests for sport {sport}: {e}", exc_info=True)
+                    continue
+                if contests is None:
+                    logger.info(f"No new {sport} lobby, skipping")
+                    continue
+                yield sport, contests
+            return
+
+        with ThreadPoolExecutor(max_workers=self.lobby_workers) as executor:
+            future_to_sport = {executor.submit(self._fetch_contests, sport): sport for sport in self.sports}
+            for future in as_completed(future_to_sport):
+                sport = future_to_sport[future]
+                try:
+                    contests = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching contests for sport {sport}: {e}", exc_info=True)
+                    continue
+                if contests is None:
+                    logger.info(f"No new {sport} lobby, skipping")
+                    continue
+                yield sport, contests
 
     @with_spinner("\nFetching contest details", spinner_type="dots")
-    def fetch_contest_details(self, contest_id: str) -> Dict[str, Any]:
+    def fetch_contest_details(self, contest_id: str, entry_count: Optional[int] = None) -> Dict[str, Any]:
+        # entry_count is the lobby's current entry count; a cached page with
+        # a different count is stale and fetched again
+        cached_details = self._get_cached_details(contest_id, entry_count)
+        if cached_details is not None:
+            return cached_details
+        html = self._fetch_contest_html(contest_id)
+        if html is None:
+            return {}
+        try:
+            contest_details = self._parse_contest_html(html)
+        except Exception as e:
+            logger.error(f"Unexpected error in fetch_contest_details: {e}", exc_info=True)
+            return {}
+        self._cache_details(contest_id, contest_details)
+        return contest_details
+
+    def _get_cached_details(self, contest_id: str, entry_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if self.detail_cache is None:
+            return None
+        return self.detail_cache.get(contest_id, entry_count)
+
+    def _cache_details(self, contest_id: str, contest_details: Dict[str, Any]) -> None:
+        if self.detail_cache is not None and contest_details:
+            self.detail_cache.put(contest_id, contest_details)
+
+    def fetch_contest_details_streaming(self, contest_id: str, make_evaluator: Callable[[Dict[str, Any]], Any],
+                                        entry_count: Optional[int] = None) -> Dict[str, Any]:
+        # Parses the page while it downloads and closes the connection as
+        # soon as the evaluator has settled the contest's outcome
+        cached_details = self._get_cached_details(contest_id, entry_count)
+        if cached_details is not None:
+            cached_details['complete'] = True
+            return cached_details
         url = self.CONTEST_DETAILS_URL.format(contest_id)
-        self._wait_between_requests()
 
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            contest_data = self._parse_contest_details(soup)
-            if not contest_data:
-                return {}
-            return contest_data
+            # Parsing overlaps the download here, so both count as detail_fetch
+            with metrics.timed("detail_fetch"):
+                response = self._get(url, self._wait_between_requests, detail=True, stream=True)
+                try:
+                    response.raise_for_status()
+                    contest_details = stream_contest_details(response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE), make_evaluator)
+                finally:
+                    response.close()
+            # A page cut short has only part of the entrants, so only complete
+            # parses are cached
+            if contest_details.get('complete'):
+                self._cache_details(contest_id, {key: value for key, value in contest_details.items() if key != 'complete'})
+            return contest_details
         except requests.RequestException as e:
             logger.error(f"Error fetching contest details: {e}")
             return {}
         except Exception as e:
-            logger.error(f"Unexpected error in fetch_contest_details: {e}", exc_info=True)
+            logger.error(f"Unexpected error in fetch_contest_details_streaming: {e}", exc_info=True)
             return {}
 
-    def _parse_contest_details(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _fetch_contest_html(self, contest_id: str) -> Optional[str]:
+        url = self.CONTEST_DETAILS_URL.format(contest_id)
+
         try:
-            contest_info = self._extract_contest_info(soup)
-            participants = self._extract_participants(soup)
-            
-            if not contest_info or participants is None:
-                return {}
-            
-            parsed_data = {
-                'title': contest_info.get('name', ''),
-                'entry_fee': self._parse_currency(contest_info.get('entry_fee', '0')),
-                'total_prizes': self._parse_currency(contest_info.get('total_prizes', '0')),
-                'entries': {
-                    'current': int(contest_info.get('entries', '0')),
-                    'maximum': int(contest_info.get('max_entries', '0'))
-                },
-                'participants': participants
-            }
-            return parsed_data
+            with metrics.timed("detail_fetch"):
+                response = self._get_detail_page(url)
+                response.raise_for_status()
+                return response.text
+        except requests.RequestException as e:
+            logger.error(f"Error fetching contest details: {e}")
+            return None
         except Exception as e:
-            logger.error(f"Error in _parse_contest_details: {e}", exc_info=True)
-            return {}
+            logger.error(f"Unexpected error in _fetch_contest_html: {e}", exc_info=True)
+            return None
 
-    def _extract_contest_info(self, soup: BeautifulSoup) -> Dict[str, str]:
-        contest_info = {}
-        try:
-            contest_info['name'] = soup.select_one('h2[data-test-id="contest-name"]').text.strip()
-            contest_info['entries'] = soup.select_one('span.contest-entries').text.strip()
-            contest_info['max_entries'] = soup.select_one('span[data-test-id="contest-seats"]').text.strip()
-            contest_info['entry_fee'] = soup.select_one('p[data-test-id="contest-entry-fee"]').text.strip()
-            contest_info['total_prizes'] = soup.select_one('p[data-test-id="contest-total-prizes"]').text.strip()
-        except AttributeError as e:
-            logger.error(f"Error extracting contest info: {e}")
-        return contest_info
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        with self.parse_pool_lock:
+            if self.parse_pool is None:
+                self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+            return self.parse_pool
 
-    def _extract_participants(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        participants = []
-        try:
-            entrants_table = soup.select_one('table#entrants-table')
-            if entrants_table:
-                for cell in entrants_table.select('td:not(.empty-user)'):
-                    username = cell.select_one('span.entrant-username').text.strip()
-                    experience_icon = cell.select_one('span[class^="icon-experienced-user-"]')
-                    experience_level = self._map_experience_level(experience_icon['class'][0].split('-')[-1] if experience_icon else '0')
-                    
-                    participants.append({
-                        'username': username,
-                        'experience_level': experience_level
-                    })
-        except Exception as e:
-            logger.error(f"Error extracting participants: {e}")
-        return participants
+    def _parse_contest_html(self, html: str) -> Dict[str, Any]:
+        # BeautifulSoup parsing holds the GIL, so with parse_workers set the
+        # page is parsed in a worker process while this thread just waits.
+        # A single page pays the pickling round trip on its own; batches go
+        # through fetch_multiple_contest_details, which sends chunks
+        parse_html = PARSER_BACKENDS[self.parser_backend]
+        with metrics.timed("parse"):
+            if self.parse_workers > 0:
+                return self._get_parse_pool().submit(parse_html, html).result()
+            return parse_html(html)
+
+    def close(self) -> None:
+        if self.detail_cache is not None:
+            self.detail_cache.close()
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+        if self.hedge_pool is not None:
+            self.hedge_pool.shutdown(wait=False)
+            self.hedge_pool = None
+        self.session.close()
 
     @with_spinner("\nFetching multiple contest details", spinner_type="dots")
-    def fetch_multiple_contest_details(self, contest_ids: List[str]) -> List[Dict[str, Any]]:
+    def fetch_multiple_contest_details(self, contest_ids: List[str], entry_counts: Optional[List[Optional[int]]] = None) -> List[Dict[str, Any]]:
+        # Results line up with contest_ids, with {} for a contest that could
+        # not be fetched; entry_counts are the lobby's counts for the cache
+        if entry_counts is None:
+            entry_counts = [None] * len(contest_ids)
+        if self.fetch_mode == "async":
+            return asyncio.run(self._fetch_multiple_contest_details_async(contest_ids, entry_counts))
+        if self.parse_workers > 0:
+            return self._fetch_multiple_contest_details_with_parse_pool(contest_ids, entry_counts)
+
+        results = [{} for _ in contest_ids]
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_id = {executor.submit(self.fetch_contest_details, contest_id): contest_id for contest_id in contest_ids}
-            results = []
-            for future in as_completed(future_to_id):
-                contest_id = future_to_id[future]
+            future_to_index = {executor.submit(self.fetch_contest_details, contest_id, entry_count): index
+                               for index, (contest_id, entry_count) in enumerate(zip(contest_ids, entry_counts))}
+            for future in as_completed(future_to_index):
+                index = future_to_index[future]
                 try:
-                    data = future.result()
-                    results.append(data)
+                    results[index] = future.result()
                 except Exception as exc:
-                    logger.error(f'{contest_id} generated an exception: {exc}')
+                    logger.error(f'{contest_ids[index]} generated an exception: {exc}')
         return results
 
-    def _parse_contest_details(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        try:
-            contest_info = self._extract_contest_info(soup)
-            participants = self._extract_participants(soup)
-            
-            if not contest_info or not participants:
+    def _fetch_multiple_contest_details_with_parse_pool(self, contest_ids: List[str], entry_counts: List[Optional[int]]) -> List[Dict[str, Any]]:
+        # Threads only download the raw HTML; pages are sent to the process
+        # pool in chunks as they arrive, so parsing overlaps the downloads
+        parse_pool = self._get_parse_pool()
+        results = [{} for _ in contest_ids]
+        to_fetch = []
+        for index, (contest_id, entry_count) in enumerate(zip(contest_ids, entry_counts)):
+            cached_details = self._get_cached_details(contest_id, entry_count)
+            if cached_details is not None:
+                results[index] = cached_details
+            else:
+                to_fetch.append(index)
+
+        parse_futures = []
+        pending_indexes = []
+        pending_pages = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_index = {executor.submit(self._fetch_contest_html, contest_ids[index]): index for index in to_fetch}
+            for future in as_completed(future_to_index):
+                index = future_to_index[future]
+                try:
+                    html = future.result()
+                except Exception as exc:
+                    logger.error(f'{contest_ids[index]} generated an exception: {exc}')
+                    continue
+                if html is None:
+                    continue
+                pending_indexes.append(index)
+                pending_pages.append(html)
+                if len(pending_pages) >= self.parse_chunksize:
+                    parse_futures.append((pending_indexes, parse_pool.submit(parse_contest_details_pages, pending_pages, self.parser_backend)))
+                    pending_indexes = []
+                    pending_pages = []
+        if pending_pages:
+            parse_futures.append((pending_indexes, parse_pool.submit(parse_contest_details_pages, pending_pages, self.parser_backend)))
+
+        for parsed_indexes, parse_future in parse_futures:
+            try:
+                parsed_pages = parse_future.result()
+            except Exception as exc:
+                logger.error(f'Parsing contest details generated an exception: {exc}')
+                continue
+            for index, contest_details in zip(parsed_indexes, parsed_pages):
+                self._cache_details(contest_ids[index], contest_details)
+                results[index] = contest_details
+        return results
+
+    def _create_async_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight)
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        return httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True)
+
+    async def _fetch_multiple_contest_details_async(self, contest_ids: List[str], entry_counts: List[Optional[int]]) -> List[Dict[str, Any]]:
+        # One client for the whole batch, a semaphore to bound the requests in
+        # flight and the shared token bucket to pace them
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._create_async_client() as client:
+            tasks = [self._fetch_contest_details_async(client, semaphore, contest_id, entry_count)
+                     for contest_id, entry_count in zip(contest_ids, entry_counts)]
+            return await asyncio.gather(*tasks)
+
+    async def _fetch_contest_details_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, contest_id: str,
+                                           entry_count: Optional[int] = None) -> Dict[str, Any]:
+        cached_details = self._get_cached_details(contest_id, entry_count)
+        if cached_details is not None:
+            return cached_details
+        url = self.CONTEST_DETAILS_URL.format(contest_id)
+        async with semaphore:
+            try:
+                with metrics.timed("detail_fetch"):
+                    if self.hedge_policy is not None:
+                        response = await self._hedged_get_async(client, url)
+                    else:
+                        response = await self._get_async(client, url)
+                    response.raise_for_status()
+                # Parsing never runs on the event loop: it would stall every
+                # other download in flight until the page is read
+                parse_executor = self._get_parse_pool() if self.parse_workers > 0 else None
+                loop = asyncio.get_running_loop()
+                with metrics.timed("parse"):
+                    contest_details = await loop.run_in_executor(parse_executor, PARSER_BACKENDS[self.parser_backend], response.text)
+                self._cache_details(contest_id, contest_details)
+                return contest_details
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                logger.error(f"Error fetching contest details: {e}")
                 return {}
-            
-            parsed_data = {
-                'title': contest_info.get('name', ''),
-                'entry_fee': self._parse_currency(contest_info.get('entry_fee', '0')),
-                'total_prizes': self._parse_currency(contest_info.get('total_prizes', '0')),
-                'entries': {
-                    'current': self._parse_int_value(contest_info.get('entries', '0')),
-                    'maximum': self._parse_int_value(contest_info.get('max_entries', '0'))
-                },
-                'participants': participants
-            }
-            return parsed_data
-        except Exception as e:
-            logger.error(f"Error in _parse_contest_details: {e}", exc_info=True)
-            return {}
+            except Exception as e:
+                logger.error(f"Unexpected error in _fetch_contest_details_async: {e}", exc_info=True)
+                return {}
+
+
+    def _parse_contest_details(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        return parse_contest_details(soup)
 
     def _parse_int_value(self, value: str) -> int:
-        try:
-            return int(value.replace(',', ''))
-        except ValueError:
-            if 'K' in value:
-                return int(float(value.replace('K', '')) * 1000)
-            elif 'M' in value:
-                return int(float(value.replace('M', '')) * 1000000)
-            else:
-                logger.warning(f"Unable to parse int value: {value}")
-                return 0
+        return parse_int_value(value)
 
     def _extract_contest_info(self, soup: BeautifulSoup) -> Dict[str, str]:
-        return {
-            'name': soup.select_one('h2[data-test-id="contest-name"]').text.strip(),
-            'entries': soup.select_one('span.contest-entries').text.strip(),
-            'max_entries': soup.select_one('span[data-test-id="contest-seats"]').text.strip(),
-            'entry_fee': soup.select_one('p[data-test-id="contest-entry-fee"]').text.strip(),
-            'total_prizes': soup.select_one('p[data-test-id="contest-total-prizes"]').text.strip(),
-        }
+        return extract_contest_info(soup)
 
     def _extract_participants(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        participants = []
-        entrants_table = soup.select_one('table#entrants-table')
-        
-        if entrants_table:
-            for cell in entrants_table.select('td:not(.empty-user)'):
-                username = cell.select_one('span.entrant-username').text.strip()
-                experience_icon = cell.select_one('span[class^="icon-experienced-user-"]')
-                experience_level = self._map_experience_level(experience_icon['class'][0].split('-')[-1] if experience_icon else '0')
-                
-                participants.append({
-                    'username': username,
-                    'experience_level': experience_level
-                })
-        
-        return participants
+        return extract_participants(soup)
 
     def _parse_currency(self, value: str) -> float:
-        return float(value.replace('$', '').replace(',', ''))
+        return parse_currency(value)
 
     def _map_experience_level(self, level: str) -> int:
-        level_map = {
-            '0': 0,
-            '1': 1,
-            '2': 2,
-            '3': 3,
-            '4': 3,
-            '5': 3
-        }
-        return level_map.get(level, 0)
+        return map_experience_level(level)
@@ -1,7 +1,25 @@
-from typing import List, Dict, Any
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+import numpy as np
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from .database_manager import DatabaseManager
+from .filter_engine import CompiledContestFilter, FILTER_BACKENDS, build_filter_rules
+from .lobby_tracker import LOBBY_ENTRIES_KEY, LobbySnapshotStore
+from .metrics import metrics
+from .pipeline import Pipeline, Stage
 from .utils import with_spinner
 
+logger = logging.getLogger(__name__)
+
+# A contest is ready to enter when its highest experience ratio is below the
+# threshold for its size; other sizes use DEFAULT_READY_THRESHOLD (inclusive).
+# Contests re-checked from the database use a looser threshold for 4 entrants
+READY_THRESHOLDS = {3: 0.7, 4: 0.51, 5: 0.61}
+UNPROCESSED_READY_THRESHOLDS = {3: 0.7, 4: 0.8, 5: 0.61}
+DEFAULT_READY_THRESHOLD = 0.3
+
 class ContestFilter:
     @staticmethod
     def filter_by_entrants(contests: Dict[str, List[Dict[str, Any]]], max_entrants: int) -> Dict[str, List[Dict[str, Any]]]:
@@ -23,34 +41,26 @@ class ContestFilter:
         return {sport: [contest for contest in sport_contests if contest.get('gameType') in ['Classic', 'Showdown Captain Mode']]
                 for sport, sport_contests in contests.items()}
 
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _compiled_filter(max_entrants: int, max_entry_fee: float, backend: str = 'python') -> CompiledContestFilter:
+        if backend not in FILTER_BACKENDS:
+            raise ValueError(f"Unknown filter backend: {backend}")
+        return FILTER_BACKENDS[backend](build_filter_rules(max_entrants=max_entrants, max_entry_fee=max_entry_fee))
+
     @classmethod
-    def apply_filters(cls, contests: Dict[str, List[Dict[str, Any]]], max_entrants: int = 5, title_keyword: str = "Double Up", max_entry_fee: float = 110.0) -> Dict[str, List[Dict[str, Any]]]:
-        filtered_by_entrants = {sport: set(contest['id'] for contest in sport_contests)
-                                for sport, sport_contests in cls.filter_by_entrants(contests, max_entrants).items()}
-        
-        filtered_contests = {}
-        excluded_times = ['1:00PM', '4:05PM', '4:15PM', '4:25PM']
-        for sport in contests.keys():
-            filtered_ids = filtered_by_entrants.get(sport, set())
-            filtered_contests[sport] = [
-                contest for contest in contests[sport] 
-                if contest['id'] in filtered_ids 
-                and "casual" not in contest.get('n', '').lower() 
-                and "beginner" not in contest.get('n', '').lower()
-                and "satellite" not in contest.get('n', '').lower()
-                and "madden" not in contest.get('n', '').lower()
-                and "primetime" not in contest.get('n', '').lower()
-                and "turbo" not in contest.get('n', '').lower()
-                and "mon-thu" not in contest.get('n', '').lower()
-                and "mon" not in contest.get('n', '').lower()
-                and float(contest.get('a', 0)) <= max_entry_fee
-                and (contest.get('gameType') == 'Classic' or 
-                     (contest.get('gameType') == 'Showdown Captain Mode' and 
-                      not any(time in contest.get('sdstring', '') for time in excluded_times)))
-            ]
-        
+    def apply_filters(cls, contests: Dict[str, List[Dict[str, Any]]], max_entrants: int = 5, title_keyword: str = "Double Up", max_entry_fee: float = 110.0, backend: str = 'python') -> Dict[str, List[Dict[str, Any]]]:
+        filtered_contests, _ = cls.apply_filters_with_stats(contests, max_entrants, title_keyword, max_entry_fee, backend)
         return filtered_contests
 
+    @classmethod
+    def apply_filters_with_stats(cls, contests: Dict[str, List[Dict[str, Any]]], max_entrants: int = 5, title_keyword: str = "Double Up", max_entry_fee: float = 110.0, backend: str = 'python') -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+        # All rules are compiled once and each lobby contest is checked in a
+        # single pass; the second value holds the per-rule rejection counts.
+        # The 'columnar' backend runs the same rules as vectorized pandas
+        # column operations
+        return cls._compiled_filter(max_entrants, max_entry_fee, backend).apply(contests)
+
 class EntrantAnalyzer:
     @staticmethod
     def categorize_experience_level(level: int) -> int:
@@ -92,82 +102,384 @@ class EntrantAnalyzer:
             "experience_distribution": experience_distribution
         }
 
+    @staticmethod
+    def determine_status(max_entrants: int, highest_experience_ratio: float, thresholds: Dict[int, float] = READY_THRESHOLDS) -> str:
+        if max_entrants in thresholds:
+            return 'ready_to_enter' if highest_experience_ratio < thresholds[max_entrants] else 'processed'
+        return 'ready_to_enter' if highest_experience_ratio <= DEFAULT_READY_THRESHOLD else 'processed'
+
+    @staticmethod
+    def analyze_batch(entrants_by_contest: List[List[Dict[str, Any]]], max_entrants_by_contest: List[int], thresholds: Dict[int, float] = READY_THRESHOLDS) -> List[Dict[str, Any]]:
+        contest_count = len(entrants_by_contest)
+        if contest_count == 0:
+            return []
+
+        entrant_counts = np.fromiter((len(entrants) for entrants in entrants_by_contest), dtype=np.int64, count=contest_count)
+        max_entrants = np.asarray(max_entrants_by_contest, dtype=np.int64)
+        levels = np.fromiter(
+            (entrant.get('experience_level', 0) for entrants in entrants_by_contest for entrant in entrants),
+            dtype=np.int64,
+            count=int(entrant_counts.sum()),
+        )
+        # Same buckets as categorize_experience_level: 0, 1 and 2 stay, anything else is highest
+        levels = np.where((levels >= 0) & (levels <= 2), levels, 3)
+
+        # One bincount over (contest offset, level) pairs counts every contest at once
+        contest_offsets = np.repeat(np.arange(contest_count), entrant_counts)
+        experience_counts = np.bincount(contest_offsets * 4 + levels, minlength=contest_count * 4).reshape(contest_count, 4)
+
+        # Assume all empty slots will be filled with highest experienced entrants
+        experience_counts[:, 3] += max_entrants - entrant_counts
+
+        analyzed = (entrant_counts > 0) & (max_entrants > 0)
+        divisors = np.where(analyzed, max_entrants, 1)
+        distributions = experience_counts / divisors[:, None]
+        ratios = np.where(analyzed, distributions[:, 3], 0.0)
+
+        has_threshold = np.isin(max_entrants, list(thresholds))
+        threshold_values = np.array([thresholds.get(int(size), DEFAULT_READY_THRESHOLD) for size in max_entrants])
+        ready = np.where(has_threshold, ratios < threshold_values, ratios <= DEFAULT_READY_THRESHOLD)
+
+        results = []
+        for index in range(contest_count):
+            if analyzed[index]:
+                experience_distribution = {level: float(distributions[index, level]) for level in range(4)}
+            else:
+                experience_distribution = {}
+            results.append({
+                "highest_experience_ratio": float(ratios[index]),
+                "experience_distribution": experience_distribution,
+                "status": 'ready_to_enter' if ready[index] else 'processed',
+            })
+        return results
+
+class StreamingContestEvaluator:
+    # Takes a contest's entrants one at a time while the detail page is being
+    # parsed and reports when the outcome ('full', 'scooped', 'processed' or
+    # 'ready_to_enter') can no longer change, so the parse can stop early.
+    # expected_entrants is the entry count from the page header; the table is
+    # trusted not to hold more entrants than that. With settle_rejections_early
+    # 'scooped' and 'processed' count as one outcome, so a contest that can no
+    # longer become ready stops even if a blacklisted user might still appear
+    def __init__(self, max_entrants: int, blacklisted_usernames: set, thresholds: Dict[int, float] = READY_THRESHOLDS,
+                 expected_entrants: int = None, settle_rejections_early: bool = False):
+        self.max_entrants = max_entrants
+        self.blacklisted_usernames = blacklisted_usernames
+        self.thresholds = thresholds
+        self.settle_rejections_early = settle_rejections_early
+        if expected_entrants is not None and expected_entrants < max_entrants:
+            self.entrant_bound = expected_entrants
+        else:
+            self.entrant_bound = max_entrants
+        self.participants = []
+        self.non_top_count = 0
+        self.blacklisted_seen = False
+        self.settled = False
+
+    def add(self, participant: Dict[str, Any]) -> bool:
+        self.participants.append(participant)
+        if EntrantAnalyzer.categorize_experience_level(participant.get('experience_level', 0)) < 3:
+            self.non_top_count += 1
+        if participant['username'].lower() in self.blacklisted_usernames:
+            self.blacklisted_seen = True
+        self.settled = len(self.possible_outcomes()) == 1
+        return self.settled
+
+    def _status_for(self, non_top_count: int) -> str:
+        highest_experience_ratio = (self.max_entrants - non_top_count) / self.max_entrants
+        return EntrantAnalyzer.determine_status(self.max_entrants, highest_experience_ratio, self.thresholds)
+
+    def possible_outcomes(self) -> set:
+        count = len(self.participants)
+        if self.max_entrants <= 0 or count >= self.max_entrants:
+            return {'full'}
+
+        remaining = max(0, self.entrant_bound - count)
+        outcomes = set()
+        if count + remaining >= self.max_entrants:
+            outcomes.add('full')
+
+        # Entrants that may still arrive without filling the contest
+        more_without_filling = min(remaining, self.max_entrants - 1 - count)
+        if self.blacklisted_seen:
+            outcomes.add('scooped')
+        else:
+            if self.blacklisted_usernames and more_without_filling > 0:
+                outcomes.add('scooped')
+            # More non-top entrants only lower the ratio, so the extremes
+            # cover every status still reachable
+            outcomes.add(self._status_for(self.non_top_count))
+            outcomes.add(self._status_for(self.non_top_count + more_without_filling))
+
+        if self.settle_rejections_early and 'full' not in outcomes and 'ready_to_enter' not in outcomes:
+            return {'rejected'}
+        return outcomes
+
 class DataProcessor:
-    def __init__(self, data_fetcher):
-        self.db_manager = DatabaseManager()
+    def __init__(self, data_fetcher, fetch_workers: int = None, fetch_batch_size: int = None, analyze_workers: int = 1, persist_workers: int = 2, queue_size: int = 10, filter_backend: str = 'python', analyze_batch_size: int = 50, persist_batch_size: int = 20, track_lobby_changes: bool = True,
+                 early_exit: bool = False, settle_rejections_early: bool = False, sport_workers: int = 4, notifier=None,
+                 notification_ledger=None, supabase=None):
+        self.db_manager = DatabaseManager(notifier=notifier, notification_ledger=notification_ledger, supabase=supabase)
         self.data_fetcher = data_fetcher
         self.blacklisted_usernames = set(["lakergreat2", "theleafnode", "glamrock"])  # Add your blacklisted usernames here
+        self.fetch_workers = fetch_workers or getattr(data_fetcher, 'max_workers', 5)
+        # With fetch_batch_size the fetch stage hands whole batches to
+        # fetch_multiple_contest_details, which is what the async and
+        # parse-pool fetch modes speed up; None fetches one contest per call
+        self.fetch_batch_size = fetch_batch_size
+        self.analyze_workers = analyze_workers
+        self.persist_workers = persist_workers
+        self.queue_size = queue_size
+        self.filter_backend = filter_backend
+        self.analyze_batch_size = analyze_batch_size
+        # None persists one contest per request
+        self.persist_batch_size = persist_batch_size
+        self.lobby_snapshots = LobbySnapshotStore() if track_lobby_changes else None
+        self.last_lobby_deltas = {}
+        # Contests whose fetch or persist failed this cycle; their sport's
+        # next lobby request must not be conditional
+        self.lobby_retry_ids = set()
+        self.lobby_retry_lock = threading.Lock()
+        self.sport_workers = sport_workers
+        # With early_exit the detail page is parsed while it downloads and
+        # dropped once the contest's outcome is settled. The entrants stored
+        # for such a contest are only the ones read up to that point
+        self.early_exit = early_exit
+        self.settle_rejections_early = settle_rejections_early
 
     def has_blacklisted_user(self, entrants: List[Dict[str, Any]]) -> bool:
         return any(entrant['username'].lower() in self.blacklisted_usernames for entrant in entrants)
 
     @with_spinner("\nProcessing contests", spinner_type="dots")
     def process_contests(self, contests: Dict[str, List[Dict[str, Any]]]) -> None:
-        filtered_contests = ContestFilter.apply_filters(contests)
+        self._process_contests(contests)
+
+    @with_spinner("\nProcessing lobbies", spinner_type="dots")
+    def process_lobbies(self, lobbies: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> None:
+        # Each sport is filtered and processed as soon as its lobby arrives,
+        # while the lobbies of the other sports are still downloading
+        with ThreadPoolExecutor(max_workers=self.sport_workers) as executor:
+            future_to_sport = {executor.submit(self._process_contests, {sport: contests}): sport for sport, contests in lobbies}
+            for future in as_completed(future_to_sport):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error processing contests for sport {future_to_sport[future]}: {e}", exc_info=True)
+
+    def _process_contests(self, contests: Dict[str, List[Dict[str, Any]]]) -> None:
+        with metrics.timed("filter"):
+            filtered_contests, rejection_counts = ContestFilter.apply_filters_with_stats(contests, backend=self.filter_backend)
+        logger.info(f"Contest filter rejections: {rejection_counts}")
+        metrics.increment("contests_seen", sum(len(sport_contests) for sport_contests in contests.values()))
+        for rule_name, count in rejection_counts.items():
+            if count:
+                metrics.increment("contests_rejected", count, labels={'rule': rule_name})
 
         total_contests = sum(len(sport_contests) for sport_contests in filtered_contests.values())
         print(f', Found {total_contests} contests')
+
+        if self.lobby_snapshots is not None:
+            filtered_contests = self._select_changed_contests(filtered_contests)
+
+        # Fetch, analyze and persist run as separate stages so network,
+        # CPU and Supabase latency overlap instead of adding up per contest
+        pipeline = Pipeline([
+            self._make_fetch_stage(),
+            Stage("analyze", self._analyze_stage, workers=self.analyze_workers, batch_size=self.analyze_batch_size),
+            self._make_persist_stage(),
+        ], queue_size=self.queue_size)
+        pipeline.run(contest for sport_contests in filtered_contests.values() for contest in sport_contests)
         for sport, sport_contests in filtered_contests.items():
-            for contest in sport_contests:
-                contest_details = self.data_fetcher.fetch_contest_details(contest['id'])
-                if not contest_details:
-                    continue
-                
-                contest.update(contest_details)
-                entrants = contest.pop('participants', [])
-
-                # Check if the contest is already full
-                if len(entrants) >= contest['entries']['maximum']:
-                    continue  # Skip this contest as it's already full
-
-                # Check for blacklisted usernames
-                if self.has_blacklisted_user(entrants):
-                    contest['highest_experience_ratio'] = 1.0
-                    contest['status'] = 'scooped'
-                else:
-                    max_entrants = contest['entries']['maximum']
-                    analysis_result = EntrantAnalyzer.analyze_experience_levels(entrants, max_entrants)
-                    contest.update(analysis_result)
-                    highest_experience_ratio = analysis_result['highest_experience_ratio']
-                
-                    if max_entrants == 3:
-                        contest['status'] = 'ready_to_enter' if highest_experience_ratio < 0.7 else 'processed'
-                    elif max_entrants == 4:
-                        contest['status'] = 'ready_to_enter' if highest_experience_ratio < 0.51 else 'processed'
-                    elif max_entrants == 5:
-                        contest['status'] = 'ready_to_enter' if highest_experience_ratio < 0.61 else 'processed'
-                    else:
-                        contest['status'] = 'ready_to_enter' if highest_experience_ratio <= 0.3 else 'processed'
-
-                self.db_manager.insert_or_update_contest_and_entrants(contest, entrants)
+            if self._take_lobby_retries(sport_contests) and hasattr(self.data_fetcher, 'forget_lobby_validators'):
+                # A contest that failed has to come back in the next lobby
+                # even if DraftKings would answer that lobby with a 304
+                self.data_fetcher.forget_lobby_validators(sport)
+
+    def _take_lobby_retries(self, contests: List[Dict[str, Any]]) -> bool:
+        contest_ids = set(contest['id'] for contest in contests)
+        with self.lobby_retry_lock:
+            failed_ids = self.lobby_retry_ids & contest_ids
+            self.lobby_retry_ids -= failed_ids
+        return bool(failed_ids)
+
+    def _select_changed_contests(self, filtered_contests: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        # Only contests that are new or whose entry count moved since the
+        # previous lobby need their detail page fetched again
+        changed_contests = {}
+        for sport, sport_contests in filtered_contests.items():
+            delta = self.lobby_snapshots.diff(sport, sport_contests)
+            self.last_lobby_deltas[sport] = delta
+            to_fetch = delta['added'] | delta['changed']
+            changed_contests[sport] = [contest for contest in sport_contests if contest['id'] in to_fetch]
+            logger.info(f"{sport} lobby: {len(delta['added'])} added, {len(delta['changed'])} changed, {len(delta['removed'])} removed")
+            if delta['removed']:
+                # Contests leave the lobby once their slate starts, so their
+                # notification history is no longer needed
+                self.db_manager.prune_notification_ledger(list(delta['removed']))
+        return changed_contests
+
+    def _make_fetch_stage(self) -> Stage:
+        if self.fetch_batch_size and not self.early_exit:
+            # The fetcher already downloads a batch concurrently, so one
+            # worker keeps the requests in flight at the fetcher's own limit
+            return Stage("fetch", self._fetch_batch_stage, workers=1, batch_size=self.fetch_batch_size)
+        return Stage("fetch", self._fetch_stage, workers=self.fetch_workers)
+
+    def _fetch_batch_stage(self, contests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        all_details = self.data_fetcher.fetch_multiple_contest_details(
+            [contest['id'] for contest in contests], entry_counts=[contest.get(LOBBY_ENTRIES_KEY) for contest in contests])
+        fetched = []
+        for contest, contest_details in zip(contests, all_details):
+            if self._accept_contest_details(contest, contest_details):
+                fetched.append(contest)
+        return fetched
+
+    def _fetch_stage(self, contest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.early_exit:
+            contest_details = self.data_fetcher.fetch_contest_details_streaming(
+                contest['id'], self._make_streaming_evaluator, entry_count=contest.get(LOBBY_ENTRIES_KEY))
+            if contest_details and not contest_details.pop('complete', True):
+                logger.debug(f"Stopped reading contest {contest['id']} after {len(contest_details['participants'])} entrants")
+        else:
+            contest_details = self.data_fetcher.fetch_contest_details(contest['id'], entry_count=contest.get(LOBBY_ENTRIES_KEY))
+        if not self._accept_contest_details(contest, contest_details):
+            return None
+        return contest
+
+    def _accept_contest_details(self, contest: Dict[str, Any], contest_details: Dict[str, Any]) -> bool:
+        if not contest_details:
+            # The page could not be fetched or read
+            self._forget_lobby_contest(contest['id'])
+            return False
+        if not contest_details.get('participants'):
+            # Nobody has entered yet, so there is nothing to analyze; the
+            # contest stays in the lobby snapshot and is only fetched again
+            # once its entry count moves
+            return False
+        contest.update(contest_details)
+        return True
+
+    def _make_streaming_evaluator(self, contest_details: Dict[str, Any]) -> StreamingContestEvaluator:
+        return StreamingContestEvaluator(
+            contest_details['entries']['maximum'],
+            self.blacklisted_usernames,
+            READY_THRESHOLDS,
+            expected_entrants=contest_details['entries']['current'],
+            settle_rejections_early=self.settle_rejections_early,
+        )
+
+    def _forget_lobby_contest(self, contest_id: Any) -> None:
+        with self.lobby_retry_lock:
+            self.lobby_retry_ids.add(contest_id)
+        if self.lobby_snapshots is not None:
+            self.lobby_snapshots.forget(contest_id)
+
+    def _analyze_stage(self, contests: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        analyzed = []
+        to_analyze = []
+        for contest in contests:
+            entrants = contest.pop('participants', [])
 
-    @with_spinner("\nProcessing unprocessed contests", spinner_type="dots")
-    def process_unprocessed_contests(self) -> None:
-        unprocessed_contests = self.db_manager.get_unprocessed_contests()
-        for contest in unprocessed_contests:
-            entrants = self.db_manager.get_contest_entrants(contest['id'])
-            
             # Check if the contest is already full
-            if len(entrants) >= contest['maximum_entries']:
-                self.db_manager.update_contest_status(contest['id'], 'processed')
+            if len(entrants) >= contest['entries']['maximum']:
                 continue  # Skip this contest as it's already full
 
+            # Check for blacklisted usernames
             if self.has_blacklisted_user(entrants):
                 contest['highest_experience_ratio'] = 1.0
-                contest['status'] = 'processed'
+                contest['status'] = 'scooped'
             else:
-                max_entrants = contest['maximum_entries']  # Assuming this field exists in the database
-                analysis_result = EntrantAnalyzer.analyze_experience_levels(entrants, max_entrants)
-                contest.update(analysis_result)
-                highest_experience_ratio = analysis_result['highest_experience_ratio']
-                
-                if max_entrants == 3:
-                    contest['status'] = 'ready_to_enter' if highest_experience_ratio < 0.7 else 'processed'
-                elif max_entrants == 4:
-                    contest['status'] = 'ready_to_enter' if highest_experience_ratio < 0.8 else 'processed'
-                elif max_entrants == 5:
-                    contest['status'] = 'ready_to_enter' if highest_experience_ratio < 0.61 else 'processed'
-                else:
-                    contest['status'] = 'ready_to_enter' if highest_experience_ratio <= 0.3 else 'processed'
-
-            self.db_manager.update_contest_status(contest['id'], contest['status'])
+                to_analyze.append((contest, entrants))
+            analyzed.append((contest, entrants))
+
+        # Every contest in the batch is scored in one vectorized pass
+        with metrics.timed("analyze"):
+            analysis_results = EntrantAnalyzer.analyze_batch(
+                [entrants for _, entrants in to_analyze],
+                [contest['entries']['maximum'] for contest, _ in to_analyze],
+                READY_THRESHOLDS,
+            )
+        for (contest, _), analysis_result in zip(to_analyze, analysis_results):
+            contest.update(analysis_result)
+        return analyzed
+
+    def _make_persist_stage(self) -> Stage:
+        if self.persist_batch_size:
+            return Stage("persist", self._persist_batch_stage, workers=self.persist_workers, batch_size=self.persist_batch_size)
+        return Stage("persist", self._persist_stage, workers=self.persist_workers)
+
+    def _persist_batch_stage(self, items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        try:
+            self.db_manager.bulk_upsert_contests_and_entrants(items)
+        except Exception:
+            for contest, _ in items:
+                self._forget_lobby_contest(contest['id'])
+            raise
+        return [contest for contest, _ in items]
+
+    def _persist_stage(self, item: Tuple[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        contest, entrants = item
+        try:
+            self.db_manager.insert_or_update_contest_and_entrants(contest, entrants)
+        except Exception:
+            self._forget_lobby_contest(contest['id'])
+            raise
+        return contest
+
+    @with_spinner("\nProcessing unprocessed contests", spinner_type="dots")
+    def process_unprocessed_contests(self, bulk: bool = True) -> None:
+        unprocessed_contests = self.db_manager.get_unprocessed_contests()
+        if bulk:
+            self._process_unprocessed_contests_bulk(unprocessed_contests)
+            return
+
+        for contest in unprocessed_contests:
+            entrants = self.db_manager.get_contest_entrants(contest['id'])
+            status = self._evaluate_unprocessed_contest(contest, entrants)
+            self.db_manager.update_contest_status(contest['id'], status, entrants=entrants)
+
+    def _process_unprocessed_contests_bulk(self, unprocessed_contests: List[Dict[str, Any]]) -> None:
+        # One in-filtered entrant query, one analysis pass over every contest,
+        # one status update per distinct status and notifications built from
+        # the rows that are already loaded
+        contest_ids = [contest['id'] for contest in unprocessed_contests]
+        entrants_by_contest = self.db_manager.get_entrants_for_contests(contest_ids)
+
+        to_analyze = []
+        for contest in unprocessed_contests:
+            entrants = entrants_by_contest.get(contest['id'], [])
+            if len(entrants) >= contest['maximum_entries'] or self.has_blacklisted_user(entrants):
+                self._evaluate_unprocessed_contest(contest, entrants)
+            else:
+                to_analyze.append(contest)
+
+        analysis_results = EntrantAnalyzer.analyze_batch(
+            [entrants_by_contest.get(contest['id'], []) for contest in to_analyze],
+            [contest['maximum_entries'] for contest in to_analyze],
+            UNPROCESSED_READY_THRESHOLDS,
+        )
+        for contest, analysis_result in zip(to_analyze, analysis_results):
+            contest.update(analysis_result)
+
+        statuses = {contest['id']: contest['status'] for contest in unprocessed_contests}
+        self.db_manager.batch_update_contest_statuses(statuses)
+
+        ready_contests = [contest for contest in unprocessed_contests if statuses[contest['id']] == 'ready_to_enter']
+        self.db_manager.notify_ready_contests(ready_contests, entrants_by_contest)
+
+    def _evaluate_unprocessed_contest(self, contest: Dict[str, Any], entrants: List[Dict[str, Any]]) -> str:
+        # Check if the contest is already full
+        if len(entrants) >= contest['maximum_entries']:
+            contest['status'] = 'processed'
+            return contest['status']
+
+        if self.has_blacklisted_user(entrants):
+            contest['highest_experience_ratio'] = 1.0
+            contest['status'] = 'processed'
+        else:
+            max_entrants = contest['maximum_entries']  # Assuming this field exists in the database
+            analysis_result = EntrantAnalyzer.analyze_experience_levels(entrants, max_entrants)
+            contest.update(analysis_result)
+            contest['status'] = EntrantAnalyzer.determine_status(max_entrants, analysis_result['highest_experience_ratio'], UNPROCESSED_READY_THRESHOLDS)
+
+        return contest['status']
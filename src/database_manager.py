@@ -2,21 +2,46 @@ import logging
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Tuple
+from .metrics import metrics
 from .utils import with_spinner
 from .slack_notifier import SlackNotifier
+from .notification_ledger import NotificationLedger
 
 load_dotenv('.env.local')
 
-# logging.basicConfig(level=logging.INFO)
-logging.disable(logging.CRITICAL)
 logger = logging.getLogger(__name__)
 
+# PostgREST silently cuts every response off at its max-rows setting (1000
+# on Supabase), so reads that can match more rows than that are paged
+POSTGREST_MAX_ROWS = 1000
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+def _select_all(build_query: Callable[[], Any], page_size: int = POSTGREST_MAX_ROWS) -> List[Dict[str, Any]]:
+    # build_query returns a fresh, ordered query for every page, since
+    # range() adds to a query's parameters instead of replacing them
+    rows = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
 class DatabaseManager:
-    def __init__(self):
-        self.supabase = None
-        self.initialize_supabase()
-        self.slack_notifier = SlackNotifier()
+    def __init__(self, notifier=None, notification_ledger: NotificationLedger = None, supabase: Client = None):
+        # Pass the client from a ResourceRegistry to share its connection pool
+        self.supabase = supabase
+        if self.supabase is None:
+            self.initialize_supabase()
+        # Anything with notify_contest(contest, entrants, callback), e.g. a
+        # NotificationOutbox so that Slack never holds up a database write
+        self.slack_notifier = notifier or SlackNotifier()
+        # Set NOTIFICATION_LEDGER_PATH to remember sent notifications across restarts
+        self.notification_ledger = notification_ledger or NotificationLedger(os.getenv("NOTIFICATION_LEDGER_PATH"))
 
     def initialize_supabase(self):
         url: str = os.getenv("SUPABASE_URL")
@@ -58,16 +83,20 @@ class DatabaseManager:
             logger.error(f"Error retrieving unprocessed contests: {str(e)}")
             raise
 
-    def update_contest_status(self, contest_id: str, status: str) -> None:
+    def update_contest_status(self, contest_id: str, status: str, entrants: List[Dict[str, Any]] = None) -> None:
         try:
             self.supabase.table('contests').update({'status': status}).eq('id', contest_id).execute()
             logger.info(f"Updated status of contest {contest_id} to {status}")
             
             # If status is changed to 'ready_to_enter', send notification
             if status == 'ready_to_enter':
+                if entrants is None:
+                    entrants = self.get_contest_entrants(contest_id)
+                # Already notified for these entrants, so skip the contest read too
+                if self.notification_ledger.has_sent(contest_id, status, entrants):
+                    return
                 contest = self.supabase.table('contests').select('*').eq('id', contest_id).execute().data[0]
-                entrants = self.get_contest_entrants(contest_id)
-                self.slack_notifier.notify_contest(contest, entrants)
+                self._notify_contest(contest, entrants)
         except Exception as e:
             logger.error(f"Error updating status of contest {contest_id}: {str(e)}")
             raise
@@ -81,19 +110,105 @@ class DatabaseManager:
             logger.error(f"Error retrieving entrants for contest {contest_id}: {str(e)}")
             raise
 
+    def get_entrants_for_contests(self, contest_ids: List[str], batch_size: int = 200,
+                                  page_size: int = POSTGREST_MAX_ROWS) -> Dict[str, List[Dict[str, Any]]]:
+        entrants_by_contest = {contest_id: [] for contest_id in contest_ids}
+        try:
+            for id_batch in _chunks(contest_ids, batch_size):
+                # 200 contests can easily hold more entrants than one response
+                entrants = _select_all(
+                    lambda: self.supabase.table('entrants').select('*').in_('contest_id', id_batch).order('contest_id').order('username'),
+                    page_size,
+                )
+                for entrant in entrants:
+                    entrants_by_contest.setdefault(entrant['contest_id'], []).append(entrant)
+            logger.info(f"Retrieved entrants for {len(contest_ids)} contests")
+            return entrants_by_contest
+        except Exception as e:
+            logger.error(f"Error retrieving entrants for {len(contest_ids)} contests: {str(e)}")
+            raise
+
+    def batch_update_contest_statuses(self, statuses: Dict[str, str], batch_size: int = 200) -> None:
+        contest_ids_by_status = {}
+        for contest_id, status in statuses.items():
+            contest_ids_by_status.setdefault(status, []).append(contest_id)
+        try:
+            for status, contest_ids in contest_ids_by_status.items():
+                for id_batch in _chunks(contest_ids, batch_size):
+                    self.supabase.table('contests').update({'status': status}).in_('id', id_batch).execute()
+                logger.info(f"Updated status of {len(contest_ids)} contests to {status}")
+        except Exception as e:
+            logger.error(f"Error updating status of {len(statuses)} contests: {str(e)}")
+            raise
+
+    def notify_ready_contests(self, contests: List[Dict[str, Any]], entrants_by_contest: Dict[str, List[Dict[str, Any]]]) -> None:
+        for contest in contests:
+            self._notify_contest(contest, entrants_by_contest.get(contest['id'], []))
+
+    def _notify_contest(self, contest: Dict[str, Any], entrants: List[Dict[str, Any]], status: str = 'ready_to_enter') -> bool:
+        if not self.notification_ledger.claim(contest['id'], status, entrants):
+            logger.info(f"Skipping duplicate notification for contest {contest['id']}")
+            return False
+        # The ledger only keeps the key once the message is out, so a failed
+        # send is tried again in a later cycle
+        def record_outcome(sent: bool) -> None:
+            if sent:
+                self.notification_ledger.record_sent(contest['id'], status, entrants)
+            else:
+                self.notification_ledger.release(contest['id'], status, entrants)
+
+        self.slack_notifier.notify_contest(contest, entrants, callback=record_outcome)
+        return True
+
+    def prune_notification_ledger(self, contest_ids: List[str]) -> int:
+        pruned = self.notification_ledger.prune(contest_ids)
+        if pruned:
+            logger.info(f"Pruned {pruned} notification ledger entries")
+        return pruned
+
+    def _build_contest_row(self, contest: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': contest.get('id'),
+            'title': contest.get('title'),
+            'entry_fee': contest.get('entry_fee', 0),
+            'total_prizes': contest.get('total_prizes', 0),
+            'current_entries': contest.get('entries', {}).get('current', 0),
+            'maximum_entries': contest.get('entries', {}).get('maximum', 0),
+            'status': contest.get('status', 'unprocessed'),
+            'highest_experience_ratio': contest.get('highest_experience_ratio'),
+        }
+
+    def _build_entrant_rows(self, contest_id: str, entrants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Multi-entry contests list the same username more than once, and an
+        # upsert payload may only touch each (contest_id, username) row once
+        rows_by_username = {}
+        for entrant in entrants:
+            row = {key: value for key, value in entrant.items() if key != 'id'}
+            row['contest_id'] = contest_id
+            rows_by_username[entrant['username']] = row
+        return list(rows_by_username.values())
+
+    def upsert_entrants(self, contest_id: str, entrants: List[Dict[str, Any]]) -> Dict[str, int]:
+        rows = self._build_entrant_rows(contest_id, entrants)
+        if not rows:
+            return {'inserted': 0, 'updated': 0}
+        try:
+            existing = self.supabase.table('entrants').select('username').eq('contest_id', contest_id).execute()
+            existing_usernames = set(row['username'] for row in existing.data)
+            self.supabase.table('entrants').upsert(rows, on_conflict='contest_id,username').execute()
+            updated_count = sum(1 for row in rows if row['username'] in existing_usernames)
+            inserted_count = len(rows) - updated_count
+            logger.info(f"Upserted entrants for contest {contest_id}: {inserted_count} inserted, {updated_count} updated")
+            return {'inserted': inserted_count, 'updated': updated_count}
+        except Exception as e:
+            logger.error(f"Error upserting entrants for contest {contest_id}: {str(e)}")
+            raise
+
     @with_spinner("\nInserting or updating contest and entrants", spinner_type="dots")
-    def insert_or_update_contest_and_entrants(self, contest: Dict[str, Any], entrants: List[Dict[str, Any]]) -> None:
+    @metrics.timed("db_upsert")
+    def insert_or_update_contest_and_entrants(self, contest: Dict[str, Any], entrants: List[Dict[str, Any]]) -> Dict[str, int]:
         try:
-            processed_contest = {
-                'id': contest.get('id'),
-                'title': contest.get('title'),
-                'entry_fee': contest.get('entry_fee', 0),
-                'total_prizes': contest.get('total_prizes', 0),
-                'current_entries': contest.get('entries', {}).get('current', 0),
-                'maximum_entries': contest.get('entries', {}).get('maximum', 0),
-                'status': contest.get('status', 'unprocessed'),
-                'highest_experience_ratio': contest.get('highest_experience_ratio'),
-            }
+            processed_contest = self._build_contest_row(contest)
             
             # Check if the contest already exists
             existing_contest = self.supabase.table('contests').select('id', 'status').eq('id', contest['id']).execute()
@@ -109,27 +224,61 @@ class DatabaseManager:
                 self.supabase.table('contests').insert(processed_contest).execute()
                 logger.info(f"Successfully inserted contest {contest['id']}")
             
-            # Insert or update entrants
-            inserted_count = 0
-            for entrant in entrants:
-                # Check if entrant already exists
-                existing_entrant = self.supabase.table("entrants").select("id").eq("contest_id", contest['id']).eq("username", entrant["username"]).execute()
-                if not existing_entrant.data:
-                    # Insert only if entrant doesn't exist
-                    self.supabase.table("entrants").insert({"contest_id": contest['id'], **entrant}).execute()
-                    inserted_count += 1
-                else:
-                    # Update existing entrant
-                    self.supabase.table("entrants").update(entrant).eq("id", existing_entrant.data[0]['id']).execute()
-            logger.info(f"Successfully inserted {inserted_count} new entrants and updated existing entrants for contest {contest['id']}")
+            entrant_counts = self.upsert_entrants(contest['id'], entrants)
             
             # Send notification if contest is ready to enter and wasn't previously ready to enter
             if processed_contest['status'] == 'ready_to_enter' and previous_status != 'ready_to_enter':
-                self.slack_notifier.notify_contest(processed_contest, entrants)
+                self._notify_contest(processed_contest, entrants)
+            return entrant_counts
         except Exception as e:
             logger.error(f"Error inserting or updating contest {contest['id']} and its entrants: {str(e)}")
             raise
 
+    @with_spinner("\nBulk upserting contests and entrants", spinner_type="dots")
+    @metrics.timed("db_upsert")
+    def bulk_upsert_contests_and_entrants(self, contests_with_entrants: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], batch_size: int = 500,
+                                          page_size: int = POSTGREST_MAX_ROWS) -> Dict[str, int]:
+        if not contests_with_entrants:
+            return {'contests': 0, 'inserted': 0, 'updated': 0}
+        try:
+            contest_rows = [self._build_contest_row(contest) for contest, _ in contests_with_entrants]
+            contest_ids = [row['id'] for row in contest_rows]
+
+            previous_statuses = {}
+            existing_usernames = set()
+            for id_batch in _chunks(contest_ids, batch_size):
+                existing_contests = _select_all(
+                    lambda: self.supabase.table('contests').select('id', 'status').in_('id', id_batch).order('id'), page_size)
+                for row in existing_contests:
+                    previous_statuses[row['id']] = row['status']
+                existing_entrants = _select_all(
+                    lambda: self.supabase.table('entrants').select('contest_id', 'username').in_('contest_id', id_batch).order('contest_id').order('username'),
+                    page_size)
+                for row in existing_entrants:
+                    existing_usernames.add((row['contest_id'], row['username']))
+
+            for contest_batch in _chunks(contest_rows, batch_size):
+                self.supabase.table('contests').upsert(contest_batch, on_conflict='id').execute()
+
+            entrant_rows = []
+            for contest, entrants in contests_with_entrants:
+                entrant_rows.extend(self._build_entrant_rows(contest['id'], entrants))
+            for entrant_batch in _chunks(entrant_rows, batch_size):
+                self.supabase.table('entrants').upsert(entrant_batch, on_conflict='contest_id,username').execute()
+
+            updated_count = sum(1 for row in entrant_rows if (row['contest_id'], row['username']) in existing_usernames)
+            inserted_count = len(entrant_rows) - updated_count
+            logger.info(f"Bulk upserted {len(contest_rows)} contests: {inserted_count} entrants inserted, {updated_count} updated")
+
+            for contest_row, (_, entrants) in zip(contest_rows, contests_with_entrants):
+                if contest_row['status'] == 'ready_to_enter' and previous_statuses.get(contest_row['id']) != 'ready_to_enter':
+                    self._notify_contest(contest_row, entrants)
+
+            return {'contests': len(contest_rows), 'inserted': inserted_count, 'updated': updated_count}
+        except Exception as e:
+            logger.error(f"Error bulk upserting {len(contests_with_entrants)} contests and their entrants: {str(e)}")
+            raise
+
     @with_spinner("\nProcessing contests", spinner_type="dots")
     def process_contests(self, contests: List[Dict[str, Any]]) -> None:
         try:
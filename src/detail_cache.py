@@ -0,0 +1,138 @@
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Parsed contest details keyed by contest id. An entry stays fresh while the
+# lobby reports the entry count on the cached page and is dropped as soon as
+# the count moves; ttl only bounds how long an unchanged page is reused, so it
+# spans many 5 minute scheduler cycles. With a path the entries are also
+# written to a sqlite file, so a restart does not refetch every detail page.
+class DetailCache:
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600.0, path: str = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl <= 0:
+            raise ValueError("ttl must be greater than 0")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self.connection = None
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS contest_details ("
+                "contest_id TEXT PRIMARY KEY, entry_count INTEGER, stored_at REAL, details TEXT)"
+            )
+            self.connection.execute("DELETE FROM contest_details WHERE stored_at < ?", (time.time() - ttl,))
+            self.connection.commit()
+
+    def get(self, contest_id: Any, entry_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        key = str(contest_id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            stored_entry_count, stored_at, details = entry
+            if time.time() - stored_at > self.ttl:
+                self.stats['expirations'] += 1
+                self._remove(key)
+                self.stats['misses'] += 1
+                return None
+            if entry_count is not None and stored_entry_count is not None and entry_count != stored_entry_count:
+                self.stats['invalidations'] += 1
+                self._remove(key)
+                self.stats['misses'] += 1
+                return None
+
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._evict()
+            self.stats['hits'] += 1
+            # Callers update the returned dict, so never hand out the cached one
+            return copy.deepcopy(details)
+
+    def put(self, contest_id: Any, details: Dict[str, Any]) -> None:
+        if not details:
+            return
+        key = str(contest_id)
+        entry_count = details.get('entries', {}).get('current')
+        entry = (entry_count, time.time(), copy.deepcopy(details))
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._evict()
+            if self.connection is not None:
+                try:
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO contest_details (contest_id, entry_count, stored_at, details) VALUES (?, ?, ?, ?)",
+                        (key, entry_count, entry[1], json.dumps(details)),
+                    )
+                    self.connection.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing contest {key} to the detail cache: {e}")
+
+    def invalidate(self, contest_id: Any) -> None:
+        with self.lock:
+            self._remove(str(contest_id))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            if self.connection is not None:
+                self.connection.execute("DELETE FROM contest_details")
+                self.connection.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats, size=len(self.entries))
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def _load(self, key: str):
+        if self.connection is None:
+            return None
+        try:
+            row = self.connection.execute(
+                "SELECT entry_count, stored_at, details FROM contest_details WHERE contest_id = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading contest {key} from the detail cache: {e}")
+            return None
+        if row is None:
+            return None
+        return (row[0], row[1], json.loads(row[2]))
+
+    def _remove(self, key: str) -> None:
+        self.entries.pop(key, None)
+        if self.connection is not None:
+            try:
+                self.connection.execute("DELETE FROM contest_details WHERE contest_id = ?", (key,))
+                self.connection.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error removing contest {key} from the detail cache: {e}")
+
+    def _evict(self) -> None:
+        # Eviction only trims the in-memory LRU; the disk copy stays until it
+        # expires or is invalidated
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats['evictions'] += 1
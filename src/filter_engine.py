@@ -0,0 +1,162 @@
+import re
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+DEFAULT_FILTER_RULES = {
+    'max_entrants': 5,
+    'max_entry_fee': 110.0,
+    'excluded_keywords': ["casual", "beginner", "satellite", "madden", "primetime", "turbo", "mon-thu", "mon"],
+    'game_types': ['Classic', 'Showdown Captain Mode'],
+    'excluded_start_times': ['1:00PM', '4:05PM', '4:15PM', '4:25PM'],
+    'start_time_game_types': ['Showdown Captain Mode'],
+}
+
+# Rules are checked in this order and a rejected contest is counted against
+# the first rule it fails
+RULE_NAMES = ['max_entrants', 'excluded_keyword', 'max_entry_fee', 'game_type', 'excluded_start_time']
+
+# Rules that only compare numbers or look up a set, cheap enough to run on
+# every contest while the lobby is still being decoded
+CHEAP_RULE_NAMES = ['max_entrants', 'max_entry_fee', 'game_type']
+
+
+def build_filter_rules(**overrides) -> Dict[str, Any]:
+    rules = dict(DEFAULT_FILTER_RULES)
+    for key, value in overrides.items():
+        if key not in DEFAULT_FILTER_RULES:
+            raise ValueError(f"Unknown filter rule: {key}")
+        rules[key] = value
+    return rules
+
+
+def _compile_substring_matcher(substrings: List[str]) -> Optional[re.Pattern]:
+    if not substrings:
+        return None
+    # Longest first so the alternation never stops at a shorter prefix
+    ordered = sorted(set(substrings), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(substring) for substring in ordered))
+
+
+class CompiledContestFilter:
+    def __init__(self, rules: Dict[str, Any] = None):
+        self.rules = rules or DEFAULT_FILTER_RULES
+        self.max_entrants = self.rules['max_entrants']
+        self.max_entry_fee = self.rules['max_entry_fee']
+        self.game_types = frozenset(self.rules['game_types'])
+        self.start_time_game_types = frozenset(self.rules['start_time_game_types'])
+        self.keyword_matcher = _compile_substring_matcher([keyword.lower() for keyword in self.rules['excluded_keywords']])
+        self.start_time_matcher = _compile_substring_matcher(self.rules['excluded_start_times'])
+
+    def evaluate(self, contest: Dict[str, Any]) -> Optional[str]:
+        if contest.get('m', 0) > self.max_entrants:
+            return 'max_entrants'
+        if self.keyword_matcher is not None and self.keyword_matcher.search(contest.get('n', '').lower()):
+            return 'excluded_keyword'
+        if float(contest.get('a', 0)) > self.max_entry_fee:
+            return 'max_entry_fee'
+        game_type = contest.get('gameType')
+        if game_type not in self.game_types:
+            return 'game_type'
+        if (game_type in self.start_time_game_types and self.start_time_matcher is not None
+                and self.start_time_matcher.search(contest.get('sdstring', ''))):
+            return 'excluded_start_time'
+        return None
+
+    def evaluate_cheap(self, contest: Dict[str, Any]) -> Optional[str]:
+        # Only the CHEAP_RULE_NAMES rules; a contest passing here still has to
+        # go through evaluate()
+        if contest.get('m', 0) > self.max_entrants:
+            return 'max_entrants'
+        if float(contest.get('a', 0)) > self.max_entry_fee:
+            return 'max_entry_fee'
+        if contest.get('gameType') not in self.game_types:
+            return 'game_type'
+        return None
+
+    def apply(self, contests: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+        rejection_counts = {rule_name: 0 for rule_name in RULE_NAMES}
+        filtered_contests = {}
+        for sport, sport_contests in contests.items():
+            accepted = []
+            for contest in sport_contests:
+                rejected_by = self.evaluate(contest)
+                if rejected_by is None:
+                    accepted.append(contest)
+                else:
+                    rejection_counts[rejected_by] += 1
+            filtered_contests[sport] = accepted
+        return filtered_contests, rejection_counts
+
+
+class ColumnarContestFilter(CompiledContestFilter):
+    LOBBY_COLUMN_DEFAULTS = {'n': '', 'm': 0, 'a': 0, 'gameType': None, 'sdstring': ''}
+
+    def load_frame(self, sport_contests: List[Dict[str, Any]]) -> pd.DataFrame:
+        # Object columns skip pandas' string inference, which costs more than
+        # the filter itself on a large lobby
+        columns = {}
+        for column, default in self.LOBBY_COLUMN_DEFAULTS.items():
+            columns[column] = pd.Series([contest.get(column, default) for contest in sport_contests], dtype=object)
+        columns['m'] = pd.to_numeric(columns['m'])
+        columns['a'] = columns['a'].astype(float)
+        return pd.DataFrame(columns)
+
+    def _match_distinct_values(self, column: pd.Series, matcher: re.Pattern, lowercase: bool) -> np.ndarray:
+        # Lobby names and start times repeat heavily, so the regex only runs
+        # once per distinct value and the result is broadcast through the codes
+        codes, distinct_values = pd.factorize(column, use_na_sentinel=False)
+        matched = np.array([
+            bool(matcher.search(value.lower() if lowercase else value))
+            for value in distinct_values
+        ], dtype=bool)
+        return matched[codes]
+
+    def _rejection_masks(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        row_count = len(frame)
+        masks = {'max_entrants': (frame['m'] > self.max_entrants).to_numpy()}
+        if self.keyword_matcher is not None:
+            masks['excluded_keyword'] = self._match_distinct_values(frame['n'], self.keyword_matcher, lowercase=True)
+        else:
+            masks['excluded_keyword'] = np.zeros(row_count, dtype=bool)
+        masks['max_entry_fee'] = (frame['a'] > self.max_entry_fee).to_numpy()
+        masks['game_type'] = ~frame['gameType'].isin(self.game_types).to_numpy()
+        if self.start_time_matcher is not None:
+            has_start_time_rule = frame['gameType'].isin(self.start_time_game_types).to_numpy()
+            has_excluded_time = self._match_distinct_values(frame['sdstring'], self.start_time_matcher, lowercase=False)
+            masks['excluded_start_time'] = has_start_time_rule & has_excluded_time
+        else:
+            masks['excluded_start_time'] = np.zeros(row_count, dtype=bool)
+        return masks
+
+    def apply_frame(self, frame: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, int]]:
+        masks = self._rejection_masks(frame)
+        # Walk the rules in order so each contest is only counted against
+        # the first rule that rejects it, as in the row-by-row engine
+        rejection_counts = {}
+        remaining = np.ones(len(frame), dtype=bool)
+        for rule_name in RULE_NAMES:
+            rejected_here = remaining & masks[rule_name]
+            rejection_counts[rule_name] = int(rejected_here.sum())
+            remaining &= ~rejected_here
+        return remaining, rejection_counts
+
+    def apply(self, contests: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+        rejection_counts = {rule_name: 0 for rule_name in RULE_NAMES}
+        filtered_contests = {}
+        for sport, sport_contests in contests.items():
+            if not sport_contests:
+                filtered_contests[sport] = []
+                continue
+            remaining, sport_rejection_counts = self.apply_frame(self.load_frame(sport_contests))
+            for rule_name, count in sport_rejection_counts.items():
+                rejection_counts[rule_name] += count
+            # Only the surviving rows are turned back into the lobby dicts
+            filtered_contests[sport] = [sport_contests[index] for index in np.flatnonzero(remaining)]
+        return filtered_contests, rejection_counts
+
+
+FILTER_BACKENDS = {
+    'python': CompiledContestFilter,
+    'columnar': ColumnarContestFilter,
+}
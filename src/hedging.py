@@ -0,0 +1,78 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        # None until there are enough samples to say what slow means
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        # Nearest-rank percentile
+        index = max(0, math.ceil(percentile / 100.0 * len(ordered)) - 1)
+        return ordered[index]
+
+
+# Decides when a slow detail request gets a duplicate: once it has been
+# pending longer than the given latency percentile, and only while hedges
+# stay under max_fraction of all requests
+class HedgePolicy:
+    def __init__(self, percentile: float = 95.0, max_fraction: float = 0.05, min_delay: float = 0.05,
+                 window: int = 500, min_samples: int = 20):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 < max_fraction <= 1:
+            raise ValueError("max_fraction must be between 0 and 1")
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.min_delay = min_delay
+        self.latencies = LatencyTracker(window, min_samples)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        delay = self.latencies.percentile(self.percentile)
+        if delay is None:
+            return None
+        return max(self.min_delay, delay)
+
+    def record_request(self) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def try_start_hedge(self, acquire_token: Callable[[], bool]) -> bool:
+        # A hedge is a real request, so it also has to get a token from the
+        # rate budget right away; otherwise the primary is simply waited for
+        with self.lock:
+            if self.hedges + 1 > self.max_fraction * self.requests:
+                return False
+            if not acquire_token():
+                return False
+            self.hedges += 1
+            return True
+
+    def record_result(self, seconds: float, hedge_won: bool) -> None:
+        self.latencies.record(seconds)
+        if hedge_won:
+            with self.lock:
+                self.hedge_wins += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            metrics = {'requests': self.requests, 'hedges': self.hedges, 'hedge_wins': self.hedge_wins}
+        metrics['hedge_delay'] = self.hedge_delay()
+        return metrics
@@ -0,0 +1,31 @@
+from typing import List, Dict, Any, Tuple
+import ijson
+from .filter_engine import CHEAP_RULE_NAMES, CompiledContestFilter
+
+
+class CountingReader:
+    # File-like wrapper that counts the decoded bytes handed to the parser
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def stream_lobby_contests(raw, contest_filter: CompiledContestFilter = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    # Decodes the Contests array of a lobby payload one contest at a time
+    # from a file-like object. Contests failing the cheap filter rules are
+    # dropped as soon as they are decoded, so neither the body nor the full
+    # contest list is ever held in memory
+    rejection_counts = {rule_name: 0 for rule_name in CHEAP_RULE_NAMES}
+    accepted = []
+    for contest in ijson.items(raw, 'Contests.item', use_float=True):
+        rejected_by = contest_filter.evaluate_cheap(contest) if contest_filter is not None else None
+        if rejected_by is None:
+            accepted.append(contest)
+        else:
+            rejection_counts[rejected_by] += 1
+    return accepted, rejection_counts
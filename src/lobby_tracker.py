@@ -0,0 +1,37 @@
+import threading
+from typing import List, Dict, Any, Set
+
+# Number of entries DraftKings reports for a contest in the lobby payload
+LOBBY_ENTRIES_KEY = 'nt'
+
+
+class LobbySnapshotStore:
+    def __init__(self):
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    def diff(self, sport: str, contests: List[Dict[str, Any]]) -> Dict[str, Set[Any]]:
+        current = {contest['id']: contest.get(LOBBY_ENTRIES_KEY) for contest in contests}
+        with self.lock:
+            previous = self.snapshots.get(sport, {})
+            added = set(current) - set(previous)
+            # Without an entry count there is nothing to compare, so such a
+            # contest always counts as changed rather than silently skipped
+            changed = set(
+                contest_id for contest_id in current
+                if contest_id in previous and (current[contest_id] is None or current[contest_id] != previous[contest_id])
+            )
+            removed = set(previous) - set(current)
+            self.snapshots[sport] = current
+        return {'added': added, 'changed': changed, 'removed': removed}
+
+    def forget(self, contest_id: Any) -> None:
+        # Drop a contest from every snapshot so the next diff reports it as
+        # added again, e.g. after its detail fetch failed
+        with self.lock:
+            for snapshot in self.snapshots.values():
+                snapshot.pop(contest_id, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.snapshots = {}
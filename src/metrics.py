@@ -0,0 +1,223 @@
+import bisect
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stages of a contest-finder cycle, in pipeline order
+STAGES = ("lobby_fetch", "filter", "detail_fetch", "parse", "analyze", "db_upsert", "slack_send")
+# Seconds; covers a sub-millisecond filter up to a slow DraftKings lobby
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "dk_contest_finder"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus the +Inf overflow
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            cumulative.append((repr(float(bound)), running))
+        cumulative.append(("+Inf", running + self.counts[-1]))
+        return cumulative
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{name}="{_escape_label_value(value)}"' for name, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Stage latency histograms and counters for the whole process, plus a trace
+# id and a summary for the cycle in progress. Histograms and counters only
+# ever grow, as Prometheus expects; the cycle summary starts fresh with each
+# start_cycle.
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        # Every stage is exported from the start, even before it first runs
+        self.histograms = {stage: Histogram(buckets) for stage in STAGES}
+        self.counters = {}
+        self.trace_id = None
+        self.cycle_started = None
+        self.cycle_stages = {}
+        self.cycle_counters = {}
+        self.last_cycle = None
+
+    def observe(self, stage: str, seconds: float, failed: bool = False) -> None:
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if self.trace_id is not None:
+                cycle_stage = self.cycle_stages.setdefault(stage, {'count': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0})
+                cycle_stage['count'] += 1
+                cycle_stage['errors'] += int(failed)
+                cycle_stage['total_time'] += seconds
+                cycle_stage['max_time'] = max(cycle_stage['max_time'], seconds)
+        if failed:
+            self.increment("stage_errors", labels={'stage': stage})
+
+    def increment(self, name: str, value: float = 1, labels: Dict[str, Any] = None) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            if self.trace_id is not None:
+                self.cycle_counters[key] = self.cycle_counters.get(key, 0) + value
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.observe(stage, time.perf_counter() - started, failed=True)
+            raise
+        self.observe(stage, time.perf_counter() - started)
+
+    def start_cycle(self) -> str:
+        with self.lock:
+            self.trace_id = uuid.uuid4().hex[:16]
+            self.cycle_started = time.time()
+            self.cycle_stages = {}
+            self.cycle_counters = {}
+            return self.trace_id
+
+    def end_cycle(self, extra: Dict[str, Any] = None) -> Dict[str, Any]:
+        with self.lock:
+            counters = {}
+            for (name, labels), value in self.cycle_counters.items():
+                label_text = ",".join(f"{label}={label_value}" for label, label_value in labels)
+                counters[f"{name}[{label_text}]" if label_text else name] = value
+            summary = {
+                'trace_id': self.trace_id,
+                'started_at': self.cycle_started,
+                'duration': time.time() - self.cycle_started if self.cycle_started is not None else 0.0,
+                'stages': {stage: dict(values) for stage, values in self.cycle_stages.items()},
+                'counters': counters,
+            }
+            summary.update(extra or {})
+            self.last_cycle = summary
+            self.trace_id = None
+            return summary
+
+    def get_last_cycle(self) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.last_cycle
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            if histograms:
+                name = f"{METRIC_PREFIX}_stage_duration_seconds"
+                lines.append(f"# HELP {name} Time spent in each stage of the contest-finder cycle.")
+                lines.append(f"# TYPE {name} histogram")
+                for stage, histogram in histograms:
+                    for bound, count in histogram.cumulative_counts():
+                        lines.append(f"{name}_bucket{_format_labels((('stage', stage), ('le', bound)))} {count}")
+                    lines.append(f"{name}_sum{_format_labels((('stage', stage),))} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels((('stage', stage),))} {histogram.count}")
+            typed = set()
+            for (counter_name, labels), value in counters:
+                name = f"{METRIC_PREFIX}_{counter_name}_total"
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Adds the current trace id to every log record, so the lines of one cycle
+# can be grepped together
+class TraceIdFilter(logging.Filter):
+    def __init__(self, registry: MetricsRegistry):
+        super().__init__()
+        self.registry = registry
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = self.registry.trace_id or "-"
+        return True
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._respond(200, "text/plain; version=0.0.4; charset=utf-8", self.registry.render_prometheus())
+        elif path == "/cycle":
+            self._respond(200, "application/json", json.dumps(self.registry.get_last_cycle() or {}, default=str))
+        else:
+            self._respond(404, "text/plain; charset=utf-8", "Not found\n")
+
+    def _respond(self, status: int, content_type: str, body: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics request: {format % args}")
+
+
+# Serves /metrics (Prometheus text format) and /cycle (JSON summary of the
+# last finished cycle) from a daemon thread. Binds to localhost by default.
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9102):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self) -> int:
+        handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {'registry': self.registry})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        # With port 0 the OS picks a free port
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        return self.port
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+metrics = MetricsRegistry()
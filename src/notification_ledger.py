@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def entrant_fingerprint(entrants: List[Dict[str, Any]]) -> str:
+    # Order-independent, so the same entrants read back from the database
+    # give the same fingerprint as the freshly parsed ones
+    entries = sorted(f"{entrant.get('username', '')}:{entrant.get('experience_level', 0)}" for entrant in entrants)
+    return hashlib.sha1("|".join(entries).encode('utf-8')).hexdigest()
+
+
+# Remembers which (contest_id, status, entrant fingerprint) notifications
+# were already sent. Lookups hit an in-memory set; with a path every sent key
+# is also written to a sqlite file so a restart does not notify again.
+class NotificationLedger:
+    def __init__(self, path: str = None):
+        self.path = path
+        self.keys = set()
+        self.lock = threading.Lock()
+        self.connection = None
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS notifications ("
+                "contest_id TEXT, status TEXT, fingerprint TEXT, sent_at REAL, "
+                "PRIMARY KEY (contest_id, status, fingerprint))"
+            )
+            self.connection.commit()
+            rows = self.connection.execute("SELECT contest_id, status, fingerprint FROM notifications").fetchall()
+            self.keys = set(tuple(row) for row in rows)
+
+    @staticmethod
+    def make_key(contest_id: Any, status: str, entrants: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+        return (str(contest_id), status, entrant_fingerprint(entrants))
+
+    def has_sent(self, contest_id: Any, status: str, entrants: List[Dict[str, Any]]) -> bool:
+        return self.make_key(contest_id, status, entrants) in self.keys
+
+    def claim(self, contest_id: Any, status: str, entrants: List[Dict[str, Any]]) -> bool:
+        # Reserves the notification and returns True only for the first
+        # caller. The key is only written to disk by record_sent, once the
+        # message is out; release gives it up if the send failed
+        key = self.make_key(contest_id, status, entrants)
+        with self.lock:
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+        return True
+
+    def record_sent(self, contest_id: Any, status: str, entrants: List[Dict[str, Any]]) -> None:
+        key = self.make_key(contest_id, status, entrants)
+        with self.lock:
+            self.keys.add(key)
+            if self.connection is not None:
+                try:
+                    self.connection.execute(
+                        "INSERT OR IGNORE INTO notifications (contest_id, status, fingerprint, sent_at) VALUES (?, ?, ?, ?)",
+                        key + (time.time(),),
+                    )
+                    self.connection.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error recording notification for contest {key[0]}: {e}")
+
+    def release(self, contest_id: Any, status: str, entrants: List[Dict[str, Any]]) -> None:
+        # A later cycle may notify again
+        with self.lock:
+            self.keys.discard(self.make_key(contest_id, status, entrants))
+
+    def prune(self, contest_ids: Iterable[Any]) -> int:
+        # Called with the contests that left the lobby, i.e. whose slate has
+        # started; nothing will be sent for them again
+        contest_ids = set(str(contest_id) for contest_id in contest_ids)
+        if not contest_ids:
+            return 0
+        with self.lock:
+            pruned = set(key for key in self.keys if key[0] in contest_ids)
+            self.keys -= pruned
+            if self.connection is not None and pruned:
+                try:
+                    self.connection.executemany(
+                        "DELETE FROM notifications WHERE contest_id = ?",
+                        [(contest_id,) for contest_id in set(key[0] for key in pruned)],
+                    )
+                    self.connection.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error pruning the notification ledger: {e}")
+        return len(pruned)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.keys)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Callable, Optional
+from .rate_limiter import TokenBucket, jittered_backoff
+
+logger = logging.getLogger(__name__)
+
+
+# Takes notify_contest calls from the processing path without ever blocking
+# on Slack. A background thread collects the queued contests into one digest
+# message per cycle (or per coalesce_window / max_digest_size) and paces the
+# sends to Slack's per-channel limit for chat.postMessage, about one message
+# per second. Retries and 429 waits of the notifier happen on that thread.
+# A digest that still fails goes back to the front of the queue and is sent
+# again after a backoff, up to max_send_attempts times per contest.
+class NotificationOutbox:
+    def __init__(self, notifier, coalesce_window: float = 5.0, max_digest_size: int = 10, messages_per_second: float = 1.0,
+                 max_send_attempts: int = 3, retry_backoff: float = 2.0, max_retry_backoff: float = 60.0):
+        if max_digest_size < 1:
+            raise ValueError("max_digest_size must be at least 1")
+        if max_send_attempts < 1:
+            raise ValueError("max_send_attempts must be at least 1")
+        self.notifier = notifier
+        self.coalesce_window = coalesce_window
+        self.max_digest_size = max_digest_size
+        self.pacer = TokenBucket(messages_per_second, 1)
+        self.max_send_attempts = max_send_attempts
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.pending = deque()
+        self.retry_at = 0.0
+        self.failed_attempts = 0
+        self.in_flight = 0
+        self.flush_requested = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.metrics = {
+            'enqueued': 0,
+            'sent_messages': 0,
+            'sent_contests': 0,
+            'retried_contests': 0,
+            'failed_contests': 0,
+            'last_send_latency': 0.0,
+            'max_send_latency': 0.0,
+            'total_send_latency': 0.0,
+        }
+        self.worker = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+        self.worker.start()
+
+    def notify_contest(self, contest: Dict[str, Any], entrants: List[Dict[str, Any]],
+                       callback: Callable[[bool], None] = None) -> None:
+        # callback is called from the outbox thread with True once the
+        # contest was sent, or False once it was given up on
+        with self.condition:
+            if self.closed:
+                logger.warning(f"Notification outbox is closed, dropping contest {contest.get('id')}")
+                closed = True
+            else:
+                closed = False
+                self.pending.append((contest, list(entrants), time.monotonic(), 0, callback))
+                self.metrics['enqueued'] += 1
+                self.condition.notify_all()
+        if closed:
+            self._call_back(callback, False)
+
+    def end_cycle(self) -> None:
+        # Send whatever this cycle queued now instead of waiting out the
+        # coalesce window
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while self.pending or self.in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        self.flush(timeout)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.worker.join(timeout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.condition:
+            metrics = dict(self.metrics, queue_depth=len(self.pending), in_flight=self.in_flight)
+        total_send_latency = metrics.pop('total_send_latency')
+        metrics['avg_send_latency'] = total_send_latency / metrics['sent_contests'] if metrics['sent_contests'] else 0.0
+        return metrics
+
+    def _next_batch(self) -> Optional[List[Any]]:
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            if not self.pending:
+                return None
+            # Back off after a failed send; closing sends what is left now
+            while not self.closed:
+                remaining = self.retry_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            deadline = self.pending[0][2] + self.coalesce_window
+            while len(self.pending) < self.max_digest_size and not self.flush_requested and not self.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            batch = [self.pending.popleft() for _ in range(min(len(self.pending), self.max_digest_size))]
+            if not self.pending:
+                self.flush_requested = False
+            self.in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._send_batch(batch)
+            finally:
+                with self.condition:
+                    self.in_flight = 0
+                    self.condition.notify_all()
+
+    def _send_batch(self, batch: List[Any]) -> None:
+        try:
+            message = self._format_batch(batch)
+            self.pacer.acquire()
+            self.notifier.send_notification(message)
+        except Exception as e:
+            logger.error(f"Error sending notification for {len(batch)} contests: {e}", exc_info=True)
+            self._requeue_failed(batch)
+            return
+
+        sent_at = time.monotonic()
+        with self.condition:
+            self.failed_attempts = 0
+            self.metrics['sent_messages'] += 1
+            self.metrics['sent_contests'] += len(batch)
+            for _, _, enqueued_at, _, _ in batch:
+                latency = sent_at - enqueued_at
+                self.metrics['last_send_latency'] = latency
+                self.metrics['max_send_latency'] = max(self.metrics['max_send_latency'], latency)
+                self.metrics['total_send_latency'] += latency
+        for _, _, _, _, callback in batch:
+            self._call_back(callback, True)
+
+    def _requeue_failed(self, batch: List[Any]) -> None:
+        retries = []
+        dropped = []
+        with self.condition:
+            for contest, entrants, enqueued_at, attempts, callback in batch:
+                if attempts + 1 < self.max_send_attempts:
+                    retries.append((contest, entrants, enqueued_at, attempts + 1, callback))
+                else:
+                    logger.error(f"Giving up on the notification for contest {contest.get('id')} after {attempts + 1} attempts")
+                    self.metrics['failed_contests'] += 1
+                    dropped.append(callback)
+            # Ahead of anything queued since, in the original order
+            self.pending.extendleft(reversed(retries))
+            self.metrics['retried_contests'] += len(retries)
+            if retries:
+                delay = jittered_backoff(self.failed_attempts, base=self.retry_backoff, cap=self.max_retry_backoff)
+                self.retry_at = time.monotonic() + delay
+                self.failed_attempts += 1
+                # Sent as soon as the backoff ends, not after another window
+                self.flush_requested = True
+                logger.warning(f"Retrying the notification for {len(retries)} contests in {delay:.1f}s")
+        for callback in dropped:
+            self._call_back(callback, False)
+
+    @staticmethod
+    def _call_back(callback: Optional[Callable[[bool], None]], sent: bool) -> None:
+        if callback is None:
+            return
+        try:
+            callback(sent)
+        except Exception as e:
+            logger.error(f"Error in notification callback: {e}", exc_info=True)
+
+    def _format_batch(self, batch: List[Any]) -> str:
+        if len(batch) == 1:
+            contest, entrants, _, _, _ = batch[0]
+            return self.notifier._format_contest_message(contest, entrants)
+        messages = [self.notifier._format_contest_message(contest, entrants) for contest, entrants, _, _, _ in batch]
+        return f"{len(batch)} contests ready to enter!\n" + "\n---\n".join(messages)
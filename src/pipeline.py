@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_STAGE_DONE = object()
+# Worker threads are named "<prefix><stage>-<n>"; the cycle profiler picks
+# them out by it
+WORKER_THREAD_PREFIX = "pipeline-"
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Any], Optional[Any]], workers: int = 1, batch_size: int = None):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"Stage {name} needs a batch size of at least one")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        # A batched stage gets a list of whatever is queued (up to batch_size
+        # items) and returns a list of outputs
+        self.batch_size = batch_size
+
+
+# Runs items through stages connected by bounded queues. Every stage has its
+# own worker threads, so network, CPU and database work overlap. A stage
+# function returns the item for the next stage, or None to drop it.
+class Pipeline:
+    def __init__(self, stages: List[Stage], queue_size: int = 10):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        results_lock = threading.Lock()
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            input_queue = queues[index]
+            output_queue = queues[index + 1] if index + 1 < len(queues) else None
+            next_stage_workers = self.stages[index + 1].workers if output_queue is not None else 0
+            finished = {'count': 0}
+            finished_lock = threading.Lock()
+            for worker_number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, input_queue, output_queue, next_stage_workers, results, results_lock, finished, finished_lock),
+                    name=f"{WORKER_THREAD_PREFIX}{stage.name}-{worker_number}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_STAGE_DONE)
+
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _run_worker(self, stage, input_queue, output_queue, next_stage_workers, results, results_lock, finished, finished_lock):
+        stage_done = False
+        while not stage_done:
+            item = input_queue.get()
+            if item is _STAGE_DONE:
+                break
+            if stage.batch_size:
+                batch, stage_done = self._collect_batch(item, input_queue, stage.batch_size)
+                outputs = self._call_stage(stage, batch) or []
+            else:
+                outputs = [self._call_stage(stage, item)]
+            for output in outputs:
+                if output is None:
+                    continue
+                if output_queue is not None:
+                    output_queue.put(output)
+                else:
+                    with results_lock:
+                        results.append(output)
+
+        # The last worker of a stage to finish tells every worker of the next
+        # stage that no more items are coming
+        with finished_lock:
+            finished['count'] += 1
+            is_last_worker = finished['count'] == stage.workers
+        if is_last_worker and output_queue is not None:
+            for _ in range(next_stage_workers):
+                output_queue.put(_STAGE_DONE)
+
+    def _collect_batch(self, first_item, input_queue, batch_size):
+        # Take what is already waiting instead of blocking for a full batch,
+        # so a slow upstream stage never holds items back
+        batch = [first_item]
+        while len(batch) < batch_size:
+            try:
+                item = input_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STAGE_DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _call_stage(self, stage, item):
+        try:
+            return stage.func(item)
+        except Exception as e:
+            logger.error(f"Error in pipeline stage {stage.name}: {e}", exc_info=True)
+            return None
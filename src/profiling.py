@@ -0,0 +1,156 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Optional
+from .pipeline import WORKER_THREAD_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+# Wraps scheduler cycles in cProfile and tracemalloc on demand: every Nth
+# cycle, and the cycle after one that ran over the time budget (a cycle can
+# only be profiled from its start, so the slow one itself is just timed).
+# Each profiled cycle leaves a .prof file for pstats/snakeviz and a .alloc.txt
+# with the top allocation sites in output_dir; only the newest keep cycles
+# are kept. With neither option set a cycle costs one counter increment.
+class CycleProfiler:
+    def __init__(self, every_n: int = 0, time_budget: Optional[float] = None, output_dir: str = "profiles",
+                 keep: int = 20, top_n: int = 25):
+        if every_n < 0:
+            raise ValueError("every_n must not be negative")
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("time_budget must be positive")
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.every_n = every_n
+        self.time_budget = time_budget
+        self.output_dir = output_dir
+        self.keep = keep
+        self.top_n = top_n
+        self.cycles = 0
+        self.armed = False
+        self.thread_profiles = []
+        self.owns_tracemalloc = False
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.every_n > 0 or self.time_budget is not None
+
+    def should_profile(self) -> bool:
+        return self.armed or (self.every_n > 0 and self.cycles % self.every_n == 0)
+
+    @contextmanager
+    def cycle(self, cycle_id: str):
+        self.cycles += 1
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        if not self.should_profile():
+            try:
+                yield
+            finally:
+                self._check_budget(cycle_id, time.perf_counter() - started)
+            return
+
+        self.armed = False
+        profiler = self._start()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            try:
+                self._finish(cycle_id, profiler, elapsed)
+            except Exception as e:
+                logger.error(f"Error writing the profile of cycle {cycle_id}: {e}", exc_info=True)
+            self._check_budget(cycle_id, elapsed)
+
+    def _check_budget(self, cycle_id: str, elapsed: float) -> None:
+        if self.time_budget is not None and elapsed > self.time_budget:
+            logger.warning(f"Cycle {cycle_id} took {elapsed:.1f}s, over the {self.time_budget:.1f}s budget; profiling the next cycle")
+            self.armed = True
+
+    def _start(self) -> cProfile.Profile:
+        # cProfile only sees the thread that enabled it, so the pipeline
+        # workers started during the cycle get their own profiler, merged
+        # into one profile at the end
+        self.thread_profiles = []
+        threading.setprofile(self._profile_thread)
+        # Leave tracing alone if it was already on, e.g. PYTHONTRACEMALLOC
+        self.owns_tracemalloc = not tracemalloc.is_tracing()
+        if self.owns_tracemalloc:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _profile_thread(self, frame, event, arg) -> None:
+        # Only pipeline workers are profiled: Pipeline.run joins them, so
+        # their profilers never outlive the cycle. Any other thread (the hedge
+        # pool, the parse pool's management thread) drops this hook at its
+        # first call and runs unprofiled
+        if not threading.current_thread().name.startswith(WORKER_THREAD_PREFIX):
+            sys.setprofile(None)
+            return
+        profiler = cProfile.Profile()
+        with self.lock:
+            self.thread_profiles.append(profiler)
+        profiler.enable()
+
+    def _finish(self, cycle_id: str, profiler: cProfile.Profile, elapsed: float) -> None:
+        profiler.disable()
+        threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+
+        stats = pstats.Stats(profiler)
+        with self.lock:
+            thread_profiles, self.thread_profiles = self.thread_profiles, []
+        for thread_profiler in thread_profiles:
+            try:
+                stats.add(thread_profiler)
+            except TypeError:
+                # A thread that never made a call has nothing to merge
+                continue
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base_path = os.path.join(self.output_dir, f"cycle-{time.strftime('%Y%m%d-%H%M%S')}-{cycle_id}")
+        stats.dump_stats(f"{base_path}.prof")
+        allocation_summary = self._allocation_summary(snapshot)
+        with open(f"{base_path}.alloc.txt", "w") as allocation_file:
+            allocation_file.write(allocation_summary)
+        self._rotate()
+
+        logger.info(f"Profiled cycle {cycle_id} ({elapsed:.1f}s), written to {base_path}.prof\n"
+                    f"{self._cpu_summary(stats)}\nTop allocations:\n{allocation_summary}")
+
+    def _cpu_summary(self, stats: pstats.Stats) -> str:
+        output = io.StringIO()
+        stats.stream = output
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        return output.getvalue()
+
+    def _allocation_summary(self, snapshot: tracemalloc.Snapshot) -> str:
+        statistics = snapshot.statistics("lineno")[:self.top_n]
+        return "".join(f"{statistic}\n" for statistic in statistics)
+
+    def _rotate(self) -> List[str]:
+        profiles = sorted(name for name in os.listdir(self.output_dir) if name.startswith("cycle-") and name.endswith(".prof"))
+        removed = []
+        for name in profiles[:-self.keep]:
+            base_name = name[:-len(".prof")]
+            for path in (f"{base_name}.prof", f"{base_name}.alloc.txt"):
+                full_path = os.path.join(self.output_dir, path)
+                if os.path.exists(full_path):
+                    os.remove(full_path)
+            removed.append(base_name)
+        return removed
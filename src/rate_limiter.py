@@ -0,0 +1,209 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.last_refill = now
+
+    def _reserve(self) -> float:
+        # Take a token now, possibly going into debt, and return how long the
+        # caller has to wait before the token is actually available. Reserving
+        # under the lock keeps concurrent callers from racing for the same token.
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def set_rate(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        with self.lock:
+            # Tokens earned so far count at the old rate
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self) -> None:
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+# A token bucket whose rate follows the server: every successful response
+# raises it by increase_step (additive increase) and every throttling
+# response multiplies it by decrease_factor (multiplicative decrease). A
+# Retry-After pauses every caller until it has passed.
+class AdaptiveRateController(TokenBucket):
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.1, max_rate: float = 5.0,
+                 increase_step: float = 0.05, decrease_factor: float = 0.5):
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("rates must satisfy 0 < min_rate <= rate <= max_rate")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        super().__init__(rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.paused_until = 0.0
+        self.successes = 0
+        self.throttles = 0
+
+    def _reserve(self) -> float:
+        wait_time = super()._reserve()
+        with self.lock:
+            pause = self.paused_until - time.monotonic()
+        return max(wait_time, pause)
+
+    def on_success(self) -> None:
+        with self.lock:
+            self.successes += 1
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.throttles += 1
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # Drop the saved-up burst so the lower rate takes effect at once
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'rate': self.rate,
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'paused_for': max(0.0, self.paused_until - time.monotonic()),
+            }
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, cool_down: float = 60.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        # After the cool-down one trial request goes through; its outcome
+        # closes the breaker again or restarts the cool-down. A trial that
+        # never reports back is given up on after another cool-down, so a
+        # lost outcome cannot keep the breaker half-open for good
+        with self.lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.cool_down:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self.trial_started_at = now
+                return True
+            if self.state == self.HALF_OPEN:
+                if now - self.trial_started_at < self.cool_down:
+                    self.rejected += 1
+                    return False
+                self.trial_started_at = now
+                return True
+            return True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        # A request cancelled on purpose, e.g. a losing hedge, says nothing
+        # about DraftKings; only a cancelled trial has to reopen the breaker
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def jittered_backoff(attempt: int, base: float = 0.5, cap: float = 30.0, retry_after: Optional[float] = None) -> float:
+    # Full jitter, but never earlier than the server asked for
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(cap, retry_after))
+    return delay
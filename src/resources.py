@@ -0,0 +1,75 @@
+import logging
+import os
+import threading
+from typing import Dict, Any
+import httpx
+from dotenv import load_dotenv
+from slack_sdk import WebClient
+from supabase import create_client, Client, ClientOptions
+
+logger = logging.getLogger(__name__)
+
+
+# Owns the clients that are expensive to build and worth sharing: one
+# Supabase client on a single pooled httpx.Client, and one Slack WebClient.
+# Components get them injected instead of each building their own, so the
+# environment is read once, keep-alive connections are reused across
+# threads and all database sockets are counted in one place.
+class ResourceRegistry:
+    def __init__(self, max_connections: int = 10, keepalive_expiry: float = 30.0, timeout: float = 30.0,
+                 env_file: str = '.env.local', transport: httpx.BaseTransport = None):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        load_dotenv(env_file)
+        self.max_connections = max_connections
+        self.requests = 0
+        self.lock = threading.Lock()
+        # Sized to the pipeline's concurrency, so no persist worker waits
+        # for a connection and idle ones stay open between cycles
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=keepalive_expiry),
+            timeout=timeout,
+            follow_redirects=True,
+            event_hooks={'request': [self._count_request]},
+            transport=transport,
+        )
+        self.supabase = None
+        self.slack_client = None
+
+    def get_supabase(self) -> Client:
+        with self.lock:
+            if self.supabase is None:
+                url = os.getenv("SUPABASE_URL")
+                key = os.getenv("SUPABASE_KEY")
+                if not url or not key:
+                    raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env.local file")
+                self.supabase = create_client(url, key, options=ClientOptions(httpx_client=self.http_client))
+            return self.supabase
+
+    def get_slack_client(self) -> WebClient:
+        with self.lock:
+            if self.slack_client is None:
+                self.slack_client = WebClient(token=os.getenv("SLACK_BOT_TOKEN") or "test_token")
+            return self.slack_client
+
+    def _count_request(self, request: httpx.Request) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        # The pool lives on the transport; fall back to zero counts if httpx
+        # ever moves it
+        pool = getattr(self.http_client._transport, '_pool', None)
+        connections = list(getattr(pool, 'connections', []))
+        with self.lock:
+            requests = self.requests
+        return {
+            'max_connections': self.max_connections,
+            'open_connections': len(connections),
+            'idle_connections': sum(1 for connection in connections if connection.is_idle()),
+            'requests': requests,
+        }
+
+    def close(self) -> None:
+        self.http_client.close()
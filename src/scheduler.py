@@ -1,3 +1,4 @@
+import os
 import schedule
 import time
 import logging
@@ -6,29 +7,104 @@ import sys
 from .data_fetcher import DataFetcher
 from .data_processor import DataProcessor
 from .database_manager import DatabaseManager
+from .detail_cache import DetailCache
+from .metrics import MetricsServer, TraceIdFilter, metrics
+from .notification_ledger import NotificationLedger
+from .notification_outbox import NotificationOutbox
+from .profiling import CycleProfiler
+from .resources import ResourceRegistry
 from .slack_notifier import SlackNotifier
-from .utils import with_spinner
+from .utils import progress
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def configure_logging():
+    # Tags every line with the trace id of the cycle that logged it
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'))
+    handler.addFilter(TraceIdFilter(metrics))
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
 class Scheduler:
     def __init__(self):
-        self.data_fetcher = DataFetcher()
-        self.data_processor = DataProcessor(self.data_fetcher)
-        self.db_manager = DatabaseManager()
-        self.slack_notifier = SlackNotifier()
+        # Parsed detail pages are kept in DETAIL_CACHE_PATH across restarts;
+        # set it empty to keep them in memory only
+        self.detail_cache = DetailCache(path=os.getenv("DETAIL_CACHE_PATH", "detail_cache.sqlite") or None)
+        # DK_SPORTS is a comma separated list, e.g. "NFL,NBA,MLB,NHL"
+        sports = [sport.strip() for sport in os.getenv("DK_SPORTS", "").split(",") if sport.strip()] or None
+        sport_workers = len(sports or DataFetcher.SUPPORTED_SPORTS)
+        persist_workers = 2
+        # DK_FETCH_MODE=async downloads detail pages on one event loop and
+        # DK_PARSE_WORKERS > 0 parses them in that many worker processes.
+        # Both only pay off for batches, so the pipeline then fetches
+        # DK_FETCH_BATCH_SIZE contests per call
+        fetch_mode = os.getenv("DK_FETCH_MODE", "threads")
+        parse_workers = int(os.getenv("DK_PARSE_WORKERS", "0"))
+        fetch_batch_size = int(os.getenv("DK_FETCH_BATCH_SIZE", "20")) if fetch_mode == "async" or parse_workers > 0 else None
+        # DK_PARSER_BACKEND is "soup" or "lxml"
+        # DK_BASE_URL points the fetcher somewhere else, e.g. benchmarks.dk_stand_in
+        self.data_fetcher = DataFetcher(detail_cache=self.detail_cache, sports=sports, lobby_workers=sport_workers,
+                                        adaptive_rate=True, hedge_percentile=float(os.getenv("DK_HEDGE_PERCENTILE", "0")) or None,
+                                        base_url=os.getenv("DK_BASE_URL"), fetch_mode=fetch_mode,
+                                        parser_backend=os.getenv("DK_PARSER_BACKEND", "soup"),
+                                        parse_workers=parse_workers)
+        # Every sport runs its own persist workers, plus one connection for
+        # the unprocessed-contests pass
+        self.resources = ResourceRegistry(max_connections=sport_workers * persist_workers + 1)
+        supabase = self.resources.get_supabase()
+        self.slack_notifier = SlackNotifier(client=self.resources.get_slack_client())
+        # Notifications are queued and sent as one digest per cycle in the
+        # background, so Slack rate limits never stall processing
+        self.notification_outbox = NotificationOutbox(self.slack_notifier)
+        # One ledger for both managers, so a contest notified by the pipeline
+        # is not notified again by the unprocessed-contests pass
+        # It lives in NOTIFICATION_LEDGER_PATH so a restart does not notify
+        # again; set it empty to keep the ledger in memory only
+        self.notification_ledger = NotificationLedger(os.getenv("NOTIFICATION_LEDGER_PATH", "notifications.sqlite") or None)
+        self.data_processor = DataProcessor(self.data_fetcher, fetch_batch_size=fetch_batch_size, persist_workers=persist_workers, sport_workers=sport_workers,
+                                            notifier=self.notification_outbox, notification_ledger=self.notification_ledger,
+                                            supabase=supabase)
+        self.db_manager = DatabaseManager(notifier=self.notification_outbox, notification_ledger=self.notification_ledger,
+                                          supabase=supabase)
+        # Serves /metrics and /cycle on localhost; set METRICS_PORT empty to disable
+        metrics_port = os.getenv("METRICS_PORT", "9102")
+        self.metrics_server = MetricsServer(metrics, host=os.getenv("METRICS_HOST", "127.0.0.1"), port=int(metrics_port)) if metrics_port else None
+        # PROFILE_EVERY_N_CYCLES and/or PROFILE_TIME_BUDGET (seconds) turn on
+        # cProfile and tracemalloc for selected cycles
+        time_budget = os.getenv("PROFILE_TIME_BUDGET")
+        self.profiler = CycleProfiler(every_n=int(os.getenv("PROFILE_EVERY_N_CYCLES", "0")),
+                                      time_budget=float(time_budget) if time_budget else None,
+                                      output_dir=os.getenv("PROFILE_DIR", "profiles"),
+                                      keep=int(os.getenv("PROFILE_KEEP", "20")))
         self.is_running = False
 
     def run_contest_finder(self):
-        logger.info("Starting contest finder process")
-        contests = self.data_fetcher.fetch_all_contests()
-        self.data_processor.process_contests(contests)
-        self.data_processor.process_unprocessed_contests()
+        trace_id = metrics.start_cycle()
+        logger.info(f"Starting contest finder process, trace {trace_id}")
+        try:
+            # One progress display for the whole cycle; the spans inside only
+            # record timings
+            with self.profiler.cycle(trace_id), progress.cycle("Running contest finder"):
+                self.data_processor.process_lobbies(self.data_fetcher.iter_all_contests())
+                self.data_processor.process_unprocessed_contests()
+            self.notification_outbox.end_cycle()
+        finally:
+            summary = metrics.end_cycle({
+                'spans': progress.snapshot(),
+                'detail_cache': self.detail_cache.get_stats(),
+                'lobby_transfer': self.data_fetcher.get_lobby_metrics(),
+                'request_rate': self.data_fetcher.get_rate_metrics(),
+                'database_connections': self.resources.get_metrics(),
+                'notification_outbox': self.notification_outbox.get_metrics(),
+            })
+            logger.info(f"Cycle summary: {summary}")
         logger.info("Contest finder process completed")
 
     def start(self):
         self.is_running = True
+        if self.metrics_server is not None:
+            self.metrics_server.start()
         schedule.every(5).minutes.do(self.run_contest_finder)
         logger.info("Scheduler started. Running contest finder every 5 minutes.")
         
@@ -46,6 +122,11 @@ class Scheduler:
     def stop(self):
         self.is_running = False
         schedule.clear()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.notification_outbox.close()
+        self.notification_ledger.close()
+        self.resources.close()
         logger.info("Scheduler stopped.")
 
 def signal_handler(signum, frame):
@@ -54,6 +135,7 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 if __name__ == "__main__":
+    configure_logging()
     scheduler = Scheduler()
     
     # Register signal handlers for graceful shutdown
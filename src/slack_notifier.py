@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 import time
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +33,11 @@ class SlackNotifier:
     def send_notification(self, message, max_retries=3):
         for attempt in range(max_retries):
             try:
-                response = self.client.chat_postMessage(
-                    channel=self.channel,
-                    text=message
-                )
+                with metrics.timed("slack_send"):
+                    response = self.client.chat_postMessage(
+                        channel=self.channel,
+                        text=message
+                    )
                 logger.info(f"Message sent successfully to channel {self.channel}")
                 return response
             except SlackApiError as e:
@@ -48,10 +50,17 @@ class SlackNotifier:
                     raise e
         raise Exception("Max retries exceeded")
 
-    def notify_contest(self, contest: Dict[str, Any], entrants: list[Dict[str, Any]]) -> None:
+    def notify_contest(self, contest: Dict[str, Any], entrants: list[Dict[str, Any]], callback=None) -> None:
         print(entrants)
         message = self._format_contest_message(contest, entrants)
-        self.send_notification(message)
+        try:
+            self.send_notification(message)
+        except Exception:
+            if callback is not None:
+                callback(False)
+            raise
+        if callback is not None:
+            callback(True)
 
     def _format_contest_message(self, contest: Dict[str, Any], entrants: list[Dict[str, Any]]) -> str:
         message = f"""
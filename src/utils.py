@@ -1,17 +1,121 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from functools import wraps
+from typing import Dict, Any
 from halo import Halo
 
+# Set DK_ENV=production (or DK_PROGRESS=headless) to never draw spinners,
+# e.g. when running as a daemon with stdout going to a log file
+PRODUCTION_ENVIRONMENTS = {'production', 'prod'}
+
+
+def is_interactive() -> bool:
+    if os.getenv("DK_PROGRESS", "").lower() == "headless":
+        return False
+    if os.getenv("DK_ENV", "").lower() in PRODUCTION_ENVIRONMENTS:
+        return False
+    return sys.stdout.isatty()
+
+
+# Collects a timing sample for every with_spinner span. Recording is a dict
+# update under a lock, with no thread or terminal I/O, so it is cheap enough
+# for spans that run once per contest inside worker threads. During a cycle
+# an interactive run shows a single spinner whose text summarizes the spans.
+class ProgressRecorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.display = None
+
+    def record(self, name: str, seconds: float, failed: bool = False) -> None:
+        with self.lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = {'count': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0}
+            span['count'] += 1
+            span['errors'] += int(failed)
+            span['total_time'] += seconds
+            span['max_time'] = max(span['max_time'], seconds)
+            display = self.display
+        if display is not None:
+            # Halo redraws from its own thread; only the text is swapped here
+            display.text = self.summary()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            spans = {name: dict(span) for name, span in self.spans.items()}
+        for span in spans.values():
+            span['avg_time'] = span['total_time'] / span['count']
+        return spans
+
+    def summary(self) -> str:
+        with self.lock:
+            counts = [(name, span['count']) for name, span in self.spans.items()]
+        return ", ".join(f"{name}: {count}" for name, count in counts)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.spans = {}
+
+    def shows_spinners(self) -> bool:
+        # Per-span spinners only outside a cycle, on the main thread and on
+        # a terminal; everything else is recorded silently
+        return self.display is None and threading.current_thread() is threading.main_thread() and is_interactive()
+
+    @contextmanager
+    def cycle(self, text: str = "Running"):
+        # Starts a fresh set of samples and, when interactive, one spinner
+        # for the whole cycle
+        self.reset()
+        if threading.current_thread() is not threading.main_thread() or not is_interactive():
+            yield self
+            return
+        display = Halo(text=text, spinner="dots")
+        display.start()
+        self.display = display
+        try:
+            yield self
+        except Exception as e:
+            display.fail(f"Error: {str(e)}")
+            raise
+        else:
+            display.succeed(f"{text} ({self.summary()})")
+        finally:
+            self.display = None
+            display.stop()
+
+
+progress = ProgressRecorder()
+
+
 def with_spinner(text="Loading", spinner_type="dots"):
+    name = text.strip()
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            if not progress.shows_spinners():
+                try:
+                    result = func(*args, **kwargs)
+                except Exception:
+                    progress.record(name, time.perf_counter() - started, failed=True)
+                    raise
+                progress.record(name, time.perf_counter() - started)
+                return result
+
             with Halo(text=text, spinner=spinner_type) as spinner:
                 try:
                     result = func(*args, **kwargs)
                     spinner.succeed()
+                    progress.record(name, time.perf_counter() - started)
                     return result
                 except Exception as e:
                     spinner.fail(f"Error: {str(e)}")
+                    progress.record(name, time.perf_counter() - started, failed=True)
                     raise
         return wrapper
     return decorator
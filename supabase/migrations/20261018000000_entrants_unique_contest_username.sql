@@ -0,0 +1,19 @@
+-- Entrant upserts use on_conflict=contest_id,username, which PostgREST can
+-- only resolve against a unique constraint on those columns
+
+-- Keep one row per (contest_id, username) so the constraint can be added
+delete from entrants a
+using entrants b
+where a.contest_id = b.contest_id
+  and a.username = b.username
+  and a.ctid < b.ctid;
+
+do $$
+begin
+  if not exists (
+    select 1 from pg_constraint where conname = 'entrants_contest_id_username_key'
+  ) then
+    alter table entrants
+      add constraint entrants_contest_id_username_key unique (contest_id, username);
+  end if;
+end $$;
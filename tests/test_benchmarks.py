@@ -0,0 +1,46 @@
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from benchmarks.fakes import FakeSupabase
+from benchmarks.suite import compare, main
+from src.database_manager import DatabaseManager
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_compare_flags_slowdowns_over_threshold(self):
+        baseline = {'fast': {'median': 0.010}, 'slow': {'median': 0.010}}
+        results = {'fast': {'median': 0.011}, 'slow': {'median': 0.020}, 'new': {'median': 1.0}}
+        regressions = compare(results, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('slow: 10.00 ms -> 20.00 ms'))
+
+    def test_missing_baseline_fails_the_check(self):
+        # main() silences logging for the timed code
+        self.addCleanup(logging.disable, logging.NOTSET)
+        with tempfile.TemporaryDirectory() as directory:
+            missing = os.path.join(directory, 'baseline.json')
+            stderr = io.StringIO()
+            with patch('sys.argv', ['suite', '--only', 'no such benchmark', '--baseline', missing]), \
+                    patch.dict(os.environ), contextlib.redirect_stderr(stderr):
+                with self.assertRaises(SystemExit) as raised:
+                    main()
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn('no regression check ran', stderr.getvalue())
+
+    def test_fake_supabase_backs_database_manager(self):
+        supabase = FakeSupabase()
+        db_manager = DatabaseManager(notifier=object(), supabase=supabase)
+        contest = {'id': 1, 'title': 'NFL $5 Double Up', 'entry_fee': 5.0, 'total_prizes': 9.0,
+                   'entries': {'current': 1, 'maximum': 2}, 'status': 'unprocessed'}
+        db_manager.insert_or_update_contest_and_entrants(contest, [{'username': 'a', 'experience_level': 1}])
+        self.assertEqual(db_manager.get_unprocessed_contests()[0]['id'], 1)
+        self.assertEqual(db_manager.get_contest_entrants(1), [{'username': 'a', 'experience_level': 1, 'contest_id': 1}])
+
+        db_manager.update_contest_status(1, 'scooped')
+        self.assertEqual(db_manager.get_unprocessed_contests(), [])
+
+if __name__ == '__main__':
+    unittest.main()
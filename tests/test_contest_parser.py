@@ -0,0 +1,138 @@
+import os
+import unittest
+from src.contest_parser import parse_contest_details_html, parse_contest_details_html_lxml, parse_contest_details_pages, parse_int_value, stream_contest_details
+
+SAMPLE_PAGE_PATH = os.path.join(os.path.dirname(__file__), '..', 'project-documents', 'sample-contest-details.html')
+
+def load_sample_page():
+    with open(SAMPLE_PAGE_PATH, encoding='utf-8') as sample_file:
+        return sample_file.read()
+
+class TestContestParser(unittest.TestCase):
+    def test_parse_sample_contest_details(self):
+        result = parse_contest_details_html(load_sample_page())
+
+        self.assertEqual(result['title'], 'NFL $1 Double Up')
+        self.assertEqual(result['entry_fee'], 1.0)
+        self.assertEqual(result['total_prizes'], 10.0)
+        self.assertEqual(result['entries'], {'current': 7, 'maximum': 11})
+        self.assertEqual(len(result['participants']), 7)
+        self.assertEqual(result['participants'][0], {'username': 'nwarra', 'experience_level': 3})
+        self.assertEqual(result['participants'][2], {'username': 'Hawkins810', 'experience_level': 2})
+        self.assertEqual(result['participants'][3], {'username': 'indermillba', 'experience_level': 1})
+
+    def test_parse_page_without_contest_info(self):
+        self.assertEqual(parse_contest_details_html('<html><body></body></html>'), {})
+
+    def test_parse_contest_details_pages(self):
+        results = parse_contest_details_pages([load_sample_page(), '<html></html>'])
+        self.assertEqual(results[0]['title'], 'NFL $1 Double Up')
+        self.assertEqual(results[1], {})
+
+    def test_parse_int_value(self):
+        self.assertEqual(parse_int_value('1,250'), 1250)
+        self.assertEqual(parse_int_value('1.5K'), 1500)
+        self.assertEqual(parse_int_value('2M'), 2000000)
+        self.assertEqual(parse_int_value('n/a'), 0)
+
+class TestLxmlContestParser(unittest.TestCase):
+    HEADER = '''
+        <h2 data-test-id="contest-name"> NFL <b>$5</b> Double Up </h2>
+        <p><span class="stat contest-entries">1,002</span>/<span data-test-id="contest-seats">1.5K</span></p>
+        <p data-test-id="contest-entry-fee">$5</p>
+        <p data-test-id="contest-total-prizes">$1,000</p>
+    '''
+
+    def assert_backends_match(self, html):
+        expected = parse_contest_details_html(html)
+        self.assertEqual(parse_contest_details_html_lxml(html), expected)
+        return expected
+
+    def test_sample_page(self):
+        result = self.assert_backends_match(load_sample_page())
+        self.assertEqual(len(result['participants']), 7)
+
+    def test_cell_variants(self):
+        html = '<html><body>' + self.HEADER + '''
+            <table id="entrants-table"><tbody><tr>
+                <td class="entrant"><span class="entrant-username bold"> alice </span><span class="icon-experienced-user-4 big"></span></td>
+                <td><span class="entrant-username">bob</span></td>
+                <td class="empty-user other">&nbsp;</td>
+                <td><span class="entrant-username">carol</span><span class="badge icon-experienced-user-5"></span></td>
+            </tr></tbody></table>
+            <table id="entrants-table"><tr><td><span class="entrant-username">ignored</span></td></tr></table>
+        </body></html>'''
+        result = self.assert_backends_match(html)
+        self.assertEqual(result['entries'], {'current': 1002, 'maximum': 1500})
+        self.assertEqual(result['title'], 'NFL $5 Double Up')
+        self.assertEqual(result['participants'], [
+            {'username': 'alice', 'experience_level': 3},
+            {'username': 'bob', 'experience_level': 0},
+            {'username': 'carol', 'experience_level': 0},
+        ])
+
+    def test_invalid_pages(self):
+        missing_username = '<html>' + self.HEADER + '<table id="entrants-table"><tr><td><span>x</span></td></tr></table></html>'
+        for html in ['', '<html></html>', missing_username]:
+            self.assertEqual(self.assert_backends_match(html), {})
+
+    def test_contest_without_entrants(self):
+        no_entrants = '<html>' + self.HEADER + '<table id="entrants-table"></table></html>'
+        result = self.assert_backends_match(no_entrants)
+        self.assertEqual(result['entries'], {'current': 1002, 'maximum': 1500})
+        self.assertEqual(result['participants'], [])
+
+    def test_parse_pages_with_backend(self):
+        results = parse_contest_details_pages([load_sample_page()], backend='lxml')
+        self.assertEqual(results[0]['title'], 'NFL $1 Double Up')
+
+class TestStreamingContestParser(unittest.TestCase):
+    class StopAfter:
+        def __init__(self, count):
+            self.count = count
+            self.seen = []
+
+        def add(self, participant):
+            self.seen.append(participant)
+            return len(self.seen) >= self.count
+
+    def chunks(self, html, size=256, consumed=None):
+        data = html.encode('utf-8')
+        for start in range(0, len(data), size):
+            if consumed is not None:
+                consumed.append(start)
+            yield data[start:start + size]
+
+    def test_matches_full_parse_when_never_settled(self):
+        html = load_sample_page()
+        result = stream_contest_details(self.chunks(html), lambda header: self.StopAfter(100))
+        self.assertTrue(result.pop('complete'))
+        self.assertEqual(result, parse_contest_details_html(html))
+
+    def test_stops_reading_once_settled(self):
+        html = load_sample_page()
+        evaluators = []
+        consumed = []
+
+        def make_evaluator(header):
+            self.assertEqual(header['entries'], {'current': 7, 'maximum': 11})
+            evaluators.append(self.StopAfter(2))
+            return evaluators[0]
+
+        result = stream_contest_details(self.chunks(html, consumed=consumed), make_evaluator)
+        self.assertFalse(result['complete'])
+        self.assertEqual(result['participants'], parse_contest_details_html(html)['participants'][:2])
+        self.assertEqual(evaluators[0].seen, result['participants'])
+        self.assertLess(len(consumed) * 256, len(html.encode('utf-8')))
+
+    def test_invalid_pages(self):
+        self.assertEqual(stream_contest_details(self.chunks('<html></html>')), {})
+
+    def test_contest_without_entrants(self):
+        no_entrants = '<html>' + TestLxmlContestParser.HEADER + '<table id="entrants-table"></table></html>'
+        result = stream_contest_details(self.chunks(no_entrants))
+        self.assertTrue(result.pop('complete'))
+        self.assertEqual(result, parse_contest_details_html(no_entrants))
+
+if __name__ == '__main__':
+    unittest.main()
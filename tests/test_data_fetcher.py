@@ -1,8 +1,17 @@
+import asyncio
+import io
+import json
+import os
+import time
 import unittest
 import requests
+import httpx
 from unittest.mock import patch, MagicMock
 from bs4 import BeautifulSoup
 from src.data_fetcher import DataFetcher
+from src.detail_cache import DetailCache
+
+SAMPLE_PAGE_PATH = os.path.join(os.path.dirname(__file__), '..', 'project-documents', 'sample-contest-details.html')
 
 class TestDataFetcher(unittest.TestCase):
 
@@ -28,6 +37,81 @@ class TestDataFetcher(unittest.TestCase):
         result = self.data_fetcher.fetch_contests("NFL")
         self.assertEqual(result, [{"id": 1, "name": "Test Contest"}])
 
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_fetch_contests_conditional(self, mock_wait, mock_get):
+        body = b'{"Contests": [{"id": 1}]}'
+        mock_get.side_effect = [
+            MagicMock(status_code=200, content=body, headers={"ETag": '"v1"', "Content-Length": "20"}),
+            MagicMock(status_code=304, content=b'', headers={}),
+        ]
+
+        self.assertEqual(self.data_fetcher.fetch_contests("NFL"), [{"id": 1}])
+        self.assertIsNone(self.data_fetcher.fetch_contests("NFL"))
+
+        first_headers = mock_get.call_args_list[0][1]['headers']
+        second_headers = mock_get.call_args_list[1][1]['headers']
+        self.assertEqual(first_headers, {"Accept-Encoding": DataFetcher.LOBBY_ACCEPT_ENCODING})
+        self.assertEqual(second_headers["If-None-Match"], '"v1"')
+
+        metrics = self.data_fetcher.get_lobby_metrics()["NFL"]
+        self.assertEqual(metrics["requests"], 2)
+        self.assertEqual(metrics["not_modified"], 1)
+        self.assertEqual(metrics["body_bytes"], len(body))
+        self.assertEqual(metrics["wire_bytes"], 20)
+
+        self.data_fetcher.forget_lobby_validators()
+        self.assertNotIn("If-None-Match", self.data_fetcher._lobby_request_headers("NFL"))
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_fetch_contests_streaming_decode(self, mock_wait, mock_get):
+        contests = [
+            {"id": 1, "m": 3, "a": 5, "gameType": "Classic"},
+            {"id": 2, "m": 100, "a": 5, "gameType": "Classic"},
+            {"id": 3, "m": 3, "a": 5, "gameType": "Tiers"},
+        ]
+        mock_get.return_value = MagicMock(status_code=200, raw=io.BytesIO(json.dumps({"Contests": contests}).encode()), headers={})
+        data_fetcher = DataFetcher(lobby_decode="stream")
+
+        self.assertEqual(data_fetcher.fetch_contests("NFL"), [contests[0]])
+        self.assertTrue(mock_get.call_args[1]['stream'])
+        self.assertEqual(data_fetcher.get_lobby_metrics()["NFL"]["prefiltered"], 2)
+
+        with self.assertRaises(ValueError):
+            DataFetcher(lobby_decode="lazy")
+
+    @patch('src.data_fetcher.DataFetcher._fetch_contests')
+    def test_iter_all_contests_concurrently(self, mock_fetch_contests):
+        mock_fetch_contests.side_effect = lambda sport: None if sport == "NHL" else [{"id": sport}]
+        data_fetcher = DataFetcher(sports=["NFL", "NBA", "NHL"], lobby_workers=3)
+
+        lobbies = dict(data_fetcher.iter_all_contests())
+
+        self.assertEqual(lobbies, {"NFL": [{"id": "NFL"}], "NBA": [{"id": "NBA"}]})
+        self.assertEqual(mock_fetch_contests.call_count, 3)
+
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    @patch('src.rate_limiter.TokenBucket.acquire')
+    def test_concurrent_lobbies_use_shared_rate_budget(self, mock_acquire, mock_wait):
+        DataFetcher(lobby_workers=2)._pace_lobby_request()
+        mock_acquire.assert_called_once()
+        mock_wait.assert_not_called()
+
+    @patch('src.data_fetcher.DataFetcher.fetch_contests')
+    def test_fetch_all_contests_skips_unmodified_lobby(self, mock_fetch_contests):
+        mock_fetch_contests.return_value = None
+        self.assertEqual(self.data_fetcher.fetch_all_contests(), {})
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_failed_lobby_is_skipped_not_emptied(self, mock_wait, mock_get):
+        mock_get.side_effect = requests.ConnectionError("reset")
+        data_fetcher = DataFetcher(max_retries=0)
+        self.assertIsNone(data_fetcher.fetch_contests("NFL"))
+        # Nothing is yielded, so the sport's snapshot and ledger stay put
+        self.assertEqual(data_fetcher.fetch_all_contests(), {})
+
     def test_fetch_contests_unsupported_sport(self):
         result = self.data_fetcher.fetch_contests("UNSUPPORTED")
         self.assertEqual(result, [])
@@ -84,6 +168,284 @@ class TestDataFetcher(unittest.TestCase):
         result = self.data_fetcher.fetch_contest_details("123")
         self.assertEqual(result, {})
 
+    def test_fetch_multiple_contest_details_async(self):
+        page = '''
+        <html>
+            <h2 data-test-id="contest-name">Contest {id}</h2>
+            <span class="contest-entries">1</span>
+            <span data-test-id="contest-seats">3</span>
+            <p data-test-id="contest-entry-fee">$5</p>
+            <p data-test-id="contest-total-prizes">$15</p>
+            <table id="entrants-table">
+                <tr><td><span class="entrant-username">user{id}</span><span class="icon-experienced-user-2"></span></td></tr>
+            </table>
+        </html>
+        '''
+        requested_ids = []
+
+        def handler(request):
+            contest_id = request.url.params['contestId']
+            requested_ids.append(contest_id)
+            if contest_id == '3':
+                return httpx.Response(500)
+            return httpx.Response(200, text=page.replace('{id}', contest_id))
+
+        fetcher = DataFetcher(fetch_mode="async", requests_per_second=1000, burst=10, max_in_flight=2, max_retries=0)
+        fetcher._create_async_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        result = fetcher.fetch_multiple_contest_details(['1', '2', '3'])
+
+        self.assertEqual(sorted(requested_ids), ['1', '2', '3'])
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0]['title'], 'Contest 1')
+        self.assertEqual(result[1]['participants'], [{'username': 'user2', 'experience_level': 2}])
+        self.assertEqual(result[2], {})
+
+    def test_fetch_multiple_contest_details_async_uses_cache(self):
+        with open(SAMPLE_PAGE_PATH, encoding='utf-8') as sample_file:
+            sample_page = sample_file.read()
+        requested_ids = []
+
+        def handler(request):
+            requested_ids.append(request.url.params['contestId'])
+            return httpx.Response(200, text=sample_page)
+
+        fetcher = DataFetcher(fetch_mode="async", requests_per_second=1000, burst=10, max_retries=0, detail_cache=DetailCache())
+        fetcher._create_async_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        fetcher.fetch_multiple_contest_details(['1', '2'], entry_counts=[7, 7])
+        result = fetcher.fetch_multiple_contest_details(['1', '2'], entry_counts=[7, 8])
+
+        # Contest 2 gained an entrant in the lobby, so only its page is stale
+        self.assertEqual(sorted(requested_ids), ['1', '2', '2'])
+        self.assertEqual(result[0]['entries'], {'current': 7, 'maximum': 11})
+
+    def test_fetch_multiple_contest_details_with_parse_pool(self):
+        with open(SAMPLE_PAGE_PATH, encoding='utf-8') as sample_file:
+            sample_page = sample_file.read()
+        fetcher = DataFetcher(parse_workers=2, parse_chunksize=2)
+        fetcher._fetch_contest_html = MagicMock(side_effect=lambda contest_id: None if contest_id == '4' else sample_page)
+        try:
+            result = fetcher.fetch_multiple_contest_details(['1', '2', '3', '4', '5'])
+        finally:
+            fetcher.close()
+
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result[3], {})
+        self.assertEqual(sum(1 for contest in result if contest.get('title') == 'NFL $1 Double Up'), 4)
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_fetch_contest_details_with_parse_pool(self, mock_wait, mock_get):
+        with open(SAMPLE_PAGE_PATH, encoding='utf-8') as sample_file:
+            mock_get.return_value = MagicMock(text=sample_file.read())
+        fetcher = DataFetcher(parse_workers=1)
+        try:
+            result = fetcher.fetch_contest_details("164121041")
+        finally:
+            fetcher.close()
+        self.assertEqual(result['entries'], {'current': 7, 'maximum': 11})
+
+    def test_invalid_fetch_mode(self):
+        with self.assertRaises(ValueError):
+            DataFetcher(fetch_mode="processes")
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_fetch_contest_details_lxml_backend(self, mock_wait, mock_get):
+        with open(SAMPLE_PAGE_PATH, encoding='utf-8') as sample_file:
+            mock_get.return_value = MagicMock(text=sample_file.read())
+        soup_result = DataFetcher().fetch_contest_details("164121041")
+        lxml_result = DataFetcher(parser_backend="lxml").fetch_contest_details("164121041")
+        self.assertEqual(lxml_result, soup_result)
+
+        with self.assertRaises(ValueError):
+            DataFetcher(parser_backend="regex")
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_fetch_contest_details_streaming(self, mock_wait, mock_get):
+        with open(SAMPLE_PAGE_PATH, 'rb') as sample_file:
+            page = sample_file.read()
+        mock_response = MagicMock()
+        mock_response.iter_content.return_value = iter([page[i:i + 512] for i in range(0, len(page), 512)])
+        mock_get.return_value = mock_response
+
+        evaluator = MagicMock()
+        evaluator.add.side_effect = [False, True]
+        result = self.data_fetcher.fetch_contest_details_streaming("164121041", lambda header: evaluator)
+
+        mock_get.assert_called_once_with(DataFetcher.CONTEST_DETAILS_URL.format("164121041"), timeout=(5.0, 15.0), stream=True)
+        mock_response.close.assert_called_once()
+        self.assertFalse(result['complete'])
+        self.assertEqual(len(result['participants']), 2)
+
+        mock_get.side_effect = requests.RequestException("Test error")
+        self.assertEqual(self.data_fetcher.fetch_contest_details_streaming("164121041", lambda header: evaluator), {})
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_fetch_contest_details_with_cache(self, mock_wait, mock_get):
+        with open(SAMPLE_PAGE_PATH, encoding='utf-8') as sample_file:
+            mock_get.return_value = MagicMock(text=sample_file.read())
+        data_fetcher = DataFetcher(detail_cache=DetailCache())
+
+        first = data_fetcher.fetch_contest_details("164121041", entry_count=7)
+        second = data_fetcher.fetch_contest_details("164121041", entry_count=7)
+        self.assertEqual(second, first)
+        self.assertEqual(mock_get.call_count, 1)
+
+        # The lobby reports a new entrant, so the cached page is stale
+        data_fetcher.fetch_contest_details("164121041", entry_count=8)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(data_fetcher.detail_cache.get_stats()['hits'], 1)
+
+    @patch('src.data_fetcher.time.sleep')
+    @patch('src.data_fetcher.jittered_backoff', return_value=0.25)
+    @patch('requests.Session.get')
+    def test_get_retries_throttled_requests(self, mock_get, mock_backoff, mock_sleep):
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "7"})
+        mock_get.side_effect = [throttled, MagicMock(status_code=200, headers={})]
+        data_fetcher = DataFetcher(adaptive_rate=True, requests_per_second=1.0, burst=5)
+
+        response = data_fetcher._get("https://example.com", lambda: None, detail=True)
+
+        self.assertEqual(response.status_code, 200)
+        throttled.close.assert_called_once()
+        mock_backoff.assert_called_once_with(0, retry_after=7.0)
+        mock_sleep.assert_called_once_with(0.25)
+        metrics = data_fetcher.get_rate_metrics()
+        self.assertEqual(metrics["retries"], 1)
+        self.assertEqual(metrics["throttles"], 1)
+        # Halved by the 429, then one additive step back up
+        self.assertAlmostEqual(metrics["rate"], 0.55)
+        self.assertEqual(metrics["circuit_breaker"]["state"], "closed")
+
+    @patch('src.data_fetcher.time.sleep')
+    @patch('requests.Session.get')
+    def test_get_gives_up_after_max_retries(self, mock_get, mock_sleep):
+        mock_get.side_effect = requests.ConnectionError("reset")
+        data_fetcher = DataFetcher(max_retries=2)
+        with self.assertRaises(requests.ConnectionError):
+            data_fetcher._get("https://example.com", lambda: None)
+        self.assertEqual(mock_get.call_count, 3)
+
+        mock_get.side_effect = None
+        mock_get.return_value = MagicMock(status_code=502, headers={})
+        self.assertEqual(data_fetcher._get("https://example.com", lambda: None).status_code, 502)
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_circuit_breaker_pauses_detail_fetches(self, mock_wait, mock_get):
+        mock_get.return_value = MagicMock(status_code=500, headers={})
+        mock_get.return_value.raise_for_status.side_effect = requests.HTTPError("500")
+        data_fetcher = DataFetcher(max_retries=0, breaker_threshold=2, breaker_cool_down=60.0)
+
+        for _ in range(3):
+            self.assertEqual(data_fetcher.fetch_contest_details("1"), {})
+
+        # The third fetch never reached DraftKings
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(data_fetcher.get_rate_metrics()["circuit_breaker"]["state"], "open")
+
+    @patch('src.rate_limiter.time.monotonic')
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_circuit_breaker_records_trial_that_raises(self, mock_wait, mock_get, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        data_fetcher = DataFetcher(max_retries=0, breaker_threshold=1, breaker_cool_down=60.0)
+        data_fetcher.circuit_breaker.record_failure()
+
+        # A broken body is not a transport error, but it still fails the trial
+        mock_monotonic.return_value = 161.0
+        mock_get.side_effect = requests.exceptions.ChunkedEncodingError("truncated")
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            data_fetcher._get("https://example.com", lambda: None, detail=True)
+        self.assertEqual(data_fetcher.get_rate_metrics()["circuit_breaker"]["state"], "open")
+
+    @patch('requests.Session.get')
+    @patch('src.data_fetcher.DataFetcher._wait_between_requests')
+    def test_hedged_request_wins_over_slow_primary(self, mock_wait, mock_get):
+        slow_response = MagicMock(status_code=200, headers={}, text="slow")
+        fast_response = MagicMock(status_code=200, headers={}, text="fast")
+
+        def get(url, **kwargs):
+            if mock_get.call_count == 1:
+                time.sleep(0.3)
+                return slow_response
+            return fast_response
+
+        mock_get.side_effect = get
+        data_fetcher = DataFetcher(hedge_percentile=95, hedge_max_fraction=1.0, requests_per_second=100, burst=5)
+        for _ in range(20):
+            data_fetcher.hedge_policy.record_result(0.01, hedge_won=False)
+
+        self.assertEqual(data_fetcher._fetch_contest_html("1"), "fast")
+        self.assertEqual(data_fetcher.get_rate_metrics()["hedging"]["hedge_wins"], 1)
+        data_fetcher.close()
+        # The losing request is closed once it finishes
+        time.sleep(0.4)
+        slow_response.close.assert_called_once()
+
+    @patch('requests.Session.get')
+    def test_hedge_respects_the_request_delay(self, mock_get):
+        def get(url, **kwargs):
+            time.sleep(0.2)
+            return MagicMock(status_code=200, headers={}, text="slow")
+
+        mock_get.side_effect = get
+        data_fetcher = DataFetcher(min_delay=5.0, max_delay=5.0, hedge_percentile=95, hedge_max_fraction=1.0)
+        for _ in range(20):
+            data_fetcher.hedge_policy.record_result(0.01, hedge_won=False)
+        # The primary has just gone out, so the random delay is not over yet
+        data_fetcher.last_request_time = time.time()
+
+        self.assertEqual(data_fetcher._hedged_get("https://example.com").text, "slow")
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_hedged_request_async(self):
+        async def handler(request):
+            handler.calls += 1
+            if handler.calls == 1:
+                await asyncio.sleep(0.3)
+                return httpx.Response(200, text="slow")
+            return httpx.Response(200, text="fast")
+        handler.calls = 0
+
+        data_fetcher = DataFetcher(fetch_mode="async", hedge_percentile=95, hedge_max_fraction=1.0, requests_per_second=100, burst=5)
+        for _ in range(20):
+            data_fetcher.hedge_policy.record_result(0.01, hedge_won=False)
+
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await data_fetcher._hedged_get_async(client, "https://example.com")
+
+        started = time.monotonic()
+        response = asyncio.run(fetch())
+        self.assertEqual(response.text, "fast")
+        self.assertLess(time.monotonic() - started, 0.25)
+        # The cancelled primary is not a failure
+        self.assertEqual(data_fetcher.get_rate_metrics()["circuit_breaker"]["consecutive_failures"], 0)
+
+    def test_cancelled_half_open_trial_reopens_breaker(self):
+        async def handler(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, text="late")
+
+        data_fetcher = DataFetcher(fetch_mode="async", breaker_threshold=1, breaker_cool_down=0.0, requests_per_second=100, burst=5)
+        data_fetcher.circuit_breaker.record_failure()
+
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                trial = asyncio.ensure_future(data_fetcher._get_async(client, "https://example.com"))
+                await asyncio.sleep(0.05)
+                trial.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await trial
+
+        asyncio.run(fetch())
+        self.assertEqual(data_fetcher.get_rate_metrics()["circuit_breaker"]["state"], "open")
+
     def test_parse_currency(self):
         self.assertEqual(self.data_fetcher._parse_currency('$10'), 10.0)
         self.assertEqual(self.data_fetcher._parse_currency('$1,000'), 1000.0)
@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import MagicMock, patch
-from src.data_processor import ContestFilter, DataProcessor, EntrantAnalyzer
+from src.data_processor import ContestFilter, DataProcessor, EntrantAnalyzer, StreamingContestEvaluator, UNPROCESSED_READY_THRESHOLDS
 from src.database_manager import DatabaseManager
 from src.data_fetcher import DataFetcher
 
@@ -59,6 +59,96 @@ class TestEntrantAnalyzer(unittest.TestCase):
         self.assertEqual(result['highest_experience_ratio'], 0.0)
         self.assertEqual(result['experience_distribution'], {})
 
+class TestEntrantAnalyzerBatch(unittest.TestCase):
+    def test_analyze_batch_matches_single_contest_analysis(self):
+        entrants_by_contest = [
+            [{"experience_level": 0}, {"experience_level": 1}],
+            [{"experience_level": 3}, {"experience_level": 2}, {"experience_level": 5}],
+            [],
+            [{"experience_level": 0}] * 4,
+            [{"experience_level": 1}],
+        ]
+        max_entrants = [3, 5, 4, 10, 0]
+
+        results = EntrantAnalyzer.analyze_batch(entrants_by_contest, max_entrants)
+
+        self.assertEqual(len(results), 5)
+        for entrants, size, result in zip(entrants_by_contest, max_entrants, results):
+            expected = EntrantAnalyzer.analyze_experience_levels(entrants, size)
+            self.assertEqual(result['highest_experience_ratio'], expected['highest_experience_ratio'])
+            self.assertEqual(result['experience_distribution'], expected['experience_distribution'])
+            self.assertEqual(result['status'], EntrantAnalyzer.determine_status(size, expected['highest_experience_ratio']))
+
+    def test_analyze_batch_thresholds(self):
+        entrants = [[{"experience_level": 0}, {"experience_level": 3}]]
+        self.assertEqual(EntrantAnalyzer.analyze_batch(entrants, [4])[0]['status'], 'processed')
+        self.assertEqual(EntrantAnalyzer.analyze_batch(entrants, [4], UNPROCESSED_READY_THRESHOLDS)[0]['status'], 'ready_to_enter')
+
+    def test_analyze_batch_empty(self):
+        self.assertEqual(EntrantAnalyzer.analyze_batch([], []), [])
+
+    def test_determine_status(self):
+        self.assertEqual(EntrantAnalyzer.determine_status(3, 0.69), 'ready_to_enter')
+        self.assertEqual(EntrantAnalyzer.determine_status(3, 0.7), 'processed')
+        self.assertEqual(EntrantAnalyzer.determine_status(10, 0.3), 'ready_to_enter')
+        self.assertEqual(EntrantAnalyzer.determine_status(10, 0.31), 'processed')
+
+class TestStreamingContestEvaluator(unittest.TestCase):
+    BLACKLIST = {"glamrock"}
+
+    def entrant(self, username, experience_level):
+        return {"username": username, "experience_level": experience_level}
+
+    def test_settles_full_contest(self):
+        evaluator = StreamingContestEvaluator(2, self.BLACKLIST)
+        self.assertFalse(evaluator.add(self.entrant("a", 0)))
+        self.assertTrue(evaluator.add(self.entrant("b", 0)))
+        self.assertEqual(evaluator.possible_outcomes(), {'full'})
+
+    def test_settles_scooped_contest_when_it_cannot_fill(self):
+        # The header says only two of five seats are taken
+        evaluator = StreamingContestEvaluator(5, self.BLACKLIST, expected_entrants=2)
+        self.assertFalse(evaluator.add(self.entrant("a", 3)))
+        self.assertTrue(evaluator.add(self.entrant("glamrock", 3)))
+        self.assertEqual(evaluator.possible_outcomes(), {'scooped'})
+
+    def test_blacklisted_entrant_does_not_settle_a_contest_that_can_fill(self):
+        evaluator = StreamingContestEvaluator(3, self.BLACKLIST)
+        self.assertFalse(evaluator.add(self.entrant("glamrock", 3)))
+        self.assertEqual(evaluator.possible_outcomes(), {'scooped', 'full'})
+
+    def test_settle_rejections_early(self):
+        entrants = [self.entrant(str(index), 0) for index in range(2)]
+        strict = StreamingContestEvaluator(5, self.BLACKLIST, expected_entrants=4)
+        relaxed = StreamingContestEvaluator(5, self.BLACKLIST, expected_entrants=4, settle_rejections_early=True)
+        for entrant in entrants:
+            strict.add(entrant)
+            relaxed.add(entrant)
+        # Two beginners already put the 5-seat contest under the ready
+        # threshold, so only a blacklisted user could still change it
+        self.assertEqual(strict.possible_outcomes(), {'ready_to_enter', 'scooped'})
+        self.assertFalse(strict.settled)
+        self.assertFalse(relaxed.settled)
+
+        evaluator = StreamingContestEvaluator(5, self.BLACKLIST, expected_entrants=4, settle_rejections_early=True)
+        self.assertFalse(evaluator.add(self.entrant("a", 3)))
+        self.assertTrue(evaluator.add(self.entrant("glamrock", 3)))
+        self.assertEqual(evaluator.possible_outcomes(), {'rejected'})
+
+    def test_settled_status_matches_full_analysis(self):
+        entrants = [self.entrant("a", 0), self.entrant("b", 1), self.entrant("c", 3), self.entrant("d", 2)]
+        evaluator = StreamingContestEvaluator(5, set(), expected_entrants=len(entrants))
+        settled_at = None
+        for index, entrant in enumerate(entrants):
+            if evaluator.add(entrant):
+                settled_at = index + 1
+                break
+        self.assertIsNotNone(settled_at)
+        final_status = EntrantAnalyzer.determine_status(5, EntrantAnalyzer.analyze_experience_levels(entrants, 5)['highest_experience_ratio'])
+        partial_status = EntrantAnalyzer.determine_status(5, EntrantAnalyzer.analyze_experience_levels(entrants[:settled_at], 5)['highest_experience_ratio'])
+        self.assertEqual(evaluator.possible_outcomes(), {final_status})
+        self.assertEqual(partial_status, final_status)
+
 class TestDataProcessor(unittest.TestCase):
     def setUp(self):
         self.data_processor = DataProcessor()
@@ -135,5 +225,216 @@ class TestDataProcessor(unittest.TestCase):
         self.assertEqual(processed_contest['status'], 'processed')
         self.assertEqual(processed_contest['highest_experience_ratio'], 1.0)
 
+class TestDataProcessorMockedDatabase(unittest.TestCase):
+    @patch('src.data_processor.DatabaseManager')
+    def setUp(self, mock_db_manager):
+        self.data_fetcher = MagicMock()
+        self.data_fetcher.max_workers = 2
+        self.data_processor = DataProcessor(self.data_fetcher)
+        self.mock_db = self.data_processor.db_manager
+
+    def persisted_items(self):
+        items = []
+        for call in self.mock_db.bulk_upsert_contests_and_entrants.call_args_list:
+            items.extend(call[0][0])
+        return items
+
+    def test_process_contests_pipeline(self):
+        lobby = {
+            "NFL": [
+                {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic"},
+                {"id": 2, "n": "NFL Double Up", "m": 5, "a": 5, "gameType": "Classic"},
+                {"id": 3, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic"},
+                {"id": 4, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic"},
+            ]
+        }
+        details = {
+            1: {"entries": {"current": 1, "maximum": 3}, "participants": [{"username": "a", "experience_level": 0}]},
+            2: {"entries": {"current": 2, "maximum": 5}, "participants": [{"username": "glamrock", "experience_level": 3}]},
+            3: {"entries": {"current": 3, "maximum": 3}, "participants": [{"username": "b", "experience_level": 0}] * 3},
+            4: {},
+        }
+        self.data_fetcher.fetch_contest_details.side_effect = lambda contest_id, entry_count=None: dict(details[contest_id])
+
+        self.data_processor.process_contests(lobby)
+
+        self.assertEqual(self.data_fetcher.fetch_contest_details.call_count, 4)
+        persisted = {contest['id']: contest for contest, _ in self.persisted_items()}
+        self.assertEqual(set(persisted), {1, 2})
+        self.assertEqual(persisted[1]['status'], 'ready_to_enter')
+        self.assertEqual(persisted[2]['status'], 'scooped')
+        self.assertNotIn('participants', persisted[1])
+
+    def test_process_contests_skips_unchanged_lobby_contests(self):
+        lobby = {
+            "NFL": [
+                {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1},
+                {"id": 2, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1},
+            ]
+        }
+        self.data_fetcher.fetch_contest_details.side_effect = lambda contest_id, entry_count=None: {} if contest_id == 2 else {
+            "entries": {"current": 1, "maximum": 3},
+            "participants": [{"username": "a", "experience_level": 0}],
+        }
+        self.data_processor.process_contests(lobby)
+        self.data_fetcher.fetch_contest_details.reset_mock()
+
+        lobby["NFL"].append({"id": 3, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 0})
+        self.data_processor.process_contests(lobby)
+
+        # Contest 1 is unchanged, 2 failed last time and 3 is new
+        fetched_ids = sorted(call[0][0] for call in self.data_fetcher.fetch_contest_details.call_args_list)
+        self.assertEqual(fetched_ids, [2, 3])
+        self.assertEqual(self.data_processor.last_lobby_deltas["NFL"]['added'], {2, 3})
+        # Contest 2 failed, so the next NFL lobby request must not be conditional
+        self.data_fetcher.forget_lobby_validators.assert_called_with("NFL")
+
+        lobby["NFL"] = lobby["NFL"][1:]
+        self.data_processor.process_contests(lobby)
+        self.mock_db.prune_notification_ledger.assert_called_once_with([1])
+
+    def test_unchanged_lobby_with_empty_contest_fetches_nothing_again(self):
+        lobby = {"NFL": [
+            {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 0},
+            {"id": 2, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1},
+        ]}
+        participants = {1: [], 2: [{"username": "a", "experience_level": 0}]}
+        self.data_fetcher.fetch_contest_details.side_effect = lambda contest_id, entry_count=None: {
+            "entries": {"current": len(participants[contest_id]), "maximum": 3},
+            "participants": list(participants[contest_id]),
+        }
+
+        self.data_processor.process_contests(lobby)
+        self.data_processor.process_contests(lobby)
+
+        self.assertEqual(self.data_fetcher.fetch_contest_details.call_count, 2)
+        delta = self.data_processor.last_lobby_deltas["NFL"]
+        self.assertEqual((delta['added'], delta['changed'], delta['removed']), (set(), set(), set()))
+        self.data_fetcher.forget_lobby_validators.assert_not_called()
+        # Only the contest with an entrant is persisted
+        self.assertEqual(len(self.persisted_items()), 1)
+
+    def test_process_contests_with_fetch_batches(self):
+        self.data_processor.fetch_batch_size = 2
+        lobby = {"NFL": [
+            {"id": contest_id, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1} for contest_id in [1, 2, 3]
+        ]}
+        details = {
+            1: {"entries": {"current": 1, "maximum": 3}, "participants": [{"username": "a", "experience_level": 0}]},
+            2: {},
+            3: {"entries": {"current": 1, "maximum": 3}, "participants": [{"username": "b", "experience_level": 0}]},
+        }
+        self.data_fetcher.fetch_multiple_contest_details.side_effect = lambda contest_ids, entry_counts=None: [dict(details[contest_id]) for contest_id in contest_ids]
+
+        self.data_processor.process_contests(lobby)
+
+        self.data_fetcher.fetch_contest_details.assert_not_called()
+        requested = [contest_id for call in self.data_fetcher.fetch_multiple_contest_details.call_args_list for contest_id in call[0][0]]
+        self.assertEqual(sorted(requested), [1, 2, 3])
+        self.assertEqual(self.data_fetcher.fetch_multiple_contest_details.call_args[1]['entry_counts'][0], 1)
+        self.assertEqual(sorted(contest['id'] for contest, _ in self.persisted_items()), [1, 3])
+        self.data_fetcher.forget_lobby_validators.assert_called_with("NFL")
+
+    def test_process_contests_early_exit(self):
+        self.data_processor.early_exit = True
+        lobby = {"NFL": [{"id": 1, "n": "NFL Double Up", "m": 5, "a": 5, "gameType": "Classic"}]}
+        header = {"entries": {"current": 4, "maximum": 5}}
+
+        def fetch_streaming(contest_id, make_evaluator, entry_count=None):
+            evaluator = make_evaluator(header)
+            participants = []
+            for entrant in [{"username": "a", "experience_level": 0}, {"username": "b", "experience_level": 0}]:
+                participants.append(entrant)
+                if evaluator.add(entrant):
+                    break
+            return dict(header, participants=participants, complete=False)
+
+        self.data_fetcher.fetch_contest_details_streaming.side_effect = fetch_streaming
+        self.data_processor.process_contests(lobby)
+
+        self.data_fetcher.fetch_contest_details.assert_not_called()
+        [(contest, entrants)] = self.persisted_items()
+        self.assertEqual(contest['status'], 'ready_to_enter')
+        self.assertNotIn('complete', contest)
+        self.assertEqual(len(entrants), 2)
+
+    def test_process_lobbies(self):
+        def lobbies():
+            for sport, contest_id in [("NFL", 1), ("NBA", 2)]:
+                yield sport, [{"id": contest_id, "n": "Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1}]
+
+        self.data_fetcher.fetch_contest_details.side_effect = lambda contest_id, entry_count=None: {
+            "entries": {"current": 1, "maximum": 3},
+            "participants": [{"username": "a", "experience_level": 0}],
+        }
+        self.data_processor.process_lobbies(lobbies())
+
+        persisted = sorted(contest['id'] for contest, _ in self.persisted_items())
+        self.assertEqual(persisted, [1, 2])
+        self.assertEqual(set(self.data_processor.last_lobby_deltas), {"NFL", "NBA"})
+
+    def test_process_contests_persists_one_contest_per_request_without_batching(self):
+        self.data_processor.persist_batch_size = None
+        lobby = {"NFL": [{"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic"}]}
+        self.data_fetcher.fetch_contest_details.side_effect = lambda contest_id, entry_count=None: {
+            "entries": {"current": 1, "maximum": 3},
+            "participants": [{"username": "a", "experience_level": 0}],
+        }
+        self.data_processor.process_contests(lobby)
+
+        self.mock_db.bulk_upsert_contests_and_entrants.assert_not_called()
+        contest, entrants = self.mock_db.insert_or_update_contest_and_entrants.call_args[0]
+        self.assertEqual(contest['status'], 'ready_to_enter')
+
+    def test_failed_bulk_persist_forgets_the_whole_batch(self):
+        lobby = {"NFL": [
+            {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1},
+            {"id": 2, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1},
+        ]}
+        self.data_fetcher.fetch_contest_details.side_effect = lambda contest_id, entry_count=None: {
+            "entries": {"current": 1, "maximum": 3},
+            "participants": [{"username": "a", "experience_level": 0}],
+        }
+        self.mock_db.bulk_upsert_contests_and_entrants.side_effect = Exception("write failed")
+        self.data_processor.process_contests(lobby)
+        self.mock_db.bulk_upsert_contests_and_entrants.side_effect = None
+        self.data_fetcher.fetch_contest_details.reset_mock()
+
+        self.data_processor.process_contests(lobby)
+
+        fetched_ids = sorted(call[0][0] for call in self.data_fetcher.fetch_contest_details.call_args_list)
+        self.assertEqual(fetched_ids, [1, 2])
+
+    def test_process_unprocessed_contests_bulk(self):
+        self.mock_db.get_unprocessed_contests.return_value = [
+            {'id': 1, 'maximum_entries': 3},
+            {'id': 2, 'maximum_entries': 3},
+            {'id': 3, 'maximum_entries': 2},
+        ]
+        self.mock_db.get_entrants_for_contests.return_value = {
+            1: [{'username': 'a', 'experience_level': 0}],
+            2: [{'username': 'b', 'experience_level': 3}],
+            3: [{'username': 'c', 'experience_level': 0}, {'username': 'd', 'experience_level': 0}],
+        }
+
+        self.data_processor.process_unprocessed_contests()
+
+        self.mock_db.get_entrants_for_contests.assert_called_once_with([1, 2, 3])
+        self.mock_db.get_contest_entrants.assert_not_called()
+        self.mock_db.update_contest_status.assert_not_called()
+        self.mock_db.batch_update_contest_statuses.assert_called_once_with({1: 'ready_to_enter', 2: 'processed', 3: 'processed'})
+        ready_contests, entrants_by_contest = self.mock_db.notify_ready_contests.call_args[0]
+        self.assertEqual([contest['id'] for contest in ready_contests], [1])
+        self.assertIs(entrants_by_contest, self.mock_db.get_entrants_for_contests.return_value)
+
+    def test_process_unprocessed_contests_per_contest(self):
+        self.mock_db.get_unprocessed_contests.return_value = [{'id': 1, 'maximum_entries': 3}]
+        self.mock_db.get_contest_entrants.return_value = [{'username': 'a', 'experience_level': 0}]
+
+        self.data_processor.process_unprocessed_contests(bulk=False)
+
+        self.mock_db.get_contest_entrants.assert_called_once_with(1)
+        self.mock_db.update_contest_status.assert_called_once_with(1, 'ready_to_enter', entrants=[{'username': 'a', 'experience_level': 0}])
+
 if __name__ == '__main__':
     unittest.main()
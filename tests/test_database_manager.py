@@ -1,5 +1,6 @@
+import os
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 from src.database_manager import DatabaseManager
 
 class TestDatabaseManager(unittest.TestCase):
@@ -79,5 +80,176 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]['status'], 'processed')
 
+class TestDatabaseManagerBulkUpsert(unittest.TestCase):
+    @patch.dict(os.environ, {'SUPABASE_URL': 'https://example.supabase.co', 'SUPABASE_KEY': 'test_key'})
+    @patch('src.database_manager.SlackNotifier')
+    @patch('src.database_manager.create_client')
+    def setUp(self, mock_create_client, mock_slack_notifier):
+        self.db_manager = DatabaseManager()
+        self.supabase = self.db_manager.supabase
+        self.slack_notifier = self.db_manager.slack_notifier
+
+    def test_upsert_entrants(self):
+        self.supabase.table().select().eq().execute.return_value.data = [{'username': 'user1'}]
+        entrants = [
+            {'username': 'user1', 'experience_level': 1},
+            {'username': 'user2', 'experience_level': 3},
+            {'username': 'user2', 'experience_level': 3},
+        ]
+
+        result = self.db_manager.upsert_entrants('1', entrants)
+
+        self.assertEqual(result, {'inserted': 1, 'updated': 1})
+        self.supabase.table().upsert.assert_called_once_with([
+            {'username': 'user1', 'experience_level': 1, 'contest_id': '1'},
+            {'username': 'user2', 'experience_level': 3, 'contest_id': '1'},
+        ], on_conflict='contest_id,username')
+
+    def test_upsert_entrants_empty(self):
+        self.assertEqual(self.db_manager.upsert_entrants('1', []), {'inserted': 0, 'updated': 0})
+        self.supabase.table().upsert.assert_not_called()
+
+    def test_insert_or_update_contest_uses_bulk_entrant_upsert(self):
+        self.supabase.table().select().eq().execute.return_value.data = []
+        contest = {'id': '1', 'title': 'Test', 'entries': {'current': 1, 'maximum': 3}, 'status': 'ready_to_enter', 'highest_experience_ratio': 0.6}
+        entrants = [{'username': 'user1', 'experience_level': 1}]
+
+        result = self.db_manager.insert_or_update_contest_and_entrants(contest, entrants)
+
+        self.assertEqual(result, {'inserted': 1, 'updated': 0})
+        self.assertEqual(self.supabase.table().upsert.call_count, 1)
+        self.slack_notifier.notify_contest.assert_called_once()
+
+    def test_bulk_upsert_contests_and_entrants(self):
+        self.supabase.table().select().in_().order().range().execute.return_value.data = []
+        self.supabase.table().select().in_().order().order().range().execute.return_value.data = []
+        items = [
+            ({'id': '1', 'title': 'A', 'entries': {'current': 1, 'maximum': 3}, 'status': 'ready_to_enter'}, [{'username': 'user1', 'experience_level': 0}]),
+            ({'id': '2', 'title': 'B', 'entries': {'current': 2, 'maximum': 5}, 'status': 'processed'}, [{'username': 'user1', 'experience_level': 0}, {'username': 'user2', 'experience_level': 3}]),
+        ]
+
+        result = self.db_manager.bulk_upsert_contests_and_entrants(items)
+
+        self.assertEqual(result, {'contests': 2, 'inserted': 3, 'updated': 0})
+        upsert_calls = self.supabase.table().upsert.call_args_list
+        self.assertEqual(len(upsert_calls), 2)
+        self.assertEqual([row['id'] for row in upsert_calls[0][0][0]], ['1', '2'])
+        self.assertEqual(len(upsert_calls[1][0][0]), 3)
+        self.slack_notifier.notify_contest.assert_called_once()
+
+    def test_bulk_upsert_pages_existing_entrants(self):
+        self.supabase.table().select().in_().order().range().execute.return_value.data = [{'id': '1', 'status': 'processed'}]
+        entrant_query = self.supabase.table().select().in_().order().order()
+        entrant_query.range().execute.side_effect = [
+            MagicMock(data=[{'contest_id': '1', 'username': 'user1'}, {'contest_id': '1', 'username': 'user2'}]),
+            MagicMock(data=[{'contest_id': '1', 'username': 'user3'}]),
+        ]
+        entrants = [{'username': f'user{index}', 'experience_level': 0} for index in range(1, 5)]
+        items = [({'id': '1', 'title': 'A', 'entries': {'current': 4, 'maximum': 5}, 'status': 'processed'}, entrants)]
+
+        result = self.db_manager.bulk_upsert_contests_and_entrants(items, page_size=2)
+
+        # user3 was only on the second page
+        self.assertEqual(result, {'contests': 1, 'inserted': 1, 'updated': 3})
+
+    def test_get_entrants_for_contests(self):
+        self.supabase.table().select().in_().order().order().range().execute.return_value.data = [
+            {'contest_id': '1', 'username': 'user1'},
+            {'contest_id': '1', 'username': 'user2'},
+        ]
+
+        result = self.db_manager.get_entrants_for_contests(['1', '2'])
+
+        self.assertEqual(len(result['1']), 2)
+        self.assertEqual(result['2'], [])
+        self.supabase.table().select().in_.assert_called_with('contest_id', ['1', '2'])
+        self.supabase.table().select().in_().order().order().range.assert_called_with(0, 999)
+
+    def test_get_entrants_for_contests_pages_past_the_row_cap(self):
+        pages = [
+            [{'contest_id': '1', 'username': 'user1'}, {'contest_id': '1', 'username': 'user2'}],
+            [{'contest_id': '2', 'username': 'user1'}, {'contest_id': '2', 'username': 'user2'}],
+            [{'contest_id': '2', 'username': 'user3'}],
+        ]
+        query = self.supabase.table().select().in_().order().order()
+        query.range().execute.side_effect = [MagicMock(data=page) for page in pages]
+        query.range.reset_mock()
+
+        result = self.db_manager.get_entrants_for_contests(['1', '2'], page_size=2)
+
+        self.assertEqual(len(result['1']), 2)
+        self.assertEqual(len(result['2']), 3)
+        self.assertEqual([call[0] for call in query.range.call_args_list], [(0, 1), (2, 3), (4, 5)])
+
+    def test_batch_update_contest_statuses(self):
+        self.supabase.table.reset_mock()
+        self.db_manager.batch_update_contest_statuses({'1': 'processed', '2': 'ready_to_enter', '3': 'processed'})
+
+        update_calls = self.supabase.table().update.call_args_list
+        self.assertEqual(update_calls[0][0][0], {'status': 'processed'})
+        self.assertEqual(update_calls[1][0][0], {'status': 'ready_to_enter'})
+        in_calls = self.supabase.table().update().in_.call_args_list
+        self.assertIn((('id', ['1', '3']),), in_calls)
+        self.assertIn((('id', ['2']),), in_calls)
+        self.slack_notifier.notify_contest.assert_not_called()
+
+    def test_notify_ready_contests(self):
+        contest = {'id': '1', 'title': 'Test'}
+        entrants = [{'username': 'user1', 'experience_level': 0}]
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.slack_notifier.notify_contest.assert_called_once_with(contest, entrants, callback=ANY)
+
+    @patch.dict(os.environ, {'SUPABASE_URL': 'https://example.supabase.co', 'SUPABASE_KEY': 'test_key'})
+    @patch('src.database_manager.create_client')
+    def test_injected_notifier(self, mock_create_client):
+        outbox = MagicMock()
+        db_manager = DatabaseManager(notifier=outbox)
+        db_manager.notify_ready_contests([{'id': '1'}], {})
+        outbox.notify_contest.assert_called_once_with({'id': '1'}, [], callback=ANY)
+
+class TestDatabaseManagerNotificationLedger(unittest.TestCase):
+    @patch.dict(os.environ, {'SUPABASE_URL': 'https://example.supabase.co', 'SUPABASE_KEY': 'test_key'})
+    @patch('src.database_manager.create_client')
+    def setUp(self, mock_create_client):
+        self.notifier = MagicMock()
+        self.db_manager = DatabaseManager(notifier=self.notifier)
+        self.supabase = self.db_manager.supabase
+
+    def test_ready_status_is_notified_once(self):
+        entrants = [{'username': 'user1', 'experience_level': 0}]
+        self.supabase.table().select().eq().execute.return_value.data = [{'id': '1', 'title': 'Test'}]
+        self.supabase.table.reset_mock()
+
+        self.db_manager.update_contest_status('1', 'ready_to_enter', entrants=entrants)
+        self.db_manager.update_contest_status('1', 'ready_to_enter', entrants=entrants)
+
+        self.notifier.notify_contest.assert_called_once()
+        # The second call neither reads the contest nor the entrants again
+        self.assertEqual(self.supabase.table().select.call_count, 1)
+
+    def test_transition_and_bulk_paths_share_the_ledger(self):
+        contest = {'id': '1', 'title': 'Test'}
+        entrants = [{'username': 'user1', 'experience_level': 0}]
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.notifier.notify_contest.assert_called_once()
+
+        self.db_manager.prune_notification_ledger(['1'])
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.assertEqual(self.notifier.notify_contest.call_count, 2)
+
+    def test_failed_send_releases_the_claim(self):
+        contest = {'id': '1', 'title': 'Test'}
+        entrants = [{'username': 'user1', 'experience_level': 0}]
+        self.notifier.notify_contest.side_effect = lambda contest, entrants, callback: callback(False)
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.assertEqual(self.notifier.notify_contest.call_count, 2)
+
+        self.notifier.notify_contest.side_effect = lambda contest, entrants, callback: callback(True)
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.db_manager.notify_ready_contests([contest], {'1': entrants})
+        self.assertEqual(self.notifier.notify_contest.call_count, 3)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.detail_cache import DetailCache
+
+def make_details(current, maximum=5):
+    return {
+        'title': 'NFL $5 Double Up',
+        'entries': {'current': current, 'maximum': maximum},
+        'participants': [{'username': f'user{index}', 'experience_level': 0} for index in range(current)],
+    }
+
+class TestDetailCache(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = DetailCache()
+        self.assertIsNone(cache.get(1))
+        cache.put(1, make_details(2))
+        self.assertEqual(cache.get(1), make_details(2))
+        self.assertEqual(cache.get_stats(), {'hits': 1, 'misses': 1, 'evictions': 0, 'expirations': 0, 'invalidations': 0, 'size': 1})
+
+    def test_returns_copies(self):
+        cache = DetailCache()
+        cache.put(1, make_details(2))
+        cache.get(1)['participants'].pop()
+        self.assertEqual(len(cache.get(1)['participants']), 2)
+
+    def test_empty_details_are_not_cached(self):
+        cache = DetailCache()
+        cache.put(1, {})
+        self.assertIsNone(cache.get(1))
+
+    def test_lru_eviction(self):
+        cache = DetailCache(max_entries=2)
+        cache.put(1, make_details(1))
+        cache.put(2, make_details(2))
+        cache.get(1)
+        cache.put(3, make_details(3))
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNotNone(cache.get(3))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    @patch('src.detail_cache.time.time')
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 100.0
+        cache = DetailCache(ttl=10.0)
+        cache.put(1, make_details(2))
+        mock_time.return_value = 109.0
+        self.assertIsNotNone(cache.get(1))
+        mock_time.return_value = 111.0
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get_stats()['expirations'], 1)
+
+    def test_entry_count_invalidation(self):
+        cache = DetailCache()
+        cache.put(1, make_details(2))
+        self.assertIsNotNone(cache.get(1, entry_count=2))
+        self.assertIsNone(cache.get(1, entry_count=3))
+        # The stale entry is gone, even for callers without a lobby count
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get_stats()['invalidations'], 1)
+
+    @patch('src.detail_cache.time.time')
+    def test_unchanged_entry_count_outlives_a_scheduler_cycle(self, mock_time):
+        mock_time.return_value = 100.0
+        cache = DetailCache()
+        cache.put(1, make_details(2))
+        # Three 5 minute cycles later the lobby still reports 2 entrants
+        mock_time.return_value = 1000.0
+        self.assertEqual(cache.get(1, entry_count=2), make_details(2))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            DetailCache(max_entries=0)
+        with self.assertRaises(ValueError):
+            DetailCache(ttl=0)
+
+    def test_disk_cache_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'details.sqlite')
+            cache = DetailCache(path=path)
+            cache.put(1, make_details(2))
+            cache.put(2, make_details(3))
+            cache.invalidate(2)
+            cache.close()
+
+            restarted = DetailCache(path=path)
+            self.assertEqual(restarted.get(1, entry_count=2), make_details(2))
+            self.assertIsNone(restarted.get(2))
+            restarted.close()
+
+if __name__ == '__main__':
+    unittest.main()
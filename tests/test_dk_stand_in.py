@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import MagicMock
+from benchmarks.dk_stand_in import DraftKingsStandIn, parse_latency
+from src.data_fetcher import DataFetcher
+from src.data_processor import DataProcessor
+from src.notification_ledger import NotificationLedger
+
+class TestDraftKingsStandIn(unittest.TestCase):
+    def start_stand_in(self, **kwargs):
+        stand_in = DraftKingsStandIn(contests_per_sport=200, fill_interval=10.0, fill_fraction=0.5, **kwargs)
+        stand_in.start()
+        self.addCleanup(stand_in.stop)
+        data_fetcher = DataFetcher(min_delay=0, max_delay=0, max_retries=0, base_url=stand_in.base_url + "/")
+        self.addCleanup(data_fetcher.close)
+        return stand_in, data_fetcher
+
+    def test_base_url_override(self):
+        data_fetcher = DataFetcher(base_url="http://127.0.0.1:8765/")
+        self.assertEqual(data_fetcher._construct_url("NFL"), "http://127.0.0.1:8765/lobby/getcontests?sport=NFL")
+        self.assertEqual(data_fetcher.CONTEST_DETAILS_URL.format(1), "http://127.0.0.1:8765/contest/detailspop?contestId=1")
+        # Other fetchers still talk to DraftKings
+        self.assertEqual(DataFetcher().LOBBY_URL, "https://www.draftkings.com/lobby/getcontests")
+        data_fetcher.close()
+
+    def test_lobby_and_details_round_trip(self):
+        stand_in, data_fetcher = self.start_stand_in()
+        contests = data_fetcher.fetch_contests("NFL")
+        self.assertEqual(len(contests), 200)
+        contest = next(contest for contest in contests if 0 < contest['nt'] < contest['m'] <= 100)
+
+        details = data_fetcher.fetch_contest_details(contest['id'])
+        self.assertEqual(details['entries'], {'current': contest['nt'], 'maximum': contest['m']})
+        self.assertEqual(len(details['participants']), contest['nt'])
+
+        # Unchanged until the next fill tick
+        self.assertIsNone(data_fetcher.fetch_contests("NFL"))
+        self.assertEqual(stand_in.get_stats()['not_modified'], 1)
+
+    def test_contests_fill_over_time(self):
+        stand_in, _ = self.start_stand_in()
+        contests = stand_in.contests_by_sport["NFL"]
+        before = [stand_in.entry_count(contest, 0) for contest in contests]
+        after = [stand_in.entry_count(contest, 20) for contest in contests]
+        self.assertTrue(all(later >= earlier for earlier, later in zip(before, after)))
+        self.assertGreater(sum(after), sum(before))
+        self.assertTrue(all(count <= contest['m'] for count, contest in zip(after, contests)))
+
+    def test_throttling_and_errors(self):
+        stand_in, data_fetcher = self.start_stand_in(throttle_rate=1.0, retry_after=0)
+        self.assertIsNone(data_fetcher.fetch_contests("NFL"))
+        self.assertEqual(stand_in.get_stats()['throttled'], 1)
+
+        stand_in.throttle_rate = 0.0
+        stand_in.error_rate = 1.0
+        contest_id = stand_in.contests_by_sport["NFL"][0]['id']
+        self.assertEqual(data_fetcher.fetch_contest_details(contest_id), {})
+        self.assertEqual(stand_in.get_stats()['errors'], 1)
+        self.assertEqual(data_fetcher.fetch_contest_details(contest_id + 10 ** 6), {})
+        self.assertEqual(stand_in.get_stats()['not_found'], 1)
+
+    def test_contest_without_entrants_does_not_block_not_modified(self):
+        lobby = {"Contests": [
+            {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 0},
+            {"id": 2, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1},
+        ]}
+        stand_in = DraftKingsStandIn(lobby=lobby, fill_interval=3600.0)
+        stand_in.start()
+        self.addCleanup(stand_in.stop)
+        data_fetcher = DataFetcher(min_delay=0, max_delay=0, max_retries=0, base_url=stand_in.base_url)
+        self.addCleanup(data_fetcher.close)
+        data_processor = DataProcessor(data_fetcher, notifier=MagicMock(), notification_ledger=NotificationLedger(),
+                                       supabase=MagicMock())
+
+        data_processor.process_lobbies(data_fetcher.iter_all_contests())
+        self.assertEqual(stand_in.get_stats()['detail_requests'], 2)
+        data_processor.process_lobbies(data_fetcher.iter_all_contests())
+
+        # The empty contest is not a failure, so the lobby stays conditional
+        stats = stand_in.get_stats()
+        self.assertEqual(stats['not_modified'], 1)
+        self.assertEqual(stats['detail_requests'], 2)
+
+    def test_pipeline_sends_pages_to_the_parse_pool_in_chunks(self):
+        lobby = {"Contests": [
+            {"id": contest_id, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "nt": 1} for contest_id in [1, 2, 3, 4]
+        ]}
+        stand_in = DraftKingsStandIn(lobby=lobby, fill_interval=3600.0)
+        stand_in.start()
+        self.addCleanup(stand_in.stop)
+        data_fetcher = DataFetcher(min_delay=0, max_delay=0, max_retries=0, base_url=stand_in.base_url,
+                                   sports=["NFL"], parse_workers=1, parse_chunksize=2)
+        self.addCleanup(data_fetcher.close)
+        parse_pool = data_fetcher._get_parse_pool()
+        parse_pool.submit = MagicMock(wraps=parse_pool.submit)
+        data_processor = DataProcessor(data_fetcher, fetch_batch_size=4, notifier=MagicMock(),
+                                       notification_ledger=NotificationLedger(), supabase=MagicMock())
+
+        data_processor.process_lobbies(data_fetcher.iter_all_contests())
+
+        self.assertEqual(stand_in.get_stats()['detail_requests'], 4)
+        chunks = [call[0][1] for call in parse_pool.submit.call_args_list]
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2])
+
+    def test_parse_latency(self):
+        self.assertEqual(parse_latency("fixed:0.25")(None), 0.25)
+        with self.assertRaises(ValueError):
+            parse_latency("gaussian:1")
+
+if __name__ == '__main__':
+    unittest.main()
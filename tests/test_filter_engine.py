@@ -0,0 +1,118 @@
+import random
+import unittest
+from src.filter_engine import CompiledContestFilter, ColumnarContestFilter, build_filter_rules, CHEAP_RULE_NAMES, RULE_NAMES
+from src.data_processor import ContestFilter
+
+def reference_apply_filters(contests, max_entrants=5, max_entry_fee=110.0):
+    # The keyword-by-keyword implementation the compiled engine replaced
+    filtered_contests = {}
+    excluded_times = ['1:00PM', '4:05PM', '4:15PM', '4:25PM']
+    for sport, sport_contests in contests.items():
+        filtered_ids = set(contest['id'] for contest in sport_contests if contest.get('m', 0) <= max_entrants)
+        filtered_contests[sport] = [
+            contest for contest in sport_contests
+            if contest['id'] in filtered_ids
+            and not any(keyword in contest.get('n', '').lower() for keyword in ["casual", "beginner", "satellite", "madden", "primetime", "turbo", "mon-thu", "mon"])
+            and float(contest.get('a', 0)) <= max_entry_fee
+            and (contest.get('gameType') == 'Classic' or
+                 (contest.get('gameType') == 'Showdown Captain Mode' and
+                  not any(time in contest.get('sdstring', '') for time in excluded_times)))
+        ]
+    return filtered_contests
+
+def random_lobby(size, seed=7):
+    generator = random.Random(seed)
+    names = ["NFL $5 Double Up", "NFL Casual Double Up", "NFL Beginner 3-Player", "NFL Turbo 5-Player",
+             "NFL Monday Showdown", "NFL Primetime Double Up", "NFL Satellite", "NFL Madden Stream", "NFL 3-Player"]
+    game_types = ['Classic', 'Showdown Captain Mode', 'Tiers', None]
+    start_times = ['Sun 1:00PM EDT', 'Sun 4:25PM EDT', 'Sun 8:20PM EDT', 'Mon 8:15PM EDT']
+    return {
+        "NFL": [
+            {
+                "id": index,
+                "n": generator.choice(names),
+                "m": generator.choice([2, 3, 4, 5, 10, 100]),
+                "a": generator.choice([1, 5, 25, 109, 110, 150]),
+                "gameType": generator.choice(game_types),
+                "sdstring": generator.choice(start_times),
+            }
+            for index in range(size)
+        ]
+    }
+
+class TestCompiledContestFilter(unittest.TestCase):
+    def test_matches_reference_implementation(self):
+        lobby = random_lobby(2000)
+        self.assertEqual(ContestFilter.apply_filters(lobby), reference_apply_filters(lobby))
+        self.assertEqual(ContestFilter.apply_filters(lobby, max_entrants=10, max_entry_fee=25.0),
+                         reference_apply_filters(lobby, max_entrants=10, max_entry_fee=25.0))
+
+    def test_rejection_counts(self):
+        contests = {
+            "NFL": [
+                {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic"},
+                {"id": 2, "n": "NFL Double Up", "m": 100, "a": 5, "gameType": "Classic"},
+                {"id": 3, "n": "NFL Casual Double Up", "m": 3, "a": 5, "gameType": "Classic"},
+                {"id": 4, "n": "NFL Double Up", "m": 3, "a": 500, "gameType": "Classic"},
+                {"id": 5, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Tiers"},
+                {"id": 6, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Showdown Captain Mode", "sdstring": "Sun 4:05PM EDT"},
+            ]
+        }
+
+        filtered, rejection_counts = CompiledContestFilter().apply(contests)
+
+        self.assertEqual([contest["id"] for contest in filtered["NFL"]], [1])
+        self.assertEqual(set(rejection_counts), set(RULE_NAMES))
+        self.assertEqual(rejection_counts, {
+            'max_entrants': 1,
+            'excluded_keyword': 1,
+            'max_entry_fee': 1,
+            'game_type': 1,
+            'excluded_start_time': 1,
+        })
+
+    def test_custom_rules(self):
+        rules = build_filter_rules(excluded_keywords=["turbo"], game_types=["Tiers"], max_entrants=10)
+        engine = CompiledContestFilter(rules)
+        self.assertIsNone(engine.evaluate({"id": 1, "n": "Casual Tiers", "m": 10, "a": 1, "gameType": "Tiers"}))
+        self.assertEqual(engine.evaluate({"id": 2, "n": "TURBO Tiers", "m": 10, "a": 1, "gameType": "Tiers"}), 'excluded_keyword')
+
+    def test_cheap_rules_never_reject_a_passing_contest(self):
+        engine = CompiledContestFilter()
+        for contest in random_lobby(2000)["NFL"]:
+            rejected_by = engine.evaluate_cheap(contest)
+            if engine.evaluate(contest) is None:
+                self.assertIsNone(rejected_by)
+            elif rejected_by is not None:
+                self.assertIn(rejected_by, CHEAP_RULE_NAMES)
+
+    def test_unknown_rule(self):
+        with self.assertRaises(ValueError):
+            build_filter_rules(max_players=3)
+
+class TestColumnarContestFilter(unittest.TestCase):
+    def test_matches_row_engine(self):
+        lobby = random_lobby(5000, seed=11)
+        lobby["NFL"].append({"id": "no-fields"})
+        lobby["NBA"] = []
+        row_result = CompiledContestFilter().apply(lobby)
+        columnar_result = ColumnarContestFilter().apply(lobby)
+        self.assertEqual(columnar_result, row_result)
+
+    def test_apply_filters_backend(self):
+        lobby = random_lobby(1000, seed=3)
+        self.assertEqual(ContestFilter.apply_filters(lobby, backend='columnar'), ContestFilter.apply_filters(lobby))
+        self.assertEqual(ContestFilter.apply_filters(lobby, max_entrants=100, backend='columnar'),
+                         reference_apply_filters(lobby, max_entrants=100))
+
+    def test_returns_original_contest_dicts(self):
+        contest = {"id": 1, "n": "NFL Double Up", "m": 3, "a": 5, "gameType": "Classic", "extra": "kept"}
+        filtered, _ = ColumnarContestFilter().apply({"NFL": [contest]})
+        self.assertIs(filtered["NFL"][0], contest)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            ContestFilter.apply_filters(random_lobby(10), backend='gpu')
+
+if __name__ == '__main__':
+    unittest.main()
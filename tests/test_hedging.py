@@ -0,0 +1,50 @@
+import unittest
+from src.hedging import HedgePolicy, LatencyTracker
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_percentile(self):
+        tracker = LatencyTracker(window=100, min_samples=10)
+        for sample in range(9):
+            tracker.record(float(sample))
+        self.assertIsNone(tracker.percentile(95))
+        tracker.record(9.0)
+        self.assertEqual(tracker.percentile(50), 4.0)
+        self.assertEqual(tracker.percentile(99), 9.0)
+
+    def test_window(self):
+        tracker = LatencyTracker(window=10, min_samples=1)
+        for sample in range(100):
+            tracker.record(float(sample))
+        self.assertEqual(tracker.percentile(0.1), 90.0)
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_no_hedge_delay_without_samples(self):
+        policy = HedgePolicy(min_delay=0.1)
+        self.assertIsNone(policy.hedge_delay())
+        for _ in range(20):
+            policy.record_result(0.01, hedge_won=False)
+        self.assertEqual(policy.hedge_delay(), 0.1)
+
+    def test_hedges_are_limited_to_a_fraction_of_requests(self):
+        policy = HedgePolicy(max_fraction=0.1)
+        for _ in range(20):
+            policy.record_request()
+        self.assertTrue(policy.try_start_hedge(lambda: True))
+        self.assertTrue(policy.try_start_hedge(lambda: True))
+        self.assertFalse(policy.try_start_hedge(lambda: True))
+        self.assertEqual(policy.get_metrics()['hedges'], 2)
+
+    def test_hedge_needs_a_rate_token(self):
+        policy = HedgePolicy(max_fraction=1.0)
+        policy.record_request()
+        self.assertFalse(policy.try_start_hedge(lambda: False))
+        self.assertEqual(policy.get_metrics()['hedges'], 0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            HedgePolicy(percentile=100)
+        with self.assertRaises(ValueError):
+            HedgePolicy(max_fraction=0)
+
+if __name__ == '__main__':
+    unittest.main()
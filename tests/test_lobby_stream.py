@@ -0,0 +1,36 @@
+import io
+import json
+import unittest
+from src.filter_engine import CompiledContestFilter
+from src.lobby_stream import CountingReader, stream_lobby_contests
+from tests.test_filter_engine import random_lobby
+
+class TestStreamLobbyContests(unittest.TestCase):
+    def make_payload(self, contests):
+        return json.dumps({"DraftGroups": [{"id": 1}], "Contests": contests, "GameTypes": []}).encode('utf-8')
+
+    def test_matches_full_decode(self):
+        contests = random_lobby(500)["NFL"]
+        engine = CompiledContestFilter()
+        reader = CountingReader(io.BytesIO(self.make_payload(contests)))
+
+        accepted, rejection_counts = stream_lobby_contests(reader, engine)
+
+        expected = [contest for contest in contests if engine.evaluate_cheap(contest) is None]
+        self.assertEqual(accepted, expected)
+        self.assertEqual(sum(rejection_counts.values()), len(contests) - len(expected))
+        self.assertEqual(reader.bytes_read, len(self.make_payload(contests)))
+
+    def test_without_filter(self):
+        contests = [{"id": 1, "n": "NFL Double Up", "m": 3, "a": 5.5, "gameType": "Classic"}]
+        accepted, rejection_counts = stream_lobby_contests(io.BytesIO(self.make_payload(contests)))
+        self.assertEqual(accepted, contests)
+        self.assertIsInstance(accepted[0]["a"], float)
+        self.assertEqual(sum(rejection_counts.values()), 0)
+
+    def test_missing_contests(self):
+        accepted, _ = stream_lobby_contests(io.BytesIO(b'{"DraftGroups": []}'))
+        self.assertEqual(accepted, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from src.lobby_tracker import LobbySnapshotStore
+
+class TestLobbySnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.store = LobbySnapshotStore()
+
+    def test_first_lobby_is_all_added(self):
+        delta = self.store.diff("NFL", [{"id": 1, "nt": 1}, {"id": 2, "nt": 0}])
+        self.assertEqual(delta, {'added': {1, 2}, 'changed': set(), 'removed': set()})
+
+    def test_diff_against_previous_lobby(self):
+        self.store.diff("NFL", [{"id": 1, "nt": 1}, {"id": 2, "nt": 0}, {"id": 3, "nt": 2}])
+        delta = self.store.diff("NFL", [{"id": 1, "nt": 1}, {"id": 2, "nt": 1}, {"id": 4, "nt": 0}])
+        self.assertEqual(delta, {'added': {4}, 'changed': {2}, 'removed': {3}})
+
+    def test_sports_are_tracked_separately(self):
+        self.store.diff("NFL", [{"id": 1, "nt": 1}])
+        delta = self.store.diff("NBA", [{"id": 1, "nt": 1}])
+        self.assertEqual(delta['added'], {1})
+
+    def test_missing_entry_count_is_always_changed(self):
+        self.store.diff("NFL", [{"id": 1}])
+        delta = self.store.diff("NFL", [{"id": 1}])
+        self.assertEqual(delta['changed'], {1})
+
+    def test_forget(self):
+        self.store.diff("NFL", [{"id": 1, "nt": 1}])
+        self.store.forget(1)
+        delta = self.store.diff("NFL", [{"id": 1, "nt": 1}])
+        self.assertEqual(delta['added'], {1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import logging
+import unittest
+import urllib.error
+import urllib.request
+from src.metrics import STAGES, Histogram, MetricsRegistry, MetricsServer, TraceIdFilter
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative_counts(), [('0.1', 2), ('1.0', 3), ('+Inf', 4)])
+        self.assertEqual((histogram.count, histogram.sum, histogram.max), (4, 3.65, 3.0))
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_timed_records_errors(self):
+        with self.registry.timed("parse"):
+            pass
+        with self.assertRaises(ValueError):
+            with self.registry.timed("parse"):
+                raise ValueError("bad page")
+        self.assertEqual(self.registry.histograms["parse"].count, 2)
+        self.assertEqual(self.registry.counters[("stage_errors", (("stage", "parse"),))], 1)
+
+    def test_timed_as_decorator(self):
+        @self.registry.timed("db_upsert")
+        def upsert():
+            return 3
+        self.assertEqual(upsert(), 3)
+        self.assertEqual(upsert(), 3)
+        self.assertEqual(self.registry.histograms["db_upsert"].count, 2)
+
+    def test_prometheus_text(self):
+        self.registry.observe("lobby_fetch", 0.5)
+        self.registry.increment("contests_rejected", 2, labels={'rule': 'entry_fee'})
+        text = self.registry.render_prometheus()
+        self.assertIn('# TYPE dk_contest_finder_stage_duration_seconds histogram', text)
+        self.assertIn('dk_contest_finder_stage_duration_seconds_bucket{stage="lobby_fetch",le="0.1"} 0', text)
+        self.assertIn('dk_contest_finder_stage_duration_seconds_bucket{stage="lobby_fetch",le="+Inf"} 1', text)
+        self.assertIn('dk_contest_finder_stage_duration_seconds_count{stage="lobby_fetch"} 1', text)
+        # Stages that never ran are still exported
+        for stage in STAGES:
+            self.assertIn(f'dk_contest_finder_stage_duration_seconds_count{{stage="{stage}"}}', text)
+        self.assertIn('# TYPE dk_contest_finder_contests_rejected_total counter', text)
+        self.assertIn('dk_contest_finder_contests_rejected_total{rule="entry_fee"} 2', text)
+
+    def test_cycle_summary(self):
+        self.registry.observe("filter", 0.2)
+        trace_id = self.registry.start_cycle()
+        self.registry.observe("filter", 0.3)
+        self.registry.increment("contests_seen", 40)
+        summary = self.registry.end_cycle({'detail_cache': {'hits': 1}})
+        self.assertEqual(summary['trace_id'], trace_id)
+        self.assertEqual(summary['stages'], {'filter': {'count': 1, 'errors': 0, 'total_time': 0.3, 'max_time': 0.3}})
+        self.assertEqual(summary['counters'], {'contests_seen': 40})
+        self.assertEqual(summary['detail_cache'], {'hits': 1})
+        self.assertIs(self.registry.get_last_cycle(), summary)
+        self.assertIsNone(self.registry.trace_id)
+        # The process-wide histogram keeps both samples
+        self.assertEqual(self.registry.histograms["filter"].count, 2)
+
+    def test_trace_id_filter(self):
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+        TraceIdFilter(self.registry).filter(record)
+        self.assertEqual(record.trace_id, "-")
+        trace_id = self.registry.start_cycle()
+        TraceIdFilter(self.registry).filter(record)
+        self.assertEqual(record.trace_id, trace_id)
+
+class TestMetricsServer(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.server = MetricsServer(self.registry, port=0)
+        self.base_url = f"http://127.0.0.1:{self.server.start()}"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_endpoints(self):
+        self.registry.start_cycle()
+        self.registry.observe("detail_fetch", 0.4)
+        summary = self.registry.end_cycle()
+
+        with urllib.request.urlopen(f"{self.base_url}/metrics") as response:
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            self.assertIn('stage="detail_fetch"', response.read().decode())
+        with urllib.request.urlopen(f"{self.base_url}/cycle") as response:
+            self.assertEqual(json.loads(response.read())['trace_id'], summary['trace_id'])
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(f"{self.base_url}/missing")
+        self.assertEqual(context.exception.code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from src.notification_ledger import NotificationLedger, entrant_fingerprint
+
+ENTRANTS = [{'username': 'a', 'experience_level': 0}, {'username': 'b', 'experience_level': 3}]
+
+class TestNotificationLedger(unittest.TestCase):
+    def test_fingerprint_ignores_order_and_extra_fields(self):
+        reordered = [{'id': 7, 'contest_id': '1', 'username': 'b', 'experience_level': 3}, {'username': 'a', 'experience_level': 0}]
+        self.assertEqual(entrant_fingerprint(ENTRANTS), entrant_fingerprint(reordered))
+        self.assertNotEqual(entrant_fingerprint(ENTRANTS), entrant_fingerprint(ENTRANTS[:1]))
+
+    def test_claim_only_once(self):
+        ledger = NotificationLedger()
+        self.assertTrue(ledger.claim(1, 'ready_to_enter', ENTRANTS))
+        self.assertFalse(ledger.claim('1', 'ready_to_enter', ENTRANTS))
+        self.assertTrue(ledger.has_sent(1, 'ready_to_enter', ENTRANTS))
+        # A new entrant or a different status is a new notification
+        self.assertTrue(ledger.claim(1, 'ready_to_enter', ENTRANTS[:1]))
+        self.assertTrue(ledger.claim(1, 'scooped', ENTRANTS))
+        self.assertEqual(len(ledger), 3)
+
+    def test_prune(self):
+        ledger = NotificationLedger()
+        ledger.claim(1, 'ready_to_enter', ENTRANTS)
+        ledger.claim(1, 'ready_to_enter', [])
+        ledger.claim(2, 'ready_to_enter', ENTRANTS)
+        self.assertEqual(ledger.prune([1, 3]), 2)
+        self.assertTrue(ledger.claim(1, 'ready_to_enter', ENTRANTS))
+        self.assertFalse(ledger.claim(2, 'ready_to_enter', ENTRANTS))
+
+    def test_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ledger.sqlite')
+            ledger = NotificationLedger(path)
+            for contest_id in (1, 2):
+                ledger.claim(contest_id, 'ready_to_enter', ENTRANTS)
+                ledger.record_sent(contest_id, 'ready_to_enter', ENTRANTS)
+            ledger.prune([2])
+            # Claimed but never sent
+            ledger.claim(3, 'ready_to_enter', ENTRANTS)
+            ledger.close()
+
+            restarted = NotificationLedger(path)
+            self.assertFalse(restarted.claim(1, 'ready_to_enter', ENTRANTS))
+            self.assertTrue(restarted.claim(2, 'ready_to_enter', ENTRANTS))
+            self.assertTrue(restarted.claim(3, 'ready_to_enter', ENTRANTS))
+            restarted.close()
+
+    def test_release_after_failed_send(self):
+        ledger = NotificationLedger()
+        self.assertTrue(ledger.claim(1, 'ready_to_enter', ENTRANTS))
+        ledger.release(1, 'ready_to_enter', ENTRANTS)
+        self.assertFalse(ledger.has_sent(1, 'ready_to_enter', ENTRANTS))
+        self.assertTrue(ledger.claim(1, 'ready_to_enter', ENTRANTS))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from src.notification_outbox import NotificationOutbox
+
+def make_notifier():
+    notifier = MagicMock()
+    notifier._format_contest_message.side_effect = lambda contest, entrants: f"contest {contest['id']} ({len(entrants)} entrants)"
+    return notifier
+
+class TestNotificationOutbox(unittest.TestCase):
+    def setUp(self):
+        self.notifier = make_notifier()
+        self.outbox = NotificationOutbox(self.notifier, coalesce_window=60.0, messages_per_second=100.0)
+
+    def tearDown(self):
+        self.outbox.close(timeout=1.0)
+
+    def test_cycle_is_sent_as_one_digest(self):
+        self.outbox.notify_contest({'id': 1}, [{'username': 'a'}])
+        self.outbox.notify_contest({'id': 2}, [])
+        self.notifier.send_notification.assert_not_called()
+
+        self.assertTrue(self.outbox.flush(timeout=1.0))
+
+        self.notifier.send_notification.assert_called_once_with(
+            "2 contests ready to enter!\ncontest 1 (1 entrants)\n---\ncontest 2 (0 entrants)")
+        metrics = self.outbox.get_metrics()
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertEqual(metrics['sent_messages'], 1)
+        self.assertEqual(metrics['sent_contests'], 2)
+        self.assertGreaterEqual(metrics['max_send_latency'], metrics['avg_send_latency'])
+
+    def test_single_contest_uses_plain_message(self):
+        self.outbox.notify_contest({'id': 1}, [])
+        self.outbox.flush(timeout=1.0)
+        self.notifier.send_notification.assert_called_once_with("contest 1 (0 entrants)")
+
+    def test_digest_size_limit(self):
+        outbox = NotificationOutbox(self.notifier, coalesce_window=60.0, max_digest_size=2, messages_per_second=100.0)
+        for contest_id in range(5):
+            outbox.notify_contest({'id': contest_id}, [])
+        outbox.flush(timeout=1.0)
+        outbox.close(timeout=1.0)
+        self.assertEqual(self.notifier.send_notification.call_count, 3)
+        self.assertEqual(outbox.get_metrics()['sent_contests'], 5)
+
+    def test_coalesce_window(self):
+        outbox = NotificationOutbox(self.notifier, coalesce_window=0.05, messages_per_second=100.0)
+        outbox.notify_contest({'id': 1}, [])
+        time.sleep(0.3)
+        self.notifier.send_notification.assert_called_once()
+        outbox.close(timeout=1.0)
+
+    def test_slow_slack_never_blocks_enqueue(self):
+        release = threading.Event()
+        self.notifier.send_notification.side_effect = lambda message: release.wait(1.0)
+        self.outbox.notify_contest({'id': 1}, [])
+        self.outbox.end_cycle()
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        self.outbox.notify_contest({'id': 2}, [])
+        self.assertLess(time.monotonic() - started, 0.05)
+        self.assertEqual(self.outbox.get_metrics()['queue_depth'], 1)
+        release.set()
+
+    def test_send_failure_is_counted(self):
+        self.notifier.send_notification.side_effect = Exception("Max retries exceeded")
+        outbox = NotificationOutbox(self.notifier, coalesce_window=60.0, messages_per_second=100.0,
+                                    max_send_attempts=2, retry_backoff=0.01)
+        outbox.notify_contest({'id': 1}, [])
+        self.assertTrue(outbox.flush(timeout=1.0))
+        outbox.close(timeout=1.0)
+        self.assertEqual(self.notifier.send_notification.call_count, 2)
+        self.assertEqual(outbox.get_metrics()['failed_contests'], 1)
+
+    def test_failed_digest_is_retried(self):
+        self.notifier.send_notification.side_effect = [Exception("Slack is down"), None]
+        outbox = NotificationOutbox(self.notifier, coalesce_window=60.0, messages_per_second=100.0, retry_backoff=0.01)
+        outbox.notify_contest({'id': 1}, [])
+        outbox.notify_contest({'id': 2}, [])
+        self.assertTrue(outbox.flush(timeout=1.0))
+        outbox.close(timeout=1.0)
+
+        self.assertEqual(self.notifier.send_notification.call_count, 2)
+        metrics = outbox.get_metrics()
+        self.assertEqual(metrics['retried_contests'], 2)
+        self.assertEqual(metrics['sent_contests'], 2)
+        self.assertEqual(metrics['failed_contests'], 0)
+
+    def test_callbacks_report_the_outcome(self):
+        outcomes = []
+        self.outbox.notify_contest({'id': 1}, [], callback=lambda sent: outcomes.append((1, sent)))
+        self.outbox.flush(timeout=1.0)
+
+        self.notifier.send_notification.side_effect = Exception("Slack is down")
+        outbox = NotificationOutbox(self.notifier, coalesce_window=60.0, messages_per_second=100.0,
+                                    max_send_attempts=1)
+        outbox.notify_contest({'id': 2}, [], callback=lambda sent: outcomes.append((2, sent)))
+        outbox.flush(timeout=1.0)
+        outbox.close(timeout=1.0)
+        self.assertEqual(outcomes, [(1, True), (2, False)])
+
+    def test_closed_outbox_drops_notifications(self):
+        self.outbox.close(timeout=1.0)
+        self.outbox.notify_contest({'id': 1}, [])
+        self.assertEqual(self.outbox.get_metrics()['enqueued'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from src.pipeline import Pipeline, Stage
+
+class TestPipeline(unittest.TestCase):
+    def test_items_flow_through_all_stages(self):
+        pipeline = Pipeline([
+            Stage("double", lambda item: item * 2, workers=3),
+            Stage("increment", lambda item: item + 1, workers=2),
+        ], queue_size=2)
+        results = pipeline.run(range(20))
+        self.assertEqual(sorted(results), [item * 2 + 1 for item in range(20)])
+
+    def test_none_drops_item(self):
+        pipeline = Pipeline([
+            Stage("keep_even", lambda item: item if item % 2 == 0 else None),
+            Stage("identity", lambda item: item),
+        ])
+        self.assertEqual(sorted(pipeline.run(range(6))), [0, 2, 4])
+
+    def test_stage_errors_are_skipped(self):
+        def fail_on_three(item):
+            if item == 3:
+                raise RuntimeError("boom")
+            return item
+
+        pipeline = Pipeline([Stage("check", fail_on_three, workers=2)])
+        self.assertEqual(sorted(pipeline.run(range(5))), [0, 1, 2, 4])
+
+    def test_stages_overlap(self):
+        active_stages = set()
+        overlapped = threading.Event()
+        lock = threading.Lock()
+
+        def make_stage(name):
+            def run(item):
+                with lock:
+                    active_stages.add(name)
+                    if len(active_stages) > 1:
+                        overlapped.set()
+                time.sleep(0.01)
+                with lock:
+                    active_stages.discard(name)
+                return item
+            return run
+
+        pipeline = Pipeline([Stage("first", make_stage("first")), Stage("second", make_stage("second"))])
+        pipeline.run(range(10))
+        self.assertTrue(overlapped.is_set())
+
+    def test_batched_stage(self):
+        batch_sizes = []
+
+        def square_batch(items):
+            batch_sizes.append(len(items))
+            return [item * item for item in items]
+
+        pipeline = Pipeline([
+            Stage("identity", lambda item: item),
+            Stage("square", square_batch, batch_size=4),
+        ], queue_size=10)
+        results = pipeline.run(range(12))
+
+        self.assertEqual(sorted(results), [item * item for item in range(12)])
+        self.assertEqual(sum(batch_sizes), 12)
+        self.assertTrue(all(size <= 4 for size in batch_sizes))
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            Pipeline([])
+        with self.assertRaises(ValueError):
+            Stage("empty", lambda item: item, workers=0)
+        with self.assertRaises(ValueError):
+            Stage("empty", lambda items: items, batch_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
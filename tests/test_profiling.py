@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from src.pipeline import Pipeline, Stage
+from src.profiling import CycleProfiler
+
+def busy_work():
+    return sorted(str(index) for index in range(2000))
+
+class TestCycleProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.directory.name, 'profiles')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def profile_files(self):
+        return sorted(os.listdir(self.output_dir)) if os.path.isdir(self.output_dir) else []
+
+    def test_disabled_writes_nothing(self):
+        profiler = CycleProfiler(output_dir=self.output_dir)
+        with profiler.cycle('a'):
+            busy_work()
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(self.profile_files(), [])
+
+    def test_every_nth_cycle(self):
+        profiler = CycleProfiler(every_n=2, output_dir=self.output_dir)
+        for cycle_id in ('a', 'b', 'c', 'd'):
+            with profiler.cycle(cycle_id):
+                busy_work()
+        profiled = [name for name in self.profile_files() if name.endswith('.prof')]
+        self.assertEqual([name.rsplit('-', 1)[1] for name in profiled], ['b.prof', 'd.prof'])
+        self.assertEqual(len(self.profile_files()), 4)
+
+    def test_pipeline_workers_are_merged(self):
+        profiler = CycleProfiler(every_n=1, output_dir=self.output_dir)
+        with self.assertLogs('src.profiling', level='INFO') as logs:
+            with profiler.cycle('a'):
+                Pipeline([Stage("busy", lambda item: busy_work())]).run([1])
+        self.assertIn('busy_work', logs.output[0])
+        self.assertIn('Top allocations', logs.output[0])
+
+    def test_other_threads_are_not_profiled(self):
+        profiler = CycleProfiler(every_n=1, output_dir=self.output_dir)
+        cycle_ended = threading.Event()
+        profile_functions = []
+
+        def long_lived():
+            busy_work()
+            profile_functions.append(sys.getprofile())
+            cycle_ended.wait(1.0)
+
+        with self.assertLogs('src.profiling', level='INFO') as logs:
+            with profiler.cycle('a'):
+                worker = threading.Thread(target=long_lived)
+                worker.start()
+                while not profile_functions:
+                    busy_work()
+        cycle_ended.set()
+        worker.join()
+        # The thread outlives the cycle, so it never gets a profiler
+        self.assertEqual(profile_functions, [None])
+        self.assertNotIn('long_lived', logs.output[0])
+
+    @patch('src.profiling.time.perf_counter')
+    def test_over_budget_arms_next_cycle(self, mock_perf_counter):
+        profiler = CycleProfiler(time_budget=5.0, output_dir=self.output_dir)
+        mock_perf_counter.side_effect = [0.0, 10.0]
+        with self.assertLogs('src.profiling', level='WARNING'):
+            with profiler.cycle('slow'):
+                pass
+        self.assertEqual(self.profile_files(), [])
+        self.assertTrue(profiler.armed)
+
+        mock_perf_counter.side_effect = [0.0, 1.0]
+        with profiler.cycle('next'):
+            busy_work()
+        self.assertFalse(profiler.armed)
+        self.assertTrue(self.profile_files()[0].endswith('-next.alloc.txt'))
+
+    def test_rotation_keeps_newest(self):
+        profiler = CycleProfiler(every_n=1, output_dir=self.output_dir, keep=2)
+        with patch('src.profiling.time.strftime', side_effect=['20260101-000001', '20260101-000002', '20260101-000003']):
+            for cycle_id in ('a', 'b', 'c'):
+                with profiler.cycle(cycle_id):
+                    busy_work()
+        self.assertEqual(self.profile_files(), [
+            'cycle-20260101-000002-b.alloc.txt', 'cycle-20260101-000002-b.prof',
+            'cycle-20260101-000003-c.alloc.txt', 'cycle-20260101-000003-c.prof',
+        ])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            CycleProfiler(every_n=-1)
+        with self.assertRaises(ValueError):
+            CycleProfiler(time_budget=0)
+        with self.assertRaises(ValueError):
+            CycleProfiler(keep=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.rate_limiter import AdaptiveRateController, CircuitBreaker, TokenBucket, jittered_backoff, parse_retry_after
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_available_immediately(self):
+        bucket = TokenBucket(rate=1.0, burst=3)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    @patch('src.rate_limiter.time.sleep')
+    def test_acquire_waits_when_empty(self, mock_sleep):
+        bucket = TokenBucket(rate=2.0, burst=1)
+        bucket.acquire()
+        mock_sleep.assert_not_called()
+        bucket.acquire()
+        wait_time = mock_sleep.call_args[0][0]
+        self.assertGreater(wait_time, 0.4)
+        self.assertLessEqual(wait_time, 0.5)
+
+    @patch('src.rate_limiter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('src.rate_limiter.time.monotonic', return_value=100.0)
+    def test_acquire_async(self, mock_monotonic, mock_sleep):
+        # A frozen clock and a mocked sleep, so the wait does not depend on
+        # how fast the event loop happens to run
+        bucket = TokenBucket(rate=50.0, burst=1)
+
+        async def acquire_twice():
+            await bucket.acquire_async()
+            mock_sleep.assert_not_awaited()
+            await bucket.acquire_async()
+
+        asyncio.run(acquire_twice())
+        mock_sleep.assert_awaited_once_with(0.02)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1.0, burst=0)
+
+class TestAdaptiveRateController(unittest.TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        controller = AdaptiveRateController(1.0, min_rate=0.25, max_rate=1.1, increase_step=0.05, decrease_factor=0.5)
+        controller.on_success()
+        self.assertAlmostEqual(controller.rate, 1.05)
+        controller.on_success()
+        controller.on_success()
+        self.assertAlmostEqual(controller.rate, 1.1)
+        controller.on_throttle()
+        self.assertAlmostEqual(controller.rate, 0.55)
+        controller.on_throttle()
+        controller.on_throttle()
+        self.assertAlmostEqual(controller.rate, 0.25)
+        self.assertEqual(controller.get_metrics()['throttles'], 3)
+
+    @patch('src.rate_limiter.time.sleep')
+    def test_retry_after_pauses_callers(self, mock_sleep):
+        controller = AdaptiveRateController(100.0, burst=5, max_rate=100.0)
+        controller.on_throttle(retry_after=2.0)
+        controller.acquire()
+        self.assertGreater(mock_sleep.call_args[0][0], 1.9)
+
+    def test_invalid_rates(self):
+        with self.assertRaises(ValueError):
+            AdaptiveRateController(10.0, max_rate=5.0)
+        with self.assertRaises(ValueError):
+            AdaptiveRateController(1.0, decrease_factor=1.5)
+
+class TestCircuitBreaker(unittest.TestCase):
+    @patch('src.rate_limiter.time.monotonic')
+    def test_trips_and_recovers(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2, cool_down=30.0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+
+        # One trial request after the cool-down; failing it reopens
+        mock_monotonic.return_value = 131.0
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+
+        mock_monotonic.return_value = 162.0
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.get_metrics()['trips'], 2)
+        self.assertEqual(breaker.get_metrics()['state'], 'closed')
+
+    @patch('src.rate_limiter.time.monotonic')
+    def test_lost_trial_is_retried_after_cool_down(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, cool_down=30.0)
+        breaker.record_failure()
+
+        # The trial's outcome is never recorded
+        mock_monotonic.return_value = 131.0
+        self.assertTrue(breaker.allow_request())
+        mock_monotonic.return_value = 150.0
+        self.assertFalse(breaker.allow_request())
+
+        mock_monotonic.return_value = 161.0
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.get_metrics()['state'], 'closed')
+
+    @patch('src.rate_limiter.time.monotonic')
+    def test_cancelled_request_only_reopens_trial(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=1, cool_down=30.0)
+        breaker.record_cancelled()
+        self.assertEqual(breaker.get_metrics()['state'], 'closed')
+        self.assertEqual(breaker.get_metrics()['consecutive_failures'], 0)
+
+        breaker.record_failure()
+        mock_monotonic.return_value = 131.0
+        self.assertTrue(breaker.allow_request())
+        breaker.record_cancelled()
+        self.assertEqual(breaker.get_metrics()['state'], 'open')
+        self.assertFalse(breaker.allow_request())
+
+class TestRetryHelpers(unittest.TestCase):
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("12"), 12.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_jittered_backoff(self):
+        for attempt in range(6):
+            self.assertLessEqual(jittered_backoff(attempt, base=0.5, cap=4.0), 4.0)
+        self.assertGreaterEqual(jittered_backoff(0, retry_after=3.0), 3.0)
+
+if __name__ == '__main__':
+    unittest.main()
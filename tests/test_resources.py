@@ -0,0 +1,54 @@
+import os
+import unittest
+from unittest.mock import patch
+import httpx
+from src.database_manager import DatabaseManager
+from src.resources import ResourceRegistry
+
+ENVIRONMENT = {'SUPABASE_URL': 'https://example.supabase.co', 'SUPABASE_KEY': 'test_key', 'SLACK_BOT_TOKEN': 'xoxb-test'}
+
+class TestResourceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(200, json=[{'id': '1', 'status': 'unprocessed'}])
+
+        self.registry = ResourceRegistry(max_connections=3, env_file=os.devnull, transport=httpx.MockTransport(handler))
+
+    def tearDown(self):
+        self.registry.close()
+
+    @patch.dict(os.environ, ENVIRONMENT)
+    def test_clients_are_shared(self):
+        self.assertIs(self.registry.get_supabase(), self.registry.get_supabase())
+        self.assertIs(self.registry.get_slack_client(), self.registry.get_slack_client())
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_missing_credentials(self):
+        with self.assertRaises(ValueError):
+            self.registry.get_supabase()
+
+    @patch.dict(os.environ, ENVIRONMENT)
+    @patch('src.database_manager.create_client')
+    def test_managers_share_the_pooled_client(self, mock_create_client):
+        supabase = self.registry.get_supabase()
+        first = DatabaseManager(notifier=object(), supabase=supabase)
+        second = DatabaseManager(notifier=object(), supabase=supabase)
+        mock_create_client.assert_not_called()
+
+        self.assertEqual(first.get_unprocessed_contests(), [{'id': '1', 'status': 'unprocessed'}])
+        second.get_unprocessed_contests()
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[0].url.host, 'example.supabase.co')
+        self.assertEqual(self.requests[0].headers['apikey'], 'test_key')
+        self.assertEqual(self.registry.get_metrics()['requests'], 2)
+        self.assertEqual(self.registry.get_metrics()['max_connections'], 3)
+
+    def test_invalid_pool_size(self):
+        with self.assertRaises(ValueError):
+            ResourceRegistry(max_connections=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import os
 import unittest
 from unittest.mock import patch, MagicMock
 import time
@@ -8,25 +9,29 @@ class TestScheduler(unittest.TestCase):
     @patch('src.scheduler.DataProcessor')
     @patch('src.scheduler.DatabaseManager')
     @patch('src.scheduler.SlackNotifier')
-    def setUp(self, mock_slack, mock_db, mock_processor, mock_fetcher):
+    @patch('src.scheduler.ResourceRegistry')
+    @patch('src.scheduler.MetricsServer')
+    def setUp(self, mock_metrics_server, mock_resources, mock_slack, mock_db, mock_processor, mock_fetcher):
         self.mock_fetcher = mock_fetcher.return_value
         self.mock_processor = mock_processor.return_value
         self.mock_db = mock_db.return_value
         self.mock_slack = mock_slack.return_value
-        self.scheduler = Scheduler()
+        # Keep the detail cache and ledger in memory instead of files in the working directory
+        with patch.dict(os.environ, {"DETAIL_CACHE_PATH": "", "NOTIFICATION_LEDGER_PATH": ""}):
+            self.scheduler = Scheduler()
 
     def test_run_contest_finder(self):
         # Mock the behavior of each component
-        self.mock_fetcher.fetch_all_contests.return_value = [{'id': '1', 'title': 'Test Contest'}]
-        self.mock_processor.process_contests.return_value = None
+        self.mock_fetcher.iter_all_contests.return_value = iter([('NFL', [{'id': '1', 'title': 'Test Contest'}])])
+        self.mock_processor.process_lobbies.return_value = None
         self.mock_processor.process_unprocessed_contests.return_value = [{'id': '1', 'title': 'Test Contest', 'status': 'ready_to_enter'}]
 
         # Run the contest finder
         self.scheduler.run_contest_finder()
 
         # Assert that each method was called
-        self.mock_fetcher.fetch_all_contests.assert_called_once()
-        self.mock_processor.process_contests.assert_called_once()
+        self.mock_fetcher.iter_all_contests.assert_called_once()
+        self.mock_processor.process_lobbies.assert_called_once_with(self.mock_fetcher.iter_all_contests.return_value)
         self.mock_processor.process_unprocessed_contests.assert_called_once()
         self.mock_slack.notify_contest.assert_called_once()
 
@@ -66,16 +71,90 @@ class TestScheduler(unittest.TestCase):
         # Assert that the scheduler was stopped due to the exception
         self.assertFalse(self.scheduler.is_running)
 
+    @patch('src.scheduler.NotificationLedger')
+    @patch('src.scheduler.DetailCache')
+    @patch('src.scheduler.DataFetcher')
+    @patch('src.scheduler.DataProcessor')
+    @patch('src.scheduler.DatabaseManager')
+    @patch('src.scheduler.SlackNotifier')
+    @patch('src.scheduler.ResourceRegistry')
+    @patch('src.scheduler.MetricsServer')
+    def test_notification_ledger_path_from_environment(self, mock_metrics_server, mock_resources, mock_slack, mock_db, mock_processor, mock_fetcher,
+                                                       mock_cache, mock_ledger):
+        with patch.dict(os.environ):
+            os.environ.pop("NOTIFICATION_LEDGER_PATH", None)
+            Scheduler()
+        mock_ledger.assert_called_with("notifications.sqlite")
+
+        with patch.dict(os.environ, {"NOTIFICATION_LEDGER_PATH": ""}):
+            Scheduler()
+        mock_ledger.assert_called_with(None)
+
+    @patch('src.scheduler.DetailCache')
+    @patch('src.scheduler.DataFetcher')
+    @patch('src.scheduler.DataProcessor')
+    @patch('src.scheduler.DatabaseManager')
+    @patch('src.scheduler.SlackNotifier')
+    @patch('src.scheduler.ResourceRegistry')
+    @patch('src.scheduler.MetricsServer')
+    def test_detail_cache_path_from_environment(self, mock_metrics_server, mock_resources, mock_slack, mock_db, mock_processor, mock_fetcher, mock_cache):
+        with patch.dict(os.environ, {"NOTIFICATION_LEDGER_PATH": ""}):
+            os.environ.pop("DETAIL_CACHE_PATH", None)
+            Scheduler()
+        mock_cache.assert_called_with(path="detail_cache.sqlite")
+
+        with patch.dict(os.environ, {"DETAIL_CACHE_PATH": "", "NOTIFICATION_LEDGER_PATH": ""}):
+            Scheduler()
+        mock_cache.assert_called_with(path=None)
+
+    @patch('src.scheduler.DataFetcher')
+    @patch('src.scheduler.DataProcessor')
+    @patch('src.scheduler.DatabaseManager')
+    @patch('src.scheduler.SlackNotifier')
+    @patch('src.scheduler.ResourceRegistry')
+    @patch('src.scheduler.MetricsServer')
+    def test_parser_settings_from_environment(self, mock_metrics_server, mock_resources, mock_slack, mock_db, mock_processor, mock_fetcher):
+        with patch.dict(os.environ, {"DK_PARSER_BACKEND": "lxml", "DK_PARSE_WORKERS": "3", "DETAIL_CACHE_PATH": "", "NOTIFICATION_LEDGER_PATH": ""}):
+            Scheduler()
+        self.assertEqual(mock_fetcher.call_args[1]['parser_backend'], "lxml")
+        self.assertEqual(mock_fetcher.call_args[1]['parse_workers'], 3)
+        # The parse pool gets whole batches of pages from the pipeline
+        self.assertEqual(mock_processor.call_args[1]['fetch_batch_size'], 20)
+
+        with patch.dict(os.environ, {"DETAIL_CACHE_PATH": "", "NOTIFICATION_LEDGER_PATH": ""}):
+            os.environ.pop("DK_PARSER_BACKEND", None)
+            os.environ.pop("DK_PARSE_WORKERS", None)
+            Scheduler()
+        self.assertEqual(mock_fetcher.call_args[1]['parser_backend'], "soup")
+        self.assertEqual(mock_fetcher.call_args[1]['parse_workers'], 0)
+
+    @patch('src.scheduler.DataFetcher')
+    @patch('src.scheduler.DataProcessor')
+    @patch('src.scheduler.DatabaseManager')
+    @patch('src.scheduler.SlackNotifier')
+    @patch('src.scheduler.ResourceRegistry')
+    @patch('src.scheduler.MetricsServer')
+    def test_fetch_mode_from_environment(self, mock_metrics_server, mock_resources, mock_slack, mock_db, mock_processor, mock_fetcher):
+        with patch.dict(os.environ, {"DK_FETCH_MODE": "async", "DK_FETCH_BATCH_SIZE": "8", "DETAIL_CACHE_PATH": "", "NOTIFICATION_LEDGER_PATH": ""}):
+            Scheduler()
+        self.assertEqual(mock_fetcher.call_args[1]['fetch_mode'], "async")
+        self.assertEqual(mock_processor.call_args[1]['fetch_batch_size'], 8)
+
+        with patch.dict(os.environ, {"DK_FETCH_MODE": "threads", "DETAIL_CACHE_PATH": "", "NOTIFICATION_LEDGER_PATH": ""}):
+            Scheduler()
+        self.assertEqual(mock_fetcher.call_args[1]['fetch_mode'], "threads")
+        self.assertIsNone(mock_processor.call_args[1]['fetch_batch_size'])
+
     def test_error_handling(self):
-        # Mock an error in fetch_all_contests
-        self.mock_fetcher.fetch_all_contests.side_effect = Exception("Test error")
+        # Mock an error in iter_all_contests
+        self.mock_fetcher.iter_all_contests.side_effect = Exception("Test error")
 
         # Run the contest finder
         self.scheduler.run_contest_finder()
 
         # Assert that the error was handled and other methods were not called
-        self.mock_fetcher.fetch_all_contests.assert_called_once()
-        self.mock_processor.process_contests.assert_not_called()
+        self.mock_fetcher.iter_all_contests.assert_called_once()
+        self.mock_processor.process_lobbies.assert_not_called()
         self.mock_processor.process_unprocessed_contests.assert_not_called()
         self.mock_slack.notify_contest.assert_not_called()
 
@@ -0,0 +1,65 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from src.utils import ProgressRecorder, is_interactive, progress, with_spinner
+
+@with_spinner("\nDoing work", spinner_type="dots")
+def do_work(fail=False):
+    if fail:
+        raise ValueError("boom")
+    return 42
+
+class TestProgressRecorder(unittest.TestCase):
+    def setUp(self):
+        progress.reset()
+
+    def test_record_and_snapshot(self):
+        recorder = ProgressRecorder()
+        recorder.record("fetch", 0.5)
+        recorder.record("fetch", 1.5, failed=True)
+        self.assertEqual(recorder.snapshot(), {'fetch': {'count': 2, 'errors': 1, 'total_time': 2.0, 'max_time': 1.5, 'avg_time': 1.0}})
+        self.assertEqual(recorder.summary(), "fetch: 2")
+
+    @patch.dict(os.environ, {'DK_ENV': 'production'})
+    def test_production_never_draws(self):
+        self.assertFalse(is_interactive())
+
+    @patch.dict(os.environ, {'DK_PROGRESS': 'headless'})
+    @patch('src.utils.Halo')
+    def test_headless_spans_record_without_halo(self, mock_halo):
+        self.assertEqual(do_work(), 42)
+        with self.assertRaises(ValueError):
+            do_work(fail=True)
+        mock_halo.assert_not_called()
+        span = progress.snapshot()['Doing work']
+        self.assertEqual((span['count'], span['errors']), (2, 1))
+
+    @patch('src.utils.is_interactive', return_value=True)
+    @patch('src.utils.Halo')
+    def test_worker_threads_never_draw(self, mock_halo, mock_interactive):
+        workers = [threading.Thread(target=do_work) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        mock_halo.assert_not_called()
+        self.assertEqual(progress.snapshot()['Doing work']['count'], 4)
+
+    @patch('src.utils.is_interactive', return_value=True)
+    @patch('src.utils.Halo')
+    def test_one_display_per_cycle(self, mock_halo, mock_interactive):
+        progress.record("stale", 1.0)
+        with progress.cycle("Running"):
+            do_work()
+            do_work()
+        mock_halo.assert_called_once_with(text="Running", spinner="dots")
+        mock_halo.return_value.succeed.assert_called_once_with("Running (Doing work: 2)")
+        self.assertEqual(list(progress.snapshot()), ['Doing work'])
+
+        # Outside a cycle an interactive main-thread call keeps its spinner
+        do_work()
+        self.assertEqual(mock_halo.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()